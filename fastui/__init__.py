@@ -1,9 +1,30 @@
-from ._utils import \
-	assert_type, \
-	assert_func, \
-	assert_iter, \
-	assert_iter_types, \
-	from_dict
-
-from . import terminal
-from . import tests
\ No newline at end of file
+# Subpackages are imported on first attribute access (PEP 562), so that
+# `import fastui` does not pull in `rich` or `numpy`. Neither does it pull
+# in `typing` for the `_utils` helpers, which keeps shell completion fast.
+_LAZY_SUBMODULES = ('terminal', 'tests', 'trace')
+
+_LAZY_UTILS = (
+	'assert_type',
+	'assert_func',
+	'assert_iter',
+	'assert_iter_types',
+	'from_dict',
+)
+
+def __getattr__(name):
+	if name in _LAZY_UTILS:
+		from . import _utils
+		value = getattr(_utils, name)
+		globals()[name] = value
+		return value
+
+	if name in _LAZY_SUBMODULES:
+		from importlib import import_module
+		module = import_module('.' + name, __name__)
+		globals()[name] = module
+		return module
+
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+def __dir__():
+	return sorted(set(globals()) | set(_LAZY_UTILS) | set(_LAZY_SUBMODULES))
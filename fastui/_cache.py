@@ -0,0 +1,29 @@
+import os
+
+
+# Kept apart from `_utils`, which needs `typing`, so that paths like shell
+# completion can use the cache without importing it.
+
+def cache_directory(*parts: str) -> str:
+    base = os.environ.get('FASTUI_CACHE_DIR')
+
+    if base is None:
+        base = os.environ.get('XDG_CACHE_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.cache')
+        base = os.path.join(base, 'fastui')
+
+    return os.path.join(base, *parts)
+
+def write_atomic(
+    path: str, 
+    data: bytes
+) -> None:
+    # Readers either see the old file or the complete new one, never a
+    # partially written artifact.
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+
+    os.replace(tmp, path)
@@ -1,6 +1,9 @@
 from collections.abc import Iterable
+from functools import lru_cache
 from math import inf
-from typing import Any, Iterable, Type, Union, Dict, TypeVar
+from typing import Any, Callable, Tuple, Type, Union, Dict, TypeVar
+
+from ._cache import cache_directory, write_atomic
 
 T = TypeVar('T')
 S = TypeVar('S')
@@ -67,12 +70,12 @@ def assert_iter(
         return True
 
     b = isinstance(lst, Iterable)
-    b &= min_len <= len(lst) <= max_len
+    b = b and min_len <= len(lst) <= max_len
 
     if stop:
         assert b, \
             f'`{name}` must be iterable' + \
-            (f' or None.' if allow_none else '.') + \
+            (f' or None.' if optional else '.') + \
             (f' `{name}` must be of length ' if min_len > 0 or max_len < inf else '') + \
             (f'at least {min_len}' if min_len > 0 else '') + \
             (' and ' if min_len > 0 and max_len < inf else '') + \
@@ -89,8 +92,7 @@ def assert_iter_types(
     allow_none: bool = False, 
     stop: bool = True
 ) -> bool:
-    b = isinstance(Iterable)
-    b &= isinstance(Iterable)
+    b = isinstance(lst, Iterable)
 
     if b:
         b &= min_len <= len(lst) <= max_len
@@ -100,7 +102,7 @@ def assert_iter_types(
 
     if stop:
         assert b, \
-            f'`{name}` must be iterable, containging {_str_list_or(typ)}-type elements' + \
+            f'`{name}` must be iterable, containing {_str_list_or(typs)}-type elements' + \
             (f' or None elements.' if allow_none else '.') + \
             (f' `{name}` must be of length ' if min_len > 0 or max_len < inf else '') + \
             (f'at least {min_len}' if min_len > 0 else '') + \
@@ -108,6 +110,21 @@ def assert_iter_types(
             (f'at most {max_len}.' if max_len < inf else '.')
     return b
 
+# `assert_iter_types` compiled for a type signature, and cached: a predicate
+# that only answers whether the check passes, without a Python loop per
+# element. Call `assert_iter_types` when it fails, for the message.
+
+@lru_cache(maxsize=None)
+def iter_types_validator(
+    typs: Tuple[Type, ...],
+    min_len: Union[int, float] = 0,
+    max_len: Union[int, float] = inf,
+    allow_none: bool = False
+) -> Callable[[Any], bool]:
+    allowed = frozenset(typs + ((type(None),) if allow_none else ()))
+    return lambda lst: (type(lst) in (list, tuple) or isinstance(lst, Iterable)) and \
+        min_len <= len(lst) <= max_len and allowed.issuperset(map(type, lst))
+
 def from_dict(
     dic: Dict[T, S], 
     key: T, 
@@ -116,4 +133,4 @@ def from_dict(
     if key in dic:
         return dic[key]
 
-    return default
\ No newline at end of file
+    return default
@@ -1,3 +1,40 @@
-from .argument_parsing import ArgumentParser
-from .tables import SimplePlainTable
-from .styled_output import StyledOutput
\ No newline at end of file
+# `typing.TYPE_CHECKING`, without importing `typing`
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from .argument_parsing import ArgumentParser
+    from .live import LiveTable
+    from .pager import TablePager
+    from .tables import SimplePlainTable, StreamingPlainTable
+    from .styled_output import StyledOutput
+
+# Public names are resolved on first access (PEP 562). `tables` needs `rich`
+# at import time, so it is only loaded once a table is actually used.
+_LAZY_ATTRIBUTES = {
+    'ArgumentParser': '.argument_parsing',
+    'LiveTable': '.live',
+    'SimplePlainTable': '.tables',
+    'StreamingPlainTable': '.tables',
+    'TablePager': '.pager',
+    'StyledOutput': '.styled_output',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+        from .. import trace
+
+        module = _LAZY_ATTRIBUTES[name]
+        with trace.maybe_span('import', 'import', f'{__name__}{module}'):
+            value = getattr(import_module(module, __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,91 +1,89 @@
 from os import get_terminal_size
+from itertools import chain, islice
 from sys import argv
 import os
-from tabulate import tabulate
-import numpy as np
 from math import ceil
 from .styled_output import StyledOutput
-from typing import Union, List, Iterable, Any, Iterator, Optional, Callable
-from rich.console import Console
-from .tables import SimplePlainTable
+from typing import Union, List, Iterable, Any, Iterator, Optional, Callable, \
+    Sequence, Tuple, TYPE_CHECKING
+
+# `rich` (and everything in `.tables`, which is built on it) is only imported
+# once something is actually rendered, see `ArgumentParser.console` and
+# `Command.__help_option__`.
+if TYPE_CHECKING:
+    from rich.console import Console
+
+from .. import trace
+from .lists import list_grammar, parse_list, parse_list_from_string
+from .resolver import ArgumentError, TokenResolver
+from .results import ParseResult
+from .tokens import ArgumentCursor, POSITIONAL, TERMINATOR, NUMBER
 from .._utils import assert_type, assert_func, assert_iter, \
-    assert_iter_types, from_dict
+    assert_iter_types, from_dict, iter_types_validator
 
 
-def parse_list_from_string(string, delims, typ):
-    if delims[0] not in string:
-        return typ(string)
+# Parameter interpreters shared by the `add_*_option` helpers and by trees
+# loaded from a compiled spec (see `.spec`).
 
-    start = string.find(delims[0])
-    end = str(string[::-1]).find(delims[1])
+DEFAULT_LIST_DELIMITERS = (('[', ']'), ('(', ')'), ('{', '}'))
 
-    string = string[start+1:end]
+def interpret_int(itr):
+    return int(next(itr))
 
-    elements = string.split(',') if ',' in string else string
+def interpret_float(itr):
+    return float(next(itr))
 
-    _list = []
+def interpret_string(itr):
+    return next(itr)
 
-    for e in elements:
-        _list.append(parse_list_from_string(e, delims, typ))
+def list_interpreter(delims, element_parser, dtype=None):
+    grammar = list_grammar(delims)
+    return lambda itr: grammar.parse(grammar.gather(itr), element_parser, dtype)
 
-    return _list
+def selection_interpreter(valid_parameters):
+    valid_parameters = tuple(map(str, valid_parameters))
+    return lambda itr: valid_parameters.index(next(itr))
 
-def parse_list(itr, delims, typ):
-    assert_iter(delims, name='delims', min_len=2, options=False)
 
-    args = []
-    args.append(next(itr))
+def is_async(callback: Callable) -> bool:
+    # `inspect.iscoroutinefunction`, without importing `inspect`
+    code = getattr(callback, '__code__', None)
+    return code is not None and bool(code.co_flags & 0x80)  # CO_COROUTINE
 
-    # if type(delims[0]) in (list, tuple):
-    if assert_iter(delims[0], 'delims[0]', stop=False):
-        assert all(len(d) == 2 for d in delims), \
-            'List delimiters must be given in pairs.'
-        assert all(type(d[0]) == type(d[1]) == str for d in delims), \
-            'List delimiters must be strings.'
-
-        starts = [d[0] for d in delims]
-
-        k = 0
-        for i in range(len(args[0])):
-            if args[0][i] in starts:
-                k = starts.index(args[0][i])
-                break
-
-        delims = delims[k]
-
-    assert len(delims) == 2, \
-        'List delimiters must be given in pairs.'
-
-    # Check whether there are parantheses
-    assert any(b in args[0] for b in delims), \
-        'Opening list delimiter must be present in first relevant argument.'
-
-    # Check which argument is contains the closing paranthesis
-    counter = args[0].count(delims[0])
-    counter -= args[0].count(delims[1])
-
-    while counter > 0:
-        args.append(next(itr))
-
-        counter += args[-1].count(delims[0])
-        counter -= args[-1].count(delims[1])
-
-    # Build the list
-    string = ''.join(args)
-
-    return parse_list_from_string(string, delims, typ)
+def _assert_acyclic(dependencies, name: str) -> None:
+    # `dependencies` maps option keys to the keys of the options whose
+    # callbacks run first, see `Command.add_callback_dependencies`
+    done = set()
+    for start in dependencies:
+        if start in done:
+            continue
+        path, stack = {start}, [(start, iter(dependencies[start]))]
+        while stack:
+            key, after = stack[-1]
+            nxt = next(after, None)
+            if nxt is None:
+                stack.pop()
+                path.discard(key)
+                done.add(key)
+                continue
+            assert nxt not in path, \
+                f'Callbacks of `{name}` depend on each other in a cycle through `{nxt}`.'
+            if nxt not in done:
+                path.add(nxt)
+                stack.append((nxt, iter(dependencies.get(nxt, ()))))
 
 
 class Command:
 
     def __init__(
-        self, 
+        self,
         names: Iterable[str], 
         arg_parser: 'ArgumentParser',
         help_text: Optional[str] = None, 
         usage: Optional[str] = None, 
         commands: Optional[Iterable['Command']] = None,
-        parameters: Optional[Iterable['Parameter']] = None, 
+        parameter_interpreters: Iterable[Callable[[Iterator],Iterable]] = tuple(), 
+        parameter_descriptors: Iterable[str] = tuple(),
         options: Optional[Iterable['Option']] = None, 
         callback: Optional[Callable[...,None]] = None,
         std_help: bool = True
@@ -93,23 +91,55 @@ class Command:
         assert_iter_types(names, str, name='names', min_len=1)
         assert_type(help_text, str, name='help_text', optional=True)
         assert_type(usage, str, name='usage', optional=True)
-        assert_iter_types(commands, self.__class__, name='commands', allow_none=True)
-        assert_iter_types(parameters, self.__class__.Parameter, name='parameters', allow_none=True)
-        assert_iter_types(options, self.__class__.Option, name='options', allow_none=True)
+        if commands is not None:
+            assert_iter_types(commands, Command, ArgumentParser, name='commands')
+        if options is not None:
+            assert_iter_types(options, Command.Option, name='options')
         assert_func(callback, name='callback', optional=True)
         assert_type(arg_parser, ArgumentParser, name='arg_parser', optional=False)
         assert_type(std_help, bool, name='std_help', optional=False)
 
-        self._names = names
+        self._setup(
+            names=names,
+            arg_parser=arg_parser,
+            help_text=help_text,
+            usage=usage,
+            commands=commands,
+            parameters=Command.Parameter(
+                list(parameter_interpreters),
+                list(parameter_descriptors)
+            ),
+            options=options,
+            callback=callback,
+            std_help=std_help
+        )
+        self._validated = True
+
+    def _setup(
+        self,
+        names: Iterable[str],
+        arg_parser: 'ArgumentParser',
+        help_text: Optional[str],
+        usage: Optional[str],
+        commands: Optional[Iterable['Command']],
+        parameters: 'Parameter',
+        options: Optional[Iterable['Option']],
+        callback: Optional[Callable[...,None]],
+        std_help: bool
+    ) -> None:
+        # Assigns all attributes without validating them. Only call this
+        # with arguments that have already been checked (see `__init__`), or
+        # leave `_validated` false for `ArgumentParser.freeze` to check them.
+        self._names = list(names)
         self.help_text = help_text if help_text is not None else ''
         self.usage = usage if usage is not None else ''
 
-        self._parameters = parameters if parameters is not None else []
+        self._parameters = parameters
         self._callback = callback if callback is not None else lambda *args, **kwargs: None
         self._arg_parser = arg_parser
         self._std_help = std_help
 
-        self._command_list = commands if commands is not None else []
+        self._command_list = list(commands) if commands is not None else []
         self._command_order = list(range(len(self._command_list)))
         self._command_keys = {}
 
@@ -117,44 +147,48 @@ class Command:
             for name in cmd.names:
                 self._command_keys[name] = k
 
-        self._option_list = options
-        self._option_order = list(range(len(options)))
+        self._option_list = list(options) if options is not None else []
+        self._option_order = list(range(len(self._option_list)))
         self._option_shortcuts = {}
         self._option_keys = {}
-        self._option_data = {}
-
-        for k, opt in enumerate(options):
+        self._resolver = None
+        self._completion = None
+        # Whether callbacks go through `.scheduler`, see `_scheduled_dispatch`
+        self._scheduled = None
+        self._validated = False
+        self._frozen = False
+
+        for k, opt in enumerate(self._option_list):
             self._option_keys[opt.key] = k
             for sc in opt.shortcuts:
                 self._option_shortcuts[sc] = k
 
-    def __init__(
-        self,
-        names: Iterable[str], 
-        arg_parser: 'ArgumentParser',
-        help_text: Optional[str] = None, 
-        usage: Optional[str] = None, 
-        commands: Optional[Iterable['Command']] = None,
-        parameter_interpreters: Iterable[Callable[[Iterator],Iterable]] = tuple(), 
-        parameter_descriptors: Iterable[str] = tuple(),
-        options: Optional[Iterable['Option']] = None, 
-        callback: Optional[Callable[...,None]] = None,
-        std_help: bool = True
-    ) -> None:
-        self.__init__(
-            names=names, 
-            arg_parser=arg_parser,
-            help_text=help_text, 
-            usage=usage, 
-            commands=commands,
-            parameters=Command.Parameter(
-                list(parameter_interpreters),
-                list(parameter_descriptors)
-            ),
-            options=options, 
-            callback=callback,
-            std_help=std_help
+        if std_help:
+            self.__help_option__()
+
+    def _check(self) -> None:
+        # The checks of `__init__` on the attributes `_setup` assigned, see
+        # `ArgumentParser.freeze`
+        assert_iter_types(self._names, str, name='names', min_len=1)
+        name = self._names[0]
+        assert_type(self.help_text, str, name=f'{name}.help_text')
+        assert_type(self.usage, str, name=f'{name}.usage')
+        assert_iter_types(
+            self._command_list, Command, ArgumentParser, name=f'{name}.commands'
         )
+        assert_iter_types(
+            self._option_list, Command.Option, name=f'{name}.options'
+        )
+        assert_iter_types(
+            self.parameter_descriptors, str, name=f'{name}.parameter_descriptors'
+        )
+        assert_func(self._callback, name=f'{name}.callback')
+        assert_type(self._arg_parser, ArgumentParser, name=f'{name}.arg_parser')
+        assert_type(self._std_help, bool, name=f'{name}.std_help')
+
+    @property
+    def parameter_descriptors(self):
+        return self._parameters.descriptions
 
     @property
     def names(self):
@@ -164,77 +198,212 @@ class Command:
     def names_str(self):
         return ', '.join(self._names)
 
+    @property
+    def resolver(self) -> TokenResolver:
+        # Compiled on first use and dropped whenever a command or option is
+        # added, see `insert_command` and `insert_option`.
+        # Two threads may both compile it, they produce equal resolvers and
+        # the assignment is atomic.
+        if self._resolver is None:
+            self._resolver = TokenResolver(
+                self._command_keys,
+                self._option_shortcuts,
+                [len(opt._parameters.interpreters) for opt in self._option_list]
+            )
+        return self._resolver
+
     def parse(
         self, 
         start_index: int = 1, 
         argument_string: str = None,
         argument_list: str = None
     ) -> None:
+        args = self._arguments(argument_string, argument_list)
+        self.dispatch(self.parse_args(args, start_index))
+
+    @staticmethod
+    def _arguments(
+        argument_string: Optional[str],
+        argument_list: Optional[Sequence[str]]
+    ) -> Sequence[str]:
+        if argument_list is not None:
+            return argument_list
+        if argument_string is not None:
+            return argument_string.split(' ')
+        return argv
+
+    def parse_args(
+        self,
+        args: Optional[Sequence[str]] = None,
+        start_index: int = 1
+    ) -> ParseResult:
+        # Parsing only reads the command tree, everything it finds goes into
+        # the returned `ParseResult`. Use `dispatch` to run the callbacks.
+        if args is None:
+            args = argv
+
+        return self._parse_cursor(ArgumentCursor(args, start_index), ())
+
+    def dispatch(self, result: ParseResult) -> None:
+        # Call the option callbacks in the order they were given, then the
+        # command's callback with its parameters and all option data.
+        # Dependencies, `async def` callbacks and callback workers are
+        # handled by `.scheduler`.
+        command = result.command
+
+        if command._scheduled_dispatch():
+            from .scheduler import dispatch
+            dispatch(command, result, command._arg_parser.callback_workers)
+            return
+
+        for key, data in result.occurrences:
+            with trace.maybe_span('callback', 'callback', key):
+                command.option(key)._callback(*data)
+
+        with trace.maybe_span('callback', 'callback', command._names[0]):
+            command._callback(*result.parameters, **result.options)
+
+    async def dispatch_async(self, result: ParseResult) -> None:
+        # `dispatch` on the running event loop
+        from .scheduler import run_callbacks
+        command = result.command
+        await run_callbacks(command, result, command._arg_parser.callback_workers)
+
+    def _scheduled_dispatch(self) -> bool:
+        if self._arg_parser.callback_workers is not None:
+            return True
+        if self._scheduled is None:
+            self._scheduled = is_async(self._callback) or any(
+                opt._after or is_async(opt._callback) for opt in self._option_list
+            )
+        return self._scheduled
+
+    def add_callback_dependencies(self, key: str, *after: str) -> None:
+        # The callback of option `key` runs after the callbacks of the
+        # options `after`, when they were given. Callbacks without
+        # dependencies between them may run concurrently, see `.scheduler`.
+        assert not self._frozen, \
+            f'`{self._names[0]}` is frozen, dependencies cannot be added.'
+        assert_type(key, str, name='key')
+        assert_iter_types(after, str, name='after')
+        for k in (key, *after):
+            assert k in self._option_keys, \
+                f'`{self._names[0]}` has no option with the key `{k}`.'
+
+        opt = self.option(key)
+        dependencies = {o.key: o._after for o in self._option_list}
+        dependencies[key] = tuple(dict.fromkeys(opt._after + after))
+        _assert_acyclic(dependencies, self._names[0])
+
+        opt._after = dependencies[key]
+        self._scheduled = None
+
+    def _parse_cursor(
+        self,
+        cursor: ArgumentCursor,
+        path: Tuple[str, ...]
+    ) -> ParseResult:
+        resolver = self.resolver
+        path = path + (self._names[0],)
+        occurrences = []
+
+        # Check whether we start with a command
+        if cursor.peek_kind() == POSITIONAL:
+            k = resolver.resolve_command(cursor.peek())
+            if k is not None:
+                next(cursor)
+                return self._command_list[k]._parse_cursor(cursor, path)
+
+        positionals = self._positionals(cursor, resolver, occurrences)
+        with trace.maybe_span('interpret', 'interpret', self._names[0]):
+            parameters = self._parameters.parse(positionals, self.names_str)
+
+        # Options after the last parameter, and then arguments the
+        # parameters did not take: mistakes, not extras
+        extra = next(positionals, None)
+        if extra is not None:
+            raise ArgumentError(f'Unexpected argument `{extra}` for `{self._names[0]}`.')
+
+        return ParseResult(self, path, tuple(occurrences), tuple(parameters))
+
+    def _positionals(
+        self,
+        cursor: ArgumentCursor,
+        resolver: TokenResolver,
+        occurrences: List[Tuple[str, Tuple[Any, ...]]]
+    ) -> Iterator[str]:
+        # The positionals of the command, read only as its interpreters ask
+        # for them, so that streamed arguments (see `.sources`) are never
+        # collected. Options met on the way are interpreted, in order.
+        while True:
+            kind = cursor.peek_kind()
+            if kind is None:
+                return
+
+            # Everything after `--` is a parameter
+            if kind == TERMINATOR:
+                cursor.skip_terminator()
+                yield from cursor
+                return
+
+            token = next(cursor)
+
+            if kind == POSITIONAL or \
+                    (kind == NUMBER and not resolver.is_option(token)):
+                yield token
+                continue
+
+            for index, inline in resolver.resolve_option(token):
+                opt = self._option_list[index]
+
+                # `--number=5` and `-n5` hand their value to the
+                # interpreters as if it was the next argument
+                if inline is not None:
+                    cursor.push_back(inline)
+
+                with trace.maybe_span('interpret', 'interpret', opt.key):
+                    data = opt.parse(cursor)
+
+                if cursor.has_pending:
+                    raise ArgumentError(
+                        f'`{token}` does not take a parameter.'
+                    )
 
-        # Clear out all option data
-        self._option_data.clear()
-
-        args = []
-        if argument_string is None and argument_list is None:
-            args = argv[start_index:]
-        elif argument_list is not None:
-            args = argument_list[start_index:]
-        else:
-            args = argument_string.split(' ')[start_index:]
-
-        # There are more arguments to be parsed
-        if len(args) > 0:
-            # Check whether we start with a command
-            for c in commands:
-                if c.name == args[0]:
-                    c.parse(argument_list=args)
-                    return
-
-            # Now the rest of the arguments should all be options!
-            k = start_index
-            while k < len(args):
-                # This is an option
-                if args[k].startswith('-'):
-                    opt_sc = args[k].replace('-', '')
-                    opt = self._option_list[self._option_shortcuts[opt_sc]]
-
-                    data, l = opt.parse(args[k+1:])
-
-                    self._option_data[opt.key] = data
-
-                    k += l
-                    k += 1
-
-        # Call the callback function
-        self._callback(**self._option_shortcuts)
+                occurrences.append((opt.key, tuple(data)))
 
     def command(self, key: str) -> 'Command':
         assert key in self._command_keys, \
             'Command key must exist.'
 
-        return self._command_list[self._command_keys[name]]
+        return self._command_list[self._command_keys[key]]
 
     def option(self, key: str) -> 'Option':
         assert key in self._option_keys, \
             'Option key must exist.'
 
-        return self._option_list[self._option_keys[name]]
+        return self._option_list[self._option_keys[key]]
 
-    def add_command(
+    def insert_command(
         self, 
         command: 'Command', 
         index: Optional[int] = None
     ) -> None:
+        assert not self._frozen, \
+            f'`{self._names[0]}` is frozen, commands cannot be added.'
+
         # Check commands are of the correct type
-        assert_type(command, self.Command, name='command', optional=False)
+        assert_type(command, Command, name='command', optional=False)
         assert_type(index, int, name='index', optional=True)
 
         # Add command to the list
         command_index = len(self._command_list)
         self._command_list.append(command)
 
-        # Add command name to the dictionary
-        self._command_keys[command.name] = command_index
+        # Add command names to the dictionary
+        for name in command.names:
+            self._command_keys[name] = command_index
+        self._resolver = None
+        self._completion = None
 
         # Set the arguments index in the list of all arguments
         if index is None or index < 0 or index > command_index:
@@ -254,42 +423,66 @@ class Command:
         callback: Optional[Callable[...,None]] = None,
         index: Optional[int] = None
     ) -> None:
-        cmd = Command(
-            names=names,
-            arg_parser=self._arg_parser,
-            help_text=help_text,
-            usage=usage,
-            commands=commands,
-            parameter_interpreters=parameter_interpreters,
-            parameter_descriptors=parameter_descriptors,
-            options=options,
-            callback=callback,
-            std_help=self._std_help
-        )
+        if self._arg_parser._defer_validation:
+            # Checked by `ArgumentParser.freeze`
+            cmd = Command.__new__(Command)
+            cmd._setup(
+                names=names,
+                arg_parser=self._arg_parser,
+                help_text=help_text,
+                usage=usage,
+                commands=commands,
+                parameters=Command.Parameter(
+                    list(parameter_interpreters),
+                    list(parameter_descriptors)
+                ),
+                options=options,
+                callback=callback,
+                std_help=self._std_help
+            )
+        else:
+            cmd = Command(
+                names=names,
+                arg_parser=self._arg_parser,
+                help_text=help_text,
+                usage=usage,
+                commands=commands,
+                parameter_interpreters=parameter_interpreters,
+                parameter_descriptors=parameter_descriptors,
+                options=options,
+                callback=callback,
+                std_help=self._std_help
+            )
 
-        self.add_command(cmd, index)
+        self.insert_command(cmd, index)
 
-    def add_option(
+    def insert_option(
         self, 
         option: 'Option', 
         index: Optional[int] = None
     ) -> None:
+        assert not self._frozen, \
+            f'`{self._names[0]}` is frozen, options cannot be added.'
 
         # Check options are of the correct type
-        assert_type(option, self.Option, name='option', optional=False)
+        assert_type(option, Command.Option, name='option', optional=False)
         assert_type(index, int, name='index', optional=True)
 
         # Option key must not have been chosen yet!
-        assert option.key not in self._option_data, \
+        assert option.key not in self._option_keys, \
             f'The key `{option.key}` is already in use. Option keys must be unique.'
 
         # Add option to the list
         option_index = len(self._option_list)
         self._option_list.append(option)
+        self._option_keys[option.key] = option_index
 
         # Add option shortcuts to the dictionary
         for key in option.shortcuts:
             self._option_shortcuts[key] = option_index
+        self._resolver = None
+        self._completion = None
+        self._scheduled = None
 
         # Set the option's index in the list of all options
         if index is None or index < 0 or index > option_index:
@@ -297,9 +490,6 @@ class Command:
         else:
             self._option_order.insert(index, option_index)
 
-        # Add option to the data dictionary
-        self._option_data[option.key] = None
-
     def add_option(
         self,
         key: str, 
@@ -310,71 +500,72 @@ class Command:
         callback: Callable[..., None],
         index: Optional[int] = None
     ) -> None:
-        opt = self.Option(
-            key=key, 
-            help_text=help_text, 
-            shortcuts=shortcuts, 
-            parameter_interpreters=parameter_interpreters, 
-            parameter_descriptors=parameter_descriptors,
-            callback=callback
-        )
+        if self._arg_parser._defer_validation:
+            # Checked by `ArgumentParser.freeze`
+            opt = self.Option.__new__(self.Option)
+            opt._setup(
+                key,
+                help_text,
+                shortcuts,
+                Command.Parameter(
+                    list(parameter_interpreters),
+                    list(parameter_descriptors)
+                ),
+                callback
+            )
+        else:
+            opt = self.Option(
+                key=key, 
+                help_text=help_text, 
+                shortcuts=shortcuts, 
+                parameter_interpreters=parameter_interpreters, 
+                parameter_descriptors=parameter_descriptors,
+                callback=callback
+            )
 
-        self.add_option(opt, index)
+        self.insert_option(opt, index)
 
-    def __help_option__(self) -> None:
-        def output(slf):
-            # Usage section
-            if slf.usage is not None:
-                con.print(slf.style.header('usage'))
-                con.print(slf.style.indent(slf.usage))
+    def _help_content(self):
+        # What the help screen shows, formatted by the parser's
+        # `StyledOutput`. Rendering and caching live in `.help_cache`.
+        style = self._arg_parser.style
 
+        sections = []
 
-            sections = []
+        # Commands section
+        command_table = []
 
-            # Commands section
-            command_table = []
+        for k in self._command_order:
+            cmd = self._command_list[k]
+            lhs = ' '.join((
+                style.list(cmd.names),
+                style.parameters(cmd.parameter_descriptors)
+            )).rstrip()
+            command_table.append((lhs, cmd.help_text or ''))
 
-            for k in slf._command_order:
-                cmd = slf._command_list[k]
-                lhs = ' '.join([slf.style.list(cmd.names_str),
-                    slf.style.parameters(cmd.parameter_descriptors)])
-                command_table.append([lhs, cmd.help_text])
+        if len(command_table) > 0:
+            sections.append(('commands', tuple(command_table)))
 
-            if len(command_table) > 0:
-                cmd_sec = SimplePlainTable.Section(
-                    slf.style.header('commands'),
-                    command_table
-                )
-                sections.append(cmd_sec)
-            
-            # Options section
-            options_table = []
-
-            for k in slf._option_order:
-                opt = slf._option_list[k]
-                lhs = ' '.join(
-                    (
-                        slf.style.list(opt.shortcuts_str), 
-                        slf.style.parameters(opt.parameter_descriptors)
-                    )
-                )
-                options_table.append([lhs, opt.help_text])
+        # Options section
+        options_table = []
 
-            if len(options_table) > 0:
-                cmd_sec = SimplePlainTable.Section(
-                    slf.style.header('options'),
-                    options_table
-                )
-                sections.append(cmd_sec)
-
-            table = SimplePlainTable(
-                *sections, 
-                indentation=slf._arg_parser.style.std_indent,
-                highlight_rows=slf._arg_parser.style.table_alternate_rows,
-                header_style=slf._arg_parser.style.header,
-                console=slf._arg_parser.console
-            )
-            table.print()
+        for k in self._option_order:
+            opt = self._option_list[k]
+            lhs = ' '.join((
+                style.list(opt.shortcuts_str),
+                style.parameters(opt.parameter_descriptors)
+            )).rstrip()
+            options_table.append((lhs, opt.help_text or ''))
+
+        if len(options_table) > 0:
+            sections.append(('options', tuple(options_table)))
+
+        return (self.usage, tuple(sections))
+
+    def __help_option__(self) -> None:
+        def output(slf):
+            from .help_cache import print_help
+            print_help(slf)
 
         _callback = lambda *args, **kwargs: output(self)
         self.add_option(
@@ -418,7 +609,7 @@ class Command:
             key = key, 
             help_text = help_text, 
             shortcuts = shortcuts, 
-            parameter_interpreters = (lambda itr: int(next(itr)),), 
+            parameter_interpreters = (interpret_int,), 
             parameter_descriptors = (parameter_descriptor,), 
             callback = callback,
             index = index
@@ -437,7 +628,7 @@ class Command:
             key = key, 
             help_text = help_text, 
             shortcuts = shortcuts, 
-            parameter_interpreters = (lambda itr: float(next(itr)),), 
+            parameter_interpreters = (interpret_float,), 
             parameter_descriptors = (parameter_descriptor,), 
             callback = callback,
             index = index
@@ -456,9 +647,7 @@ class Command:
             key=key,
             help_text=help_text,
             shortcuts=shortcuts,
-            parameter_interpreters=(
-                lambda itr: next(itr),
-            ),
+            parameter_interpreters=(interpret_string,),
             parameter_descriptors=(parameter_descriptor,),
             callback=callback,
             index=index
@@ -473,16 +662,18 @@ class Command:
         element_parser: Callable[[str], Any],
         parameter_descriptor: str,
         callback: Callable[..., None], 
-        index: Optional[int] = None
+        index: Optional[int] = None,
+        dtype: Optional[Any] = None
     ) -> None:
+        # With a NumPy `dtype` the parsed list is a `numpy.ndarray`
         if list_delimiters is None:
-            list_delimiters = (('[', ']'), ('(', ')'), ('{', '}'))
+            list_delimiters = DEFAULT_LIST_DELIMITERS
         self.add_option(
             key=key,
             help_text=help_text,
             shortcuts=shortcuts,
             parameter_interpreters=(
-                lambda itr: parse_list(itr, list_delimiters, element_parser),
+                list_interpreter(list_delimiters, element_parser, dtype),
             ),
             parameter_descriptors=(parameter_descriptor,),
             callback=callback,
@@ -499,13 +690,12 @@ class Command:
         callback: Callable[..., None], 
         index: Optional[int] = None
     ) -> None:
-        valid_parameters = tuple(map(str, valid_parameters))
         self.add_option(
             key=key,
             help_text=help_text,
             shortcuts=shortcuts,
             parameter_interpreters=(
-                lambda itr: valid_parameters.index(next(itr)),
+                selection_interpreter(valid_parameters),
             ),
             parameter_descriptors=parameter_descriptors,
             callback=callback,
@@ -513,45 +703,120 @@ class Command:
         )        
 
 
+    def add_typed_option(
+        self,
+        key: str,
+        help_text: Optional[str],
+        *shortcuts: str,
+        callback: Callable[..., None],
+        index: Optional[int] = None
+    ) -> None:
+        # Parameters taken from the annotations of `callback`, see `.hints`
+        from .hints import interpreters_for
+        interpreters, descriptors = interpreters_for(callback)
+        self.add_option(
+            key=key,
+            help_text=help_text,
+            shortcuts=shortcuts,
+            parameter_interpreters=interpreters,
+            parameter_descriptors=descriptors,
+            callback=callback,
+            index=index
+        )
+
+    def add_typed_command(
+        self,
+        names: Iterable[str],
+        callback: Callable[..., None],
+        help_text: Optional[str] = None,
+        usage: Optional[str] = None,
+        commands: Optional[Iterable['Command']] = None,
+        options: Optional[Iterable['Option']] = None,
+        index: Optional[int] = None
+    ) -> None:
+        # Parameters taken from the positional parameters of `callback` and
+        # their annotations, see `.hints`. Options are passed by keyword.
+        from .hints import interpreters_for
+        interpreters, descriptors = interpreters_for(callback)
+        self.add_command(
+            names=names,
+            help_text=help_text,
+            usage=usage,
+            commands=commands,
+            parameter_interpreters=interpreters,
+            parameter_descriptors=descriptors,
+            options=options,
+            callback=callback,
+            index=index
+        )
+
+
     class Option:
         def __init__(
             self, 
             key: str, 
             help_text: Optional[str], 
             shortcuts: Iterable[str],
-            parameters: Iterable['Parameter'], 
+            parameter_interpreters: Iterable[Callable[[Iterator], Iterable]],
+            parameter_descriptors: Iterable[str], 
             callback: Callable[..., None]
         ) -> None:
             assert_type(key, str, name='key', optional=False)
             assert_type(help_text, str, name='help_text', optional=True)
             assert_iter_types(shortcuts, str, name='shortcuts', min_len=1)
-            assert_iter_types(parameters, self.__class__.Parameter, name='parameters')
+            assert_iter(parameter_interpreters, name='parameter_interpreters')
+            assert_iter_types(parameter_descriptors, str, name='parameter_descriptors')
             assert_func(callback, name='callback')
 
-            self.key = key
-            self.help_text = help_text
-            self._shortcuts = shortcuts
-            self._parameters = self.__class__.Parameter(
-                parameter_interpreters, parameter_descriptors
+            self._setup(
+                key,
+                help_text,
+                shortcuts,
+                Command.Parameter(
+                    list(parameter_interpreters),
+                    list(parameter_descriptors)
+                ),
+                callback
             )
-            self._callback = callback
+            self._validated = True
 
-        def __init__(
-            self, 
-            key: str, 
-            help_text: Optional[str], 
+        def _setup(
+            self,
+            key: str,
+            help_text: Optional[str],
             shortcuts: Iterable[str],
-            parameter_interpreters: Iterable[Callable[[Iterator], Iterable]],
-            parameter_descriptors: Iterable[str], 
+            parameters: 'Parameter',
             callback: Callable[..., None]
         ) -> None:
-            self.__init__(
-                key, 
-                help_text, 
-                shortcuts,
-                self.__class__.Parameter(parameter_interpreters, parameter_descriptors),
-                callback
+            # Assigns all attributes without validating them, see
+            # `Command._setup`.
+            self.key = key
+            self.help_text = help_text if help_text is not None else ''
+            self._shortcuts = list(shortcuts)
+            self._parameters = parameters
+            self._callback = callback
+            # Keys of the options whose callbacks run first, see
+            # `Command.add_callback_dependencies`
+            self._after = ()
+            self._validated = False
+
+        def _check(self) -> None:
+            # The checks of `__init__` on the attributes `_setup` assigned,
+            # see `ArgumentParser.freeze`
+            assert_type(self.key, str, name='key', optional=False)
+            assert_type(self.help_text, str, name=f'{self.key}.help_text')
+            assert_iter_types(
+                self._shortcuts, str, name=f'{self.key}.shortcuts', min_len=1
+            )
+            assert_iter_types(
+                self.parameter_descriptors, str,
+                name=f'{self.key}.parameter_descriptors'
             )
+            assert_func(self._callback, name=f'{self.key}.callback')
+
+        @property
+        def parameter_descriptors(self):
+            return self._parameters.descriptions
 
         @property
         def shortcuts(self): return self._shortcuts
@@ -561,15 +826,8 @@ class Command:
             return ['-' + sc if len(sc) == 1 else '--' + sc \
                 for sc in self._shortcuts]
 
-        def parse(self, args: Iterator[str]):
-            k = 0
-            output = []
-
-            for itp in self._parameters.interpreters:
-                _out = itp(args)
-                output.append(_out)
-
-            return _out
+        def parse(self, args: Iterator[str]) -> List[Any]:
+            return self._parameters.parse(args, self.shortcuts_str[0])
 
     class Parameter:
         # Add support for multiple parameter options
@@ -594,6 +852,20 @@ class Command:
             assert len(self._para_descs) == 1
             return self._para_descs[0]
 
+        def parse(self, args: Iterator[str], owner: str) -> List[Any]:
+            output = []
+
+            try:
+                for itp in self.interpreters:
+                    output.append(itp(args))
+            except StopIteration:
+                raise ArgumentError(
+                    f'`{owner}` expects {len(self.interpreters)} parameter(s): ' + \
+                    ' '.join(self.descriptions) + '.'
+                ) from None
+
+            return output
+
 
 class ArgumentParser(Command):
     def __init__(
@@ -601,31 +873,141 @@ class ArgumentParser(Command):
         program_name: str,
         version: str,
         callback: Callable[..., None], 
-        console: Optional[Console] = None,
+        console: Optional['Console'] = None,
         help_text: Optional[str] = None,
         style: StyledOutput = None,
-        std_help: bool = True
+        std_help: bool = True,
+        defer_validation: bool = False,
+        callback_workers: Optional[int] = None
     ) -> None:
+        # From here to the first parse, see `_parse_args`
+        construct_span = trace.maybe_span('construct', 'parser')
+
+        assert_type(program_name, str, name='program_name', optional=False)
+        assert_type(version, str, name='version', optional=False)
+
+        self._init_state(
+            program_name, version, console, style, defer_validation, callback_workers
+        )
+        self._construct_span = construct_span
+
         super().__init__(
             names=[program_name],
             arg_parser=self,
             help_text=help_text,
             usage=program_name,
             commands=None,
-            parameters=None,
             options=None,
             callback=callback,
             std_help=std_help
         )
+
+    def _init_state(
+        self,
+        program_name: str,
+        version: str,
+        console: Optional['Console'],
+        style: Optional[StyledOutput],
+        defer_validation: bool,
+        callback_workers: Optional[int]
+    ) -> None:
+        # The attributes of the parser itself, as opposed to those of its
+        # root command (see `Command._setup`), shared with `.spec`, which
+        # builds parsers without `__init__`
+        assert_type(style, StyledOutput, name='style', optional=True)
+        assert_type(defer_validation, bool, name='defer_validation', optional=False)
+        assert callback_workers is None or \
+            (type(callback_workers) == int and callback_workers > 0), \
+            '`callback_workers` must be a positive int or None.'
+
+        # With `defer_validation`, commands and options added through
+        # `add_command` and `add_option` (and the `add_*_option` helpers)
+        # are checked by `freeze`, all at once, instead of one by one
+        self._defer_validation = defer_validation
+        # Threads running option callbacks concurrently, see `.scheduler`
+        self.callback_workers = callback_workers
         self.program_name = program_name
         self.version = version
-        self.console = console if console is not None else Console()
-        assert_type(style, StyledOutput, name='style', optional=True)
+        self._console = console
         self.style = style if style is not None else StyledOutput()
-        self._std_help = std_help
-        self._arg_parser = self
-        if std_help:
-            self.__help_option__()
+        self._construct_span = None
+
+    @classmethod
+    def from_spec(
+        cls,
+        spec: Union[str, dict],
+        callbacks: Optional[dict] = None,
+        **kwargs
+    ) -> 'ArgumentParser':
+        # See `.spec` for the spec format and the compiled artifact cache.
+        # `kwargs` are those of `parser_from_spec`, `defer_validation` and
+        # `callback_workers` included.
+        from .spec import parser_from_spec
+        with trace.maybe_span('load spec', 'parser'):
+            return parser_from_spec(spec, callbacks, parser_class=cls, **kwargs)
+
+    def freeze(self) -> None:
+        # Checks every command and option that has not been checked yet, in
+        # a single pass over the tree with validators compiled once per type
+        # signature, and makes the tree read-only: commands and options can
+        # no longer be added, so resolvers compiled once are kept for good.
+        # Parsing trusts the tree from then on.
+        if self._frozen:
+            return
+        with trace.maybe_span('freeze', 'parser'):
+            self._freeze()
+
+    def _freeze(self) -> None:
+        are_strs = iter_types_validator((str,))
+
+        commands = [self]
+        while commands:
+            cmd = commands.pop()
+            if not cmd._validated:
+                cmd._check()
+                cmd._validated = True
+
+            # The options of a command are checked together, and one by one
+            # only to find the one at fault
+            pending = [opt for opt in cmd._option_list if not opt._validated]
+            shortcuts = [opt._shortcuts for opt in pending]
+            if not (
+                    are_strs([opt.key for opt in pending]) and
+                    are_strs([opt.help_text for opt in pending]) and
+                    all(map(len, shortcuts)) and
+                    are_strs(list(chain.from_iterable(shortcuts))) and
+                    are_strs(list(chain.from_iterable(
+                        opt.parameter_descriptors for opt in pending
+                    ))) and
+                    all(callable(opt._callback) for opt in pending)):
+                for opt in pending:
+                    opt._check()
+            for opt in pending:
+                opt._validated = True
+
+            cmd._frozen = True
+            commands.extend(cmd._command_list)
+
+    def serve(self, socket_path: Optional[str] = None) -> None:
+        # Hosts this parser for `.client` launchers, see `.server`
+        from .server import serve
+        serve(self, socket_path)
+
+    def completion_script(self, shell: str) -> str:
+        # bash, zsh or fish, see `.completion`
+        from .completion import completion_script
+        return completion_script(self.program_name, shell)
+
+    @property
+    def console(self) -> 'Console':
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+    @console.setter
+    def console(self, console: 'Console') -> None:
+        self._console = console
 
     def add_version_option(
         self,
@@ -635,11 +1017,15 @@ class ArgumentParser(Command):
         assert_type(text, str, name='text', optional=True)
         assert_type(index, int, name='index', optional=True)
 
+        if text is None:
+            text = '{name} {version}'
+
         self.add_option(
             key = 'version',
             help_text = 'Display the program\'s version',
             shortcuts = ('V', 'version'),
-            parameters = (),
+            parameter_interpreters = (),
+            parameter_descriptors = (),
             callback = lambda *args, **kwargs: self.console.print(
                 text.format(
                     name = self.program_name, 
@@ -649,9 +1035,61 @@ class ArgumentParser(Command):
             index = index
         )
 
-    def parse(start_index: int = 1) -> None:
-        args = argv[start_index:]
+    def parse(
+        self, 
+        start_index: int = 1, 
+        argument_string: str = None,
+        argument_list: str = None,
+        argument_sources: bool = True
+    ) -> None:
+        args = self._arguments(argument_string, argument_list)
+
+        # Hidden entry point of the generated completion scripts, answered
+        # before anything else is set up
+        if len(args) > start_index and args[start_index] == '__complete':
+            from .completion import run_complete
+            run_complete(self, args[start_index+1:])
+            return
+
+        self.dispatch(self.parse_args(args, start_index, argument_sources))
+
+    def parse_args(
+        self,
+        args: Optional[Sequence[str]] = None,
+        start_index: int = 1,
+        argument_sources: bool = True
+    ) -> ParseResult:
+        if self._construct_span is not None:
+            self._construct_span.end()
+            self._construct_span = None
+
+        with trace.maybe_span('parse', 'parser'):
+            return self._parse_args(args, start_index, argument_sources)
+
+    def _parse_args(
+        self,
+        args: Optional[Sequence[str]],
+        start_index: int,
+        argument_sources: bool
+    ) -> ParseResult:
+        if args is None:
+            args = argv
+
+        # Deferred checks run before the tree is trusted
+        if self._defer_validation and not self._frozen:
+            self.freeze()
+
+        # `@file` and `--args-from FILE|-` are expanded lazily while parsing,
+        # see `.sources`
+        if argument_sources:
+            from .sources import has_sources, expand_sources, StreamingCursor
+
+            if has_sources(args, start_index):
+                return self._parse_cursor(
+                    StreamingCursor(expand_sources(islice(args, start_index, None))),
+                    ()
+                )
 
-        super().parse(start_index=0, argument_list=args)
+        return super().parse_args(args, start_index)
 
 
@@ -0,0 +1,170 @@
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+from typing import List, Optional
+
+
+# The thin half of `.server`: forwards argv, environment, working directory
+# and terminal size of this process to a warm parser process and replays
+# its output. Only the standard library is imported here, so a launcher
+# script stays fast:
+#
+#   import sys
+#   from fastui.terminal.client import run
+#
+#   code = run('my-program')
+#   if code is None:
+#       # No server is running, parse in-process instead
+#       ...
+#   sys.exit(code)
+
+# Frames are a one byte type and a big-endian payload length
+FRAME_HEADER = struct.Struct('>cI')
+
+STDOUT = b'o'
+STDERR = b'e'
+EXIT = b'x'
+
+
+# The client sends its whole environment, secrets included, so it only
+# talks to sockets of its own user: in a directory only the user can enter,
+# with mode 0600, and with the user at the other end (`SO_PEERCRED`, where
+# the platform has it). Anything else is treated as no server at all.
+
+def _is_private(st: os.stat_result, kind: int, mode: int) -> bool:
+    return stat.S_IFMT(st.st_mode) == kind and st.st_uid == os.getuid() and \
+        stat.S_IMODE(st.st_mode) == mode
+
+def socket_directory(create: bool = False) -> Optional[str]:
+    # `$XDG_RUNTIME_DIR`, or `/tmp/fastui-UID` created with mode 0700.
+    # `None` if the directory is missing or not private to this user.
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    path = runtime if runtime else os.path.join('/tmp', f'fastui-{os.getuid()}')
+
+    if create and not runtime:
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    return path if _is_private(st, stat.S_IFDIR, 0o700) else None
+
+def default_socket_path(program_name: str, create: bool = False) -> Optional[str]:
+    directory = socket_directory(create)
+    if directory is None:
+        return None
+    return os.path.join(directory, f'fastui-{program_name}.sock')
+
+def is_own_socket(path: str) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return _is_private(st, stat.S_IFSOCK, 0o600)
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    # The user at the other end of a connected socket, `None` where the
+    # platform cannot tell
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    return struct.unpack('3i', creds)[1]
+
+def _terminal_size() -> Optional[os.terminal_size]:
+    try:
+        return os.get_terminal_size(sys.stdout.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def encode_request(argv: List[str]) -> bytes:
+    size = _terminal_size()
+
+    request = json.dumps({
+        'argv': argv,
+        'env': dict(os.environ),
+        'cwd': os.getcwd(),
+        'columns': size.columns if size is not None else None,
+        'lines': size.lines if size is not None else None,
+        'isatty': size is not None and sys.stdout.isatty(),
+    }).encode('utf-8', 'surrogateescape')
+
+    return struct.pack('>I', len(request)) + request
+
+def recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    chunks = []
+    while n > 0:
+        chunk = sock.recv(n)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b''.join(chunks)
+
+def run(
+    program_name: Optional[str] = None,
+    argv: Optional[List[str]] = None,
+    socket_path: Optional[str] = None
+) -> Optional[int]:
+    # Returns the exit code of the remote invocation, or `None` if no
+    # server of this user is listening.
+    argv = argv if argv is not None else sys.argv
+    if socket_path is None:
+        socket_path = default_socket_path(
+            program_name if program_name is not None else os.path.basename(argv[0])
+        )
+    if socket_path is None or not is_own_socket(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        uid = peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+    if uid is not None and uid != os.getuid():
+        sock.close()
+        return None
+
+    with sock:
+        sock.sendall(encode_request(argv))
+
+        out = sys.stdout.buffer
+        err = sys.stderr.buffer
+
+        while True:
+            header = recv_exact(sock, FRAME_HEADER.size)
+            if header is None:
+                # The server died mid-invocation
+                return 1
+
+            kind, length = FRAME_HEADER.unpack(header)
+            payload = recv_exact(sock, length) if length else b''
+            if payload is None:
+                return 1
+
+            if kind == STDOUT:
+                out.write(payload)
+                out.flush()
+            elif kind == STDERR:
+                err.write(payload)
+                err.flush()
+            elif kind == EXIT:
+                return struct.unpack('>i', payload)[0]
+
+
+if __name__ == '__main__':
+    # python -m fastui.terminal.client SOCKET PROGRAM [ARGS...]
+    code = run(argv=sys.argv[2:], socket_path=sys.argv[1])
+    if code is None:
+        print(f'No fastui server of this user is listening on `{sys.argv[1]}`.',
+            file=sys.stderr)
+        code = 1
+    sys.exit(code)
@@ -0,0 +1,151 @@
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .text_layout import _re_markup
+
+
+# Sections built from columns: NumPy structured arrays, or sequences of
+# column arrays. Every column is formatted as a whole, by one `%` of a
+# format repeated for all of its cells, and measured as a whole, through a
+# single string joining them. Building a section of half a million numbers
+# therefore never runs Python code per cell; rows are assembled by `zip` at
+# the end. (`numpy.char.mod` calls the format per element and is several
+# times slower than this.)
+#
+# Numeric columns are right aligned unless told otherwise. Alignment pads
+# every cell of a column to the width of the widest one, so cells line up
+# however wide the table makes the column.
+#
+# Formats are printf-style (`'%.2f'`, `'%+d'`, `'%8.3e'`) with a single
+# conversion. Columns without one are converted like `str`.
+
+ALIGNMENTS = ('left', 'right', 'center')
+
+# A single numeric conversion without a width or the space flag
+_re_number_format = re.compile(r'%[-+0#]*(?:\.\d+)?[diouxXeEfFgG]')
+
+# Cells of spaces only, in a column joined by new lines
+_re_blank = re.compile(r'^ *$', re.M)
+
+# (widest word, widest cell) of a column, `None` when its cells have to be
+# measured one by one
+ColumnMeasure = Optional[Tuple[int, int]]
+
+
+def _is_structured(data: Any) -> bool:
+    return type(data).__module__ == 'numpy' and \
+        getattr(getattr(data, 'dtype', None), 'names', None) is not None
+
+def _bulk_format(fmt: str, values: Sequence[Any]) -> List[str]:
+    # `[fmt % value for value in values]`, in one call
+    if len(values) == 0:
+        return []
+    cells = ((fmt + '\n') * len(values) % tuple(values)).split('\n')
+    if len(cells) != len(values) + 1:
+        # Formats producing new lines
+        return [fmt % value for value in values]
+    cells.pop()
+    return cells
+
+def _format_column(np, column: Any, fmt: Optional[str], align: Optional[str]):
+    column = np.asarray(column)
+    assert column.ndim == 1, \
+        'Columns must be one-dimensional.'
+    assert fmt is None or type(fmt) == str, \
+        'Column formats must be printf-style strings.'
+    assert align is None or align in ALIGNMENTS, \
+        f'Column alignment must be one of {", ".join(ALIGNMENTS)}.'
+
+    kind = column.dtype.kind
+    if kind == 'S' and fmt is None:
+        column = np.char.decode(column, 'utf-8')
+        kind = 'U'
+
+    if kind == 'U' and fmt is None:
+        cells = column.tolist()
+    else:
+        cells = _bulk_format(fmt if fmt is not None else '%s', column.tolist())
+
+    if align is None:
+        align = 'right' if kind in 'biufc' else 'left'
+
+    widest = max(map(len, cells), default=0)
+    if kind in 'biufc' and (fmt is None or _re_number_format.fullmatch(fmt)):
+        # Numbers as `str` or a bare conversion write them: one word of
+        # plain ASCII
+        measure = (widest, widest)
+    else:
+        measure = _measure_column(cells, widest, align != 'left')
+
+    if align == 'right':
+        cells = _bulk_format(f'%{widest}s', cells)
+    elif align == 'center':
+        cells = [cell.center(widest) for cell in cells]
+
+    return cells, measure
+
+def _measure_column(cells: Sequence[str], widest: int, aligned: bool) -> ColumnMeasure:
+    # What `TextLayout` would measure for every cell, for columns whose
+    # cells are all plain ASCII. Alignment does not change the words of a
+    # cell, but turns blank cells into `widest` spaces.
+    joined = '\n'.join(cells)
+    if joined.count('\n') != max(len(cells) - 1, 0) or not joined.isascii() or \
+            not joined.replace('\n', '').isprintable() or \
+            _re_markup.search(joined) is not None:
+        return None
+
+    if ' ' not in joined:
+        return (widest, widest)
+
+    # The widest word, or the whole cell for cells of spaces only
+    words = max(map(len, joined.split()), default=0)
+    blanks = _re_blank.findall(joined)
+    if blanks:
+        words = max(words, widest if aligned else max(map(len, blanks)))
+    return (words, widest)
+
+def from_columns(
+    columns: Any,
+    formats: Optional[Sequence[Optional[str]]] = None,
+    align: Optional[Sequence[Optional[str]]] = None
+) -> Tuple[Tuple[Tuple[str, ...], ...], Tuple[ColumnMeasure, ...]]:
+    # Rows and column measures of a structured array, or of a sequence of
+    # column arrays
+    import numpy as np
+
+    if _is_structured(columns):
+        columns = [columns[name] for name in columns.dtype.names]
+    else:
+        columns = list(columns)
+
+    assert len(columns) > 0, \
+        'At least one column is required.'
+    assert formats is None or len(formats) == len(columns), \
+        'There must be one format per column.'
+    assert align is None or len(align) == len(columns), \
+        'There must be one alignment per column.'
+    assert len(set(len(column) for column in columns)) == 1, \
+        'All columns must have the same length.'
+
+    texts, measures = zip(*(
+        _format_column(
+            np, column,
+            formats[k] if formats is not None else None,
+            align[k] if align is not None else None
+        )
+        for k, column in enumerate(columns)
+    ))
+    return tuple(zip(*texts)), measures
+
+def combine_measures(sections: Sequence[Any]) -> Optional[Tuple[ColumnMeasure, ...]]:
+    # Column measures over several sections, `None` unless all of them were
+    # built from columns
+    measures = [sec.measures for sec in sections if sec.height > 0]
+    if len(measures) == 0 or any(m is None for m in measures):
+        return None
+
+    return tuple(
+        None if any(m is None for m in column) else
+            (max(m[0] for m in column), max(m[1] for m in column))
+        for column in zip(*measures)
+    )
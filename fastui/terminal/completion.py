@@ -0,0 +1,252 @@
+import marshal
+import os
+import sys
+from bisect import bisect_left
+
+from .._cache import cache_directory, write_atomic
+
+# `typing.TYPE_CHECKING`: `typing` alone takes longer to import than
+# answering a completion, so annotations are strings here
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Sequence, Tuple
+    from .argument_parsing import ArgumentParser, Command
+
+    Index = Tuple[Tuple[str, ...], Tuple[str, ...], Dict[str, int], Dict[str, Any]]
+
+
+# Shell completion. The generated scripts call the program back as
+#
+#   my-program __complete WORD... CURRENT
+#
+# with the words typed so far, and offer every line it prints. That path
+# never imports `rich` or builds help tables: it walks an index of command
+# names and option flags and looks the current word up with a bisection.
+#
+# `ArgumentParser.parse` answers `__complete` itself. Every answer also
+# stores the index of the whole tree next to the cache of `.spec` (again
+# whenever the tree changed), stamped with the program's script and version,
+# so that big programs can answer before building their parser at all:
+#
+#   from fastui.terminal.completion import complete_from_index
+#   complete_from_index('my-program', version=__version__)   # exits if the index answered
+#   parser = build_parser()   # with the same `version`
+#   parser.parse()
+#
+# The version is what tells an upgraded package from the one the index was
+# built for: console_scripts wrappers do not change with the package. A
+# program whose tree does not only depend on its script and version
+# (plugins, say) should not take the shortcut.
+
+COMPLETE_COMMAND = '__complete'
+
+SHELLS = ('bash', 'zsh', 'fish')
+
+INDEX_FORMAT_VERSION = 2
+
+# An index is a tuple of the command names, the option flags, the parameter
+# count by shortcut and the children by command name, the children being
+# indexes themselves or commands whose index was not needed yet.
+
+
+def completion_index(command: 'Command') -> 'Index':
+    # Built once per command, dropped whenever a command or option is added
+    if command._completion is None:
+        flags = []
+        arity = {}
+        for opt in command._option_list:
+            flags.extend(opt.shortcuts_str)
+            for shortcut in opt.shortcuts:
+                arity[shortcut] = len(opt._parameters.interpreters)
+
+        children = {}
+        for name, k in command._command_keys.items():
+            children[name] = command._command_list[k]
+
+        command._completion = (
+            tuple(sorted(command._command_keys)),
+            tuple(sorted(flags)),
+            arity,
+            children
+        )
+    return command._completion
+
+def _child_index(child: 'Any') -> 'Index':
+    return child if type(child) == tuple else completion_index(child)
+
+def _frozen_index(command: 'Command') -> 'Index':
+    # The whole tree, with every child resolved, for `marshal`
+    names, flags, arity, children = completion_index(command)
+    frozen = {}
+    for child in set(children.values()):
+        frozen[id(child)] = _frozen_index(child)
+    return (
+        names,
+        flags,
+        arity,
+        {name: frozen[id(child)] for name, child in children.items()}
+    )
+
+def _with_prefix(candidates: 'Tuple[str, ...]', prefix: str) -> 'List[str]':
+    matches = []
+    for k in range(bisect_left(candidates, prefix), len(candidates)):
+        if not candidates[k].startswith(prefix):
+            break
+        matches.append(candidates[k])
+    return matches
+
+def complete(index: 'Index', words: 'Sequence[str]') -> 'List[str]':
+    if len(words) == 0:
+        words = ['']
+    current = words[-1]
+
+    owed = 0
+    for word in words[:-1]:
+        # Parameters of the previous option
+        if owed > 0:
+            owed -= 1
+        elif word == '--':
+            return []
+        elif word.startswith('--'):
+            name, eq, _ = word[2:].partition('=')
+            owed = 0 if eq else index[2].get(name, 0)
+        elif word.startswith('-') and len(word) > 1:
+            # Only the last flag of a bundle can take the next word
+            owed = index[2].get(word[-1], 0)
+        elif word in index[3]:
+            index = _child_index(index[3][word])
+
+    # Leave parameters to the shell's default completion
+    if owed > 0:
+        return []
+
+    if current.startswith('-'):
+        return _with_prefix(index[1], current)
+    return _with_prefix(index[0], current)
+
+
+def _identifier(program_name: str) -> str:
+    return ''.join(c if c.isalnum() else '_' for c in program_name)
+
+def _script_stamp(version: str) -> 'Optional[Tuple[str, int, int, str]]':
+    try:
+        path = os.path.abspath(sys.argv[0])
+        st = os.stat(path)
+    except (IndexError, OSError):
+        return None
+    return (path, st.st_mtime_ns, st.st_size, version)
+
+def _index_path(program_name: str) -> str:
+    return cache_directory('completion', _identifier(program_name) + '.idx')
+
+def load_index(program_name: str, version: str) -> 'Optional[Index]':
+    # `None` unless an index was stored for the unchanged script, and the
+    # program at `version`
+    stamp = _script_stamp(version)
+    if stamp is None:
+        return None
+
+    try:
+        with open(_index_path(program_name), 'rb') as fh:
+            fmt, stored_stamp, index = marshal.loads(fh.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if fmt != INDEX_FORMAT_VERSION or tuple(stored_stamp) != stamp:
+        return None
+    return index
+
+def store_index(parser: 'ArgumentParser') -> None:
+    # Writes the index of `parser`, unless the stored one is the same
+    stamp = _script_stamp(parser.version)
+    if stamp is None:
+        return
+
+    path = _index_path(parser.program_name)
+    data = marshal.dumps((INDEX_FORMAT_VERSION, stamp, _frozen_index(parser)))
+    try:
+        with open(path, 'rb') as fh:
+            if fh.read() == data:
+                return
+    except OSError:
+        pass
+
+    try:
+        write_atomic(path, data)
+    except OSError:
+        # Completion works without the cache
+        pass
+
+def _write(candidates: 'List[str]') -> None:
+    if candidates:
+        sys.stdout.write('\n'.join(candidates) + '\n')
+    sys.stdout.flush()
+
+def run_complete(parser: 'ArgumentParser', words: 'Sequence[str]') -> None:
+    _write(complete(completion_index(parser), words))
+    store_index(parser)
+
+def complete_from_index(
+    program_name: str,
+    args: 'Optional[Sequence[str]]' = None,
+    start_index: int = 1,
+    version: 'Optional[str]' = None
+) -> None:
+    # Answers and exits if `args` ask for completions and a stored index
+    # is still valid for `version`, the version of the parser, returns
+    # otherwise. Without `version` there is nothing to check an index
+    # against, and it always returns.
+    if args is None:
+        args = sys.argv
+    if version is None or len(args) <= start_index or args[start_index] != COMPLETE_COMMAND:
+        return
+
+    index = load_index(program_name, version)
+    if index is not None:
+        _write(complete(index, args[start_index+1:]))
+        sys.exit(0)
+
+
+_BASH = '''\
+_fastui_complete_{ident}() {{
+    local IFS=$'\\n'
+    COMPREPLY=( $({prog} {complete} "${{COMP_WORDS[@]:1:$COMP_CWORD}}" 2>/dev/null) )
+}}
+complete -o default -F _fastui_complete_{ident} {prog}
+'''
+
+_ZSH = '''\
+#compdef {prog}
+_fastui_complete_{ident}() {{
+    local -a candidates
+    candidates=("${{(@f)$({prog} {complete} "${{(@)words[2,CURRENT]}}" 2>/dev/null)}}")
+    if (( ${{#candidates}} )) && [[ -n "${{candidates[1]}}" ]]; then
+        compadd -- "${{candidates[@]}}"
+    else
+        _files
+    fi
+}}
+compdef _fastui_complete_{ident} {prog}
+'''
+
+_FISH = '''\
+function __fastui_complete_{ident}
+    set -l tokens (commandline -opc)
+    # Quoted, so that an empty current token is still passed
+    set -l current (commandline -ct)
+    {prog} {complete} $tokens[2..-1] "$current" 2>/dev/null
+end
+complete -c {prog} -a '(__fastui_complete_{ident})'
+'''
+
+def completion_script(program_name: str, shell: str) -> str:
+    assert shell in SHELLS, \
+        f'`shell` must be one of {", ".join(SHELLS)}.'
+
+    template = {'bash': _BASH, 'zsh': _ZSH, 'fish': _FISH}[shell]
+    return template.format(
+        prog=program_name,
+        ident=_identifier(program_name),
+        complete=COMPLETE_COMMAND,
+    )
@@ -0,0 +1,230 @@
+import io
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+
+# Tables as CSV, TSV, JSON Lines or Markdown, written without rich. Rows are
+# formatted a chunk of `EXPORT_CHUNK_ROWS` at a time: CSV and TSV by the
+# `csv` module's writer, the other formats by a single `%` of a line format
+# repeated for every row of the chunk, with cells escaped in one pass over a
+# string joining all of them (as `.columns` formats columns). Each chunk is
+# encoded and written at once, to the binary buffer of text files.
+#
+# With `titles`, every row starts with the title of its section (a
+# `section` column or key), and Markdown gets a heading and a table per
+# section. `columns` names the columns: a header row, or the keys of JSON
+# objects instead of arrays.
+
+EXPORT_FORMATS = ('csv', 'tsv', 'jsonl', 'markdown')
+
+EXPORT_CHUNK_ROWS = 1 << 14
+
+# Joins cells to escape them in one pass, if none of them contains it. A
+# private use character: none of the formats escapes it.
+_SEPARATOR = '\ue000'
+
+# (title, rows), rows in a sequence or any iterable
+ExportSection = Tuple[str, Iterable[Sequence[str]]]
+
+
+def _chunks(rows: Iterable[Sequence[str]], size: int) -> Iterator[Sequence[Sequence[str]]]:
+    if isinstance(rows, (list, tuple)):
+        for k in range(0, len(rows), size):
+            yield rows[k:k+size]
+        return
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+def _bulk_escape(cells: Sequence[str], escape, escape_cell, clean) -> Sequence[str]:
+    # `[escape_cell(cell) for cell in cells]`, with `escape` doing the same
+    # to a string of several cells. Nothing is escaped if `clean` finds
+    # nothing to escape in all of them.
+    if clean(''.join(cells)):
+        return cells
+    joined = _SEPARATOR.join(cells)
+    if joined.count(_SEPARATOR) != max(len(cells) - 1, 0):
+        return [escape_cell(cell) for cell in cells]
+    return escape(joined).split(_SEPARATOR)
+
+def _bulk_lines(fmt: str, rows: Sequence[Sequence[str]], escape, escape_cell, clean) -> str:
+    # `fmt % row` of every row, escaped
+    cells = _bulk_escape(list(chain.from_iterable(rows)), escape, escape_cell, clean)
+    return fmt * len(rows) % tuple(cells)
+
+def _csv_lines(sections: Iterable[ExportSection], columns, titles, chunk_rows, delimiter):
+    # Chunks without anything to quote are formatted like the other formats,
+    # the rest by the `csv` module
+    import csv
+
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=delimiter, lineterminator='\n')
+    # Only characters of the line terminator are quoted by `QUOTE_MINIMAL`,
+    # up to Python 3.11 a bare `\r` is not: rows with one are all quoted
+    quoting_writer = csv.writer(out, delimiter=delimiter, lineterminator='\n',
+        quoting=csv.QUOTE_ALL)
+
+    def write(rows):
+        for row in rows:
+            if any('\r' in cell for cell in row):
+                quoting_writer.writerow(row)
+            else:
+                writer.writerow(row)
+
+    if columns is not None:
+        write([['section', *columns] if titles else columns])
+    yield out.getvalue()
+
+    def clean(text):
+        return delimiter not in text and '"' not in text and \
+            '\n' not in text and '\r' not in text
+
+    for title, rows in sections:
+        prefix = (title,)
+        fmt = None
+
+        for chunk in _chunks(rows, chunk_rows):
+            count = len(chunk[0])
+            # Rows of a single field are quoted when it is empty
+            if fmt is None and titles + count > 1 and (clean(title) or not titles):
+                fmt = delimiter.join(
+                    ([title.replace('%', '%%')] if titles else []) + ['%s'] * count
+                ) + '\n'
+
+            cells = list(chain.from_iterable(chunk))
+            if fmt is not None and clean(''.join(cells)):
+                yield fmt * len(chunk) % tuple(cells)
+                continue
+
+            out.seek(0)
+            out.truncate()
+            rows = map(prefix.__add__, map(tuple, chunk)) if titles else chunk
+            if '\r' in ''.join(cells) or (titles and '\r' in title):
+                write(rows)
+            else:
+                writer.writerows(rows)
+            yield out.getvalue()
+
+def _json_format(title: str, count: int, columns, titles) -> str:
+    # The line format of the rows of a section. Everything but the cells is
+    # fixed, `%` included.
+    from json.encoder import encode_basestring
+
+    fixed = [encode_basestring(title).replace('%', '%%')] if titles else []
+    cells = fixed + ['"%s"'] * count
+    if columns is None:
+        return '[' + ','.join(cells) + ']\n'
+
+    assert len(columns) == count, 'There must be one name per column.'
+    keys = ['section', *columns] if titles else list(columns)
+    assert len(set(keys)) == len(keys), 'Keys of JSON objects must be unique.'
+    return '{' + ','.join(
+        encode_basestring(key).replace('%', '%%') + ':' + cell
+        for key, cell in zip(keys, cells)
+    ) + '}\n'
+
+def _json_lines(sections: Iterable[ExportSection], columns, titles, chunk_rows):
+    from json.encoder import encode_basestring
+
+    def escape(text):
+        # The quotes go around every cell once split
+        return encode_basestring(text)[1:-1]
+
+    def clean(text):
+        return '"' not in text and '\\' not in text and text.isprintable()
+
+    for title, rows in sections:
+        fmt = None
+        for chunk in _chunks(rows, chunk_rows):
+            if fmt is None:
+                fmt = _json_format(title, len(chunk[0]), columns, titles)
+            yield _bulk_lines(fmt, chunk, escape, escape, clean)
+
+def _markdown_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('|', '\\|').replace('\r\n', '<br>') \
+        .replace('\n', '<br>').replace('\r', '<br>')
+
+def _markdown_clean(text: str) -> bool:
+    return '|' not in text and '\\' not in text and '\n' not in text and '\r' not in text
+
+def _markdown_row(cells: Sequence[str]) -> str:
+    return '| ' + ' | '.join(cells) + ' |\n'
+
+def _markdown_lines(sections: Iterable[ExportSection], columns, titles, chunk_rows):
+    table_started = False
+    for title, rows in sections:
+        fmt = None
+        chunks = _chunks(rows, chunk_rows)
+        chunk = next(chunks, None)
+        if chunk is None and columns is None:
+            continue
+        count = len(columns) if columns is not None else len(chunk[0])
+
+        if titles or not table_started:
+            heading = f'## {_markdown_escape(title)}\n\n' if titles else ''
+            gap = '\n' if table_started else ''
+            header = _markdown_row(
+                map(_markdown_escape, columns) if columns is not None else [''] * count
+            )
+            yield gap + heading + header + '|' + '---|' * count + '\n'
+            table_started = True
+
+        fmt = _markdown_row(['%s'] * count)
+        while chunk is not None:
+            assert len(chunk[0]) == count, 'There must be one name per column.'
+            yield _bulk_lines(fmt, chunk, _markdown_escape, _markdown_escape, _markdown_clean)
+            chunk = next(chunks, None)
+
+def export_lines(
+    sections: Iterable[ExportSection],
+    format: str = 'csv',
+    columns: Optional[Sequence[str]] = None,
+    titles: bool = True,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[str]:
+    # The export of `sections`, in chunks of lines
+    assert format in EXPORT_FORMATS, \
+        f'Export format must be one of {", ".join(EXPORT_FORMATS)}.'
+    assert columns is None or all(type(c) == str for c in columns), \
+        'Column names must be strings.'
+    assert chunk_rows > 0
+
+    if format == 'csv':
+        return _csv_lines(sections, columns, titles, chunk_rows, ',')
+    if format == 'tsv':
+        return _csv_lines(sections, columns, titles, chunk_rows, '\t')
+    if format == 'jsonl':
+        return _json_lines(sections, columns, titles, chunk_rows)
+    return _markdown_lines(sections, columns, titles, chunk_rows)
+
+def export(
+    sections: Iterable[ExportSection],
+    file: Any,
+    format: str = 'csv',
+    columns: Optional[Sequence[str]] = None,
+    titles: bool = True,
+    encoding: str = 'utf-8',
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> None:
+    # Writes the export of `sections` to `file`, binary or text
+    lines = export_lines(sections, format, columns, titles, chunk_rows)
+
+    if isinstance(file, io.TextIOBase):
+        buffer = getattr(file, 'buffer', None)
+        if buffer is None:
+            for chunk in lines:
+                file.write(chunk)
+            file.flush()
+            return
+        # Whatever was written as text goes first, in the file's encoding
+        file.flush()
+        file, encoding = buffer, file.encoding
+
+    for chunk in lines:
+        if chunk:
+            file.write(chunk.encode(encoding))
+    file.flush()
@@ -0,0 +1,150 @@
+import hashlib
+import marshal
+import os
+from typing import Optional, Tuple, TYPE_CHECKING
+
+from .._cache import cache_directory, write_atomic
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from .argument_parsing import Command
+    from .styled_output import StyledOutput
+
+
+# Rendered help screens are cached on disk. The key covers everything the
+# output depends on: the text of the screen (usage, and the rows of every
+# section after `StyledOutput` formatted them), the console's width, color
+# system, encoding and whether it is a terminal (see `.plain_render`), and
+# the remaining `StyledOutput` settings. A hit is read
+# and written to the console's file in one go, without building or laying
+# out any table.
+#
+# The cache is bounded in size; the least recently shown screens are
+# evicted first. `FASTUI_HELP_CACHE_MAX_BYTES` overrides the bound, `0`
+# turns the cache off.
+
+# Bumped whenever the renderer changes what a screen looks like
+HELP_CACHE_FORMAT_VERSION = 2
+
+HELP_CACHE_MAX_BYTES = 8 << 20
+
+# (usage, ((title, rows), ...))
+HelpContent = Tuple[Optional[str], Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...]]
+
+
+def max_cache_bytes() -> int:
+    try:
+        return int(os.environ.get('FASTUI_HELP_CACHE_MAX_BYTES', HELP_CACHE_MAX_BYTES))
+    except ValueError:
+        return HELP_CACHE_MAX_BYTES
+
+def help_key(
+    content: HelpContent,
+    console: 'Console',
+    style: 'StyledOutput'
+) -> str:
+    return hashlib.sha256(marshal.dumps((
+        HELP_CACHE_FORMAT_VERSION,
+        content,
+        console.width,
+        console.color_system,
+        console.no_color,
+        console.is_terminal,
+        console.encoding,
+        style.indent,
+        style.table_alternate_rows,
+        # Header and usage lines only go through `header` at render time
+        style.header('usage'),
+        tuple(style.header(title) for title, _ in content[1]),
+    ))).hexdigest()
+
+def render_help(
+    content: HelpContent,
+    console: 'Console',
+    style: 'StyledOutput'
+) -> str:
+    from .tables import SimplePlainTable
+
+    usage, sections = content
+
+    with console.capture() as capture:
+        if usage:
+            console.print(style.header('usage'))
+            console.print(' ' * style.indent + usage)
+
+        if len(sections) > 0:
+            SimplePlainTable(
+                *(SimplePlainTable.Section(title, rows)
+                    for title, rows in sections),
+                indentation=style.indent,
+                highlight_rows=style.table_alternate_rows,
+                header_style=style.header,
+                console=console
+            ).print()
+
+    return capture.get()
+
+def _evict(directory: str, max_bytes: int) -> None:
+    entries = []
+    total = 0
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.txt'):
+            st = entry.stat()
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total += st.st_size
+
+    # Oldest first
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        total -= size
+
+def print_help(
+    command: 'Command',
+    cache_dir: Optional[str] = None
+) -> None:
+    parser = command._arg_parser
+    console = parser.console
+    style = parser.style
+    content = command._help_content()
+
+    max_bytes = max_cache_bytes()
+    if max_bytes <= 0:
+        console.file.write(render_help(content, console, style))
+        console.file.flush()
+        return
+
+    directory = cache_dir if cache_dir is not None else cache_directory('help')
+    path = os.path.join(directory, help_key(content, console, style) + '.txt')
+
+    try:
+        with open(path, 'rb') as fh:
+            text = fh.read().decode('utf-8')
+    except (OSError, UnicodeDecodeError):
+        text = None
+
+    if text is not None:
+        console.file.write(text)
+        console.file.flush()
+        # Recently shown screens are evicted last
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return
+
+    text = render_help(content, console, style)
+    console.file.write(text)
+    console.file.flush()
+
+    try:
+        write_atomic(path, text.encode('utf-8'))
+        _evict(directory, max_bytes)
+    except OSError:
+        # Help works without the cache
+        pass
@@ -0,0 +1,190 @@
+import collections.abc
+import enum
+import inspect
+import types
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+from .argument_parsing import DEFAULT_LIST_DELIMITERS, interpret_string, \
+    list_interpreter
+from .resolver import ArgumentError
+
+
+# Parameter interpreters derived from the annotations of a callback:
+#
+#   def resize(width: int, height: Optional[int], unit: Unit, files: list[Path]): ...
+#
+# `str` takes the argument as it is, `Enum`s take member names, `list[...]`
+# (or `List`, `Sequence`, `tuple[int, ...]`) takes lists as
+# `add_list_option` does, and any other class is called with the argument
+# (`int`, `Path`, `Decimal`). Arguments the class rejects raise
+# `ArgumentError`, naming the argument. Parameters with a default may be
+# left out when no argument is left for them, and take their default;
+# `Optional[...]` ones without a default take `None`.
+#
+# Resolving annotations is slow, `typing.get_type_hints` above all, so the
+# interpreters are built once per signature: callbacks with the same
+# parameters, annotations and defaults share them, and checking a callback
+# against the cache only reads its code object, `__annotations__` and
+# `__defaults__`. Interpreters
+# themselves only add a `try` to hand-written ones.
+
+Interpreter = Callable[[Iterator[str]], Any]
+
+# (module, ((name, annotation), ...), defaults) -> (interpreters, descriptors)
+_signatures: Dict[Tuple, Tuple[Tuple[Interpreter, ...], Tuple[str, ...]]] = {}
+
+_SEQUENCE_ORIGINS = (list, tuple)
+
+_ABSTRACT_SEQUENCES = (
+    collections.abc.Sequence, collections.abc.Iterable, collections.abc.Collection
+)
+
+# `Optional[int]`, and `int | None` from Python 3.10 on
+_UNIONS = (Union, getattr(types, 'UnionType', Union))
+
+
+def _origin(hint: Any) -> Any:
+    # `typing.get_origin`, with `collections.abc` generics as `list`
+    origin = typing.get_origin(hint)
+    return list if origin in _ABSTRACT_SEQUENCES else origin
+
+def _unwrap_optional(hint: Any) -> Any:
+    if typing.get_origin(hint) not in _UNIONS:
+        return hint
+
+    args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+    assert len(args) == 1, \
+        f'Unions other than `Optional` cannot be interpreted: {hint!r}.'
+    return args[0]
+
+def _enum_converter(cls: Any) -> Callable[[str], Any]:
+    members = cls.__members__
+    names = ', '.join(members)
+
+    def convert(name):
+        try:
+            return members[name]
+        except KeyError:
+            raise ArgumentError(f'`{name}` must be one of {names}.') from None
+    return convert
+
+def _checked(convert: Callable[[str], Any], hint: Any) -> Callable[[str], Any]:
+    # `convert`, raising `ArgumentError` for the arguments it rejects
+    name = getattr(hint, '__name__', repr(hint))
+
+    def checked(value):
+        try:
+            return convert(value)
+        except ArgumentError:
+            raise
+        except Exception:
+            # `ValueError` of `int`, `InvalidOperation` of `Decimal`, ...
+            raise ArgumentError(f'`{value}` is not a valid {name}.') from None
+    return checked
+
+def _converter(hint: Any) -> Callable[[str], Any]:
+    # A function of a single argument, for list elements
+    hint = _unwrap_optional(hint)
+    assert isinstance(hint, type), \
+        f'Type hint `{hint!r}` cannot be interpreted.'
+    assert hint is not bool, \
+        'Parameters cannot be of type `bool`, use a flag option instead.'
+
+    if issubclass(hint, enum.Enum):
+        return _enum_converter(hint)
+    if hint is str:
+        return str
+    return _checked(hint, hint)
+
+def _element_hint(hint: Any) -> Any:
+    # The innermost element type of nested lists
+    while _origin(hint) in _SEQUENCE_ORIGINS:
+        args = [arg for arg in typing.get_args(hint) if arg is not Ellipsis]
+        assert len(set(args)) <= 1, \
+            f'Sequences of different types cannot be interpreted: {hint!r}.'
+        hint = args[0] if len(args) > 0 else str
+    return hint
+
+@lru_cache(maxsize=None)
+def hint_interpreter(hint: Any) -> Interpreter:
+    # The interpreter of a parameter annotated with `hint`
+    hint = _unwrap_optional(hint)
+
+    if hint is str:
+        return interpret_string
+
+    if _origin(hint) in _SEQUENCE_ORIGINS:
+        return list_interpreter(
+            DEFAULT_LIST_DELIMITERS, _converter(_element_hint(hint))
+        )
+
+    convert = _converter(hint)
+    return lambda itr: convert(next(itr))
+
+def _defaulted(interpret: Interpreter, default: Any) -> Interpreter:
+    def interpreter(itr):
+        try:
+            return interpret(itr)
+        except StopIteration:
+            return default
+    return interpreter
+
+def _hints(callback: Callable, names: Tuple[str, ...]) -> List[Any]:
+    annotations = getattr(callback, '__annotations__', {})
+    if any(type(annotations.get(name)) == str for name in names):
+        # Postponed annotations, resolved in the callback's module
+        annotations = typing.get_type_hints(callback)
+
+    for name in names:
+        assert name in annotations, \
+            f'Parameter `{name}` of `{callback.__qualname__}` has no type hint.'
+    return [annotations[name] for name in names]
+
+def interpreters_for(
+    callback: Callable
+) -> Tuple[Tuple[Interpreter, ...], Tuple[str, ...]]:
+    # Interpreters and descriptors of the positional parameters of
+    # `callback`, named after them
+    skip = 0
+    if hasattr(callback, '__func__'):
+        # Bound methods, without `self`
+        callback = callback.__func__
+        skip = 1
+
+    code = getattr(callback, '__code__', None)
+    assert code is not None, \
+        'Parameters can only be derived from the annotations of functions.'
+
+    names = code.co_varnames[skip:code.co_argcount]
+    annotations = getattr(callback, '__annotations__', {})
+    key = (
+        callback.__module__,
+        tuple((name, annotations.get(name)) for name in names),
+        callback.__defaults__
+    )
+
+    try:
+        return _signatures[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # Annotations that cannot be hashed are resolved every time
+        key = None
+
+    parameters = inspect.signature(callback).parameters
+    interpreters = []
+    for name, hint in zip(names, _hints(callback, names)):
+        interpret = hint_interpreter(hint)
+        default = parameters[name].default
+        if default is not inspect.Parameter.empty:
+            interpret = _defaulted(interpret, default)
+        elif _unwrap_optional(hint) is not hint:
+            interpret = _defaulted(interpret, None)
+        interpreters.append(interpret)
+
+    result = (tuple(interpreters), tuple(names))
+    if key is not None:
+        _signatures[key] = result
+    return result
@@ -0,0 +1,269 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, \
+    Union
+
+from .resolver import ArgumentError
+
+
+# List parameters such as `--weights [1, 2, 3]` or `--groups [(a, b), (c)]`.
+#
+# The shell may split a list over several arguments, so `parse_list` first
+# takes arguments until every opened delimiter is closed and joins them with
+# spaces. The joined string is then parsed in a single pass with an explicit
+# stack instead of recursion. Elements are separated by commas, surrounding
+# whitespace is dropped and double quotes protect commas and delimiters:
+# `["a, b", c]`. Any of the configured delimiter pairs may open a nested
+# list, but it has to be closed by its own partner. A single trailing comma
+# is allowed, other empty elements (`[a,,b]`, `[,]`) are errors; an empty
+# string has to be quoted: `[a, "", b]`.
+#
+# Flat lists without quotes, by far the most common case, skip the tokenizer
+# entirely and are split in one `str.split`. With a NumPy `dtype` they are
+# converted straight into an array without an intermediate list of numbers.
+
+_QUOTE = '"'
+
+DelimiterSpec = Union[Tuple[str, str], Iterable[Tuple[str, str]]]
+
+
+def _element(typ: Callable[[str], Any], value: str, string: str) -> Any:
+    try:
+        return typ(value)
+    except ArgumentError:
+        raise
+    except Exception:
+        raise ArgumentError(f'`{value}` is not a valid element of list `{string}`.') from None
+
+
+class ListGrammar:
+    __slots__ = ('openers', 'closers', '_chars', '_depth', '_tokens')
+
+    def __init__(self, delims: Tuple[Tuple[str, str], ...]) -> None:
+        assert len(delims) > 0, \
+            'At least one pair of list delimiters is required.'
+        assert all(len(d) == 2 for d in delims), \
+            'List delimiters must be given in pairs.'
+        assert all(type(c) == str and len(c) == 1 for d in delims for c in d), \
+            'List delimiters must be single characters.'
+        assert not any(c in (',', _QUOTE) for d in delims for c in d), \
+            'Commas and double quotes cannot be used as list delimiters.'
+
+        self.openers = {o: c for o, c in delims}
+        self.closers = frozenset(c for _, c in delims)
+        self._chars = tuple(self.openers) + tuple(self.closers) + (_QUOTE,)
+
+        chars = re.escape(''.join(self.openers) + ''.join(self.closers))
+
+        # Everything that changes the nesting depth, for `gather`
+        self._depth = re.compile(rf'\\.|[{_QUOTE}{chars}]')
+        self._tokens = re.compile(
+            rf'{_QUOTE}(?:[^{_QUOTE}\\]|\\.)*{_QUOTE}'
+            rf'|[,{chars}]'
+            rf'|[^,{_QUOTE}{chars}]+'
+            rf'|{_QUOTE}'
+        )
+
+    def _balance(self, text: str, depth: int, quoted: bool) -> Tuple[int, bool]:
+        openers, closers = self.openers, self.closers
+
+        # Without quotes or escapes, counting is enough (and runs in C)
+        if not quoted and _QUOTE not in text and '\\' not in text:
+            return depth + sum(text.count(o) for o in openers) - \
+                sum(text.count(c) for c in closers), False
+
+        for m in self._depth.finditer(text):
+            ch = m.group()
+            if ch == _QUOTE:
+                quoted = not quoted
+            elif quoted:
+                continue
+            elif ch in openers:
+                depth += 1
+            elif ch in closers:
+                depth -= 1
+        return depth, quoted
+
+    def gather(self, itr: Iterator[str]) -> str:
+        first = next(itr)
+
+        if not any(o in first for o in self.openers):
+            raise ArgumentError(
+                f'`{first}` is not a list, lists start with ' + \
+                ' or '.join(f'`{o}`' for o in self.openers) + '.'
+            )
+
+        parts = [first]
+        depth, quoted = self._balance(first, 0, False)
+
+        while depth > 0 or quoted:
+            arg = next(itr, None)
+            if arg is None:
+                raise ArgumentError(f'Unterminated list `{" ".join(parts)}`.')
+            parts.append(arg)
+            depth, quoted = self._balance(arg, depth, quoted)
+
+        return ' '.join(parts)
+
+    def _flat_elements(self, string: str) -> Optional[List[str]]:
+        if len(string) < 2 or self.openers.get(string[0]) != string[-1]:
+            return None
+
+        inner = string[1:-1]
+        if any(c in inner for c in self._chars):
+            return None
+        if not inner.strip():
+            return []
+
+        elements = inner.split(',')
+        if not elements[-1].strip():
+            elements.pop()
+        if not all(e.strip() for e in elements):
+            raise ArgumentError(f'Empty element in list `{string}`.')
+        return elements
+
+    def parse(
+        self,
+        string: str,
+        typ: Callable[[str], Any],
+        dtype: Optional[Any] = None
+    ) -> Any:
+        string = string.strip()
+
+        if not string or string[0] not in self.openers:
+            return typ(string)
+
+        elements = self._flat_elements(string)
+        if elements is not None:
+            try:
+                if dtype is not None:
+                    import numpy as np
+                    return np.fromiter(map(typ, elements), dtype=dtype, count=len(elements))
+                if typ is int or typ is float:
+                    # Both ignore surrounding whitespace themselves
+                    return list(map(typ, elements))
+                return [typ(e.strip()) for e in elements]
+            except ArgumentError:
+                raise
+            except Exception:
+                # Find the element at fault, off the fast path
+                for e in elements:
+                    _element(typ, e.strip(), string)
+                raise ArgumentError(f'List `{string}` cannot be converted to `{dtype}`.') from None
+
+        result = self._parse_nested(string, typ)
+
+        if dtype is not None:
+            import numpy as np
+            try:
+                return np.array(result, dtype=dtype)
+            except ValueError:
+                raise ArgumentError(f'List `{string}` cannot be converted to `{dtype}`.') from None
+        return result
+
+    def _parse_nested(self, string: str, typ: Callable[[str], Any]) -> list:
+        openers, closers = self.openers, self.closers
+
+        root = None
+        stack = []
+        # Pieces of the current element as `(text, quoted)`
+        element = None
+        # Whether the current list got an element since its last comma
+        filled = False
+
+        def flush():
+            if element is None:
+                return False
+            if len(element) == 1 and not element[0][1] and not element[0][0].strip():
+                return False
+            value = ''.join(t if q else t.strip() for t, q in element)
+            stack[-1][0].append(_element(typ, value, string))
+            return True
+
+        for m in self._tokens.finditer(string):
+            tok = m.group()
+            ch = tok[0]
+
+            if ch in openers:
+                if element is not None and any(q or t.strip() for t, q in element):
+                    raise ArgumentError(f'Unexpected `{ch}` in list `{string}`.')
+                element = None
+
+                new = []
+                if stack:
+                    stack[-1][0].append(new)
+                elif root is not None:
+                    raise ArgumentError(f'Unexpected `{ch}` after list `{string}`.')
+                else:
+                    root = new
+                stack.append((new, openers[ch]))
+                filled = False
+                continue
+
+            if not stack:
+                if tok.strip():
+                    raise ArgumentError(f'Unexpected `{tok}` around list `{string}`.')
+                continue
+
+            if ch == ',' or ch in closers:
+                filled = flush() or filled
+                element = None
+
+                if ch == ',':
+                    if not filled:
+                        raise ArgumentError(f'Empty element in list `{string}`.')
+                    filled = False
+                else:
+                    if stack[-1][1] != ch:
+                        raise ArgumentError(
+                            f'`{ch}` does not close `{stack[-1][1]}` in list `{string}`.'
+                        )
+                    stack.pop()
+                    filled = True
+                continue
+
+            if ch == _QUOTE:
+                if len(tok) < 2:
+                    raise ArgumentError(f'Unterminated quote in list `{string}`.')
+                piece = (re.sub(r'\\(.)', r'\1', tok[1:-1]), True)
+            else:
+                piece = (tok, False)
+
+            if element is None:
+                element = [piece]
+            else:
+                element.append(piece)
+
+        if stack:
+            raise ArgumentError(f'Unterminated list `{string}`.')
+
+        return root
+
+
+@lru_cache(maxsize=None)
+def _grammar(delims: Tuple[Tuple[str, str], ...]) -> ListGrammar:
+    return ListGrammar(delims)
+
+def list_grammar(delims: DelimiterSpec) -> ListGrammar:
+    # Accepts a single pair `('[', ']')` or several `(('[', ']'), ...)`
+    if len(delims) == 2 and all(type(d) == str for d in delims):
+        delims = (delims,)
+    return _grammar(tuple(tuple(d) for d in delims))
+
+
+def parse_list_from_string(
+    string: str,
+    delims: DelimiterSpec,
+    typ: Callable[[str], Any],
+    dtype: Optional[Any] = None
+) -> Any:
+    return list_grammar(delims).parse(string, typ, dtype)
+
+def parse_list(
+    itr: Iterator[str],
+    delims: DelimiterSpec,
+    typ: Callable[[str], Any],
+    dtype: Optional[Any] = None
+) -> Any:
+    grammar = list_grammar(delims)
+    return grammar.parse(grammar.gather(itr), typ, dtype)
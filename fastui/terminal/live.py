@@ -0,0 +1,327 @@
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from rich.segment import Segment
+
+from .tables import SimplePlainTable, _plain_table
+from .text_layout import text_layouts
+
+
+# A `SimplePlainTable` kept on screen while its rows change. Every
+# `refresh` renders only the rows that changed since the last one (and the
+# rows whose alternating style changed because rows were inserted or removed
+# before them), compares the lines with those on screen and rewrites only
+# the lines that differ, moving the cursor up to them. A frame without
+# changes costs nothing, and a frame is written in one go, so nothing
+# flickers.
+#
+# Column widths come from the widest word and widest cell of every column,
+# counted per row as rows change: they are solved again without measuring
+# any cell. Columns with cells rich has to measure itself (markup, say) fall
+# back to measuring the whole table whenever something changed.
+#
+# Only lines that are still on screen can be redrawn. Consoles that are not
+# terminals get the final table printed once, when the live table stops.
+#
+#   with LiveTable(table) as live:
+#       while running:
+#           section.update(k, row)
+#           live.refresh()
+
+# (widest word, widest cell) of every cell of a row, `None` for cells that
+# are not plain text
+RowMeasure = Tuple[Optional[Tuple[int, int]], ...]
+
+_CSI = '\x1b['
+
+
+def _row_measure(row) -> RowMeasure:
+    measures = []
+    for text in row:
+        layout = text_layouts.layout(text) if type(text) == str else None
+        measures.append(
+            (layout.min_width, layout.width)
+            if layout is not None and layout.plain else None
+        )
+    return tuple(measures)
+
+
+class LiveTable:
+    def __init__(self, table: SimplePlainTable):
+        assert type(table) == SimplePlainTable
+
+        self._table = table
+        self._console = table._console
+        self._started = False
+
+    def __enter__(self) -> 'LiveTable':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        assert not self._started, 'The live table was started already.'
+        self._started = True
+
+        self._width = None
+        self._shown = []
+        # The first line of the table still on screen
+        self._first = 0
+
+        # Per section: the measures and the rendered lines of every row,
+        # the latter with the position they were rendered for
+        self._measures = []
+        self._lines = []
+
+        # Per column: how many cells have each widest word and widest cell
+        self._min_counts = None
+        self._max_counts = None
+        self._not_plain = None
+
+        for sec in self._table._sections:
+            sec._changes = []
+            self._measures.append([])
+            self._lines.append([])
+        self._reset_counts()
+
+        if self._console.is_terminal:
+            self._console.show_cursor(False)
+            self.refresh()
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+
+        if self._console.is_terminal:
+            self.refresh()
+            self._console.show_cursor(True)
+
+        for sec in self._table._sections:
+            sec._changes = None
+
+        if not self._console.is_terminal:
+            self._table.print()
+
+    def _reset_counts(self) -> None:
+        column_count = max((sec.width for sec in self._table._sections), default=0)
+        self._min_counts = [Counter() for _ in range(column_count)]
+        self._max_counts = [Counter() for _ in range(column_count)]
+        self._not_plain = [0] * column_count
+
+        for k, sec in enumerate(self._table._sections):
+            self._measures[k] = [_row_measure(row) for row in sec.data]
+            self._lines[k] = [None] * len(sec.data)
+            for measure in self._measures[k]:
+                self._count(measure, 1)
+
+    def _count(self, measure: RowMeasure, sign: int) -> None:
+        for column, cell in enumerate(measure):
+            if cell is None:
+                self._not_plain[column] += sign
+                continue
+            for counts, width in ((self._min_counts[column], cell[0]),
+                    (self._max_counts[column], cell[1])):
+                counts[width] += sign
+                if counts[width] == 0:
+                    del counts[width]
+
+    def _apply_changes(self) -> bool:
+        # Replays the changes logged by the sections, `True` if any
+        logs = []
+        for sec in self._table._sections:
+            logs.append(sec._changes)
+            sec._changes = []
+        if not any(logs):
+            return False
+
+        column_count = len(self._not_plain)
+        for k, (sec, changes) in enumerate(zip(self._table._sections, logs)):
+            measures = self._measures[k]
+            lines = self._lines[k]
+            for change, index, row in changes:
+                if change == 'reset' or (row is not None and len(row) > column_count):
+                    # Measured again from scratch, all sections at once
+                    self._reset_counts()
+                    return True
+                elif change == 'insert':
+                    measure = _row_measure(row)
+                    measures.insert(index, measure)
+                    lines.insert(index, None)
+                    self._count(measure, 1)
+                elif change == 'update':
+                    self._count(measures[index], -1)
+                    measure = measures[index] = _row_measure(row)
+                    lines[index] = None
+                    self._count(measure, 1)
+                elif change == 'remove':
+                    self._count(measures.pop(index), -1)
+                    del lines[index]
+        return True
+
+    def _layout(self) -> None:
+        # Options and widths for the rows as they are now
+        table = self._table
+        con = self._console
+        width = con.width - table._indentation
+
+        if all(count == 0 for count in self._not_plain):
+            measures = tuple(
+                (max(mins, default=0), max(maxs, default=0))
+                for mins, maxs in zip(self._min_counts, self._max_counts)
+            )
+            layout_table = _plain_table(
+                [('',) * len(measures)], width, table._expanded_column,
+                table._highlight_rows, measures
+            )
+        else:
+            layout_table = table._construct_temp_table()
+
+        options, widths = layout_table.dt_layout(con, con.options)
+        if (con.width, widths) != self._width:
+            # Every row has to be rendered again
+            self._width = (con.width, widths)
+            self._lines = [[None] * len(lines) for lines in self._lines]
+            self._headers = {}
+
+            template = _plain_table(
+                [('',) * len(widths)], width, table._expanded_column,
+                table._highlight_rows
+            )
+            self._edges = tuple(
+                self._render(Segment.split_lines(template.dt_render_rows(
+                    con, options, widths, [], 0, 0, top=top, bottom=not top
+                )))
+                for top in (True, False)
+            )
+        self._options, self._widths = options, widths
+
+    def _render(self, lines) -> List[str]:
+        indentation = Segment(' ' * self._table._indentation)
+        return [self._console._render_buffer([indentation, *line]) for line in lines]
+
+    def _row_lines(self, section: int, index: int, offset: int, row_count: int) -> List[str]:
+        # The lines of a row, rendered again only if it changed or its
+        # position changes how it looks: alternating style, first or last
+        table = self._table
+        position = offset + index
+        key = (
+            position % 2 if table._highlight_rows else 0,
+            position == 0,
+            position == row_count - 1
+        )
+
+        cached = self._lines[section][index]
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        con = self._console
+        render_table = _plain_table(
+            [table._sections[section].data[index]],
+            con.width - table._indentation,
+            table._expanded_column,
+            table._highlight_rows
+        )
+        lines = self._render(Segment.split_lines(render_table.dt_render_rows(
+            con, self._options, self._widths, render_table.dt_rows(con), 0, 1,
+            offset=position, row_count=row_count, top=False, bottom=False
+        )))
+        self._lines[section][index] = (key, lines)
+        return lines
+
+    def _header_lines(self, title: str) -> List[str]:
+        lines = self._headers.get(title)
+        if lines is None:
+            con = self._console
+            lines = self._headers[title] = [
+                con._render_buffer(line) for line in con.render_lines(
+                    con.render_str(self._table._header_style(title)), pad=False
+                )
+            ]
+        return lines
+
+    def frame(self) -> List[str]:
+        # Every line of the table as it is now
+        row_count = sum(len(sec.data) for sec in self._table._sections)
+
+        lines = []
+        offset = 0
+        for k, sec in enumerate(self._table._sections):
+            lines.extend(self._header_lines(sec.title))
+            lines.extend(self._edges[0])
+            for index in range(len(sec.data)):
+                lines.extend(self._row_lines(k, index, offset, row_count))
+            lines.extend(self._edges[1])
+            offset += len(sec.data)
+        return lines
+
+    def refresh(self, force: bool = False) -> None:
+        # Redraws what changed since the last refresh
+        if not self._console.is_terminal:
+            return
+
+        changed = self._apply_changes()
+        if not changed and not force and self._shown and \
+                self._width is not None and self._width[0] == self._console.width:
+            return
+
+        resized = self._width is not None and self._width[0] != self._console.width
+        self._layout()
+        self._write(self.frame(), resized)
+
+    def _write(self, lines: List[str], resized: bool = False) -> None:
+        # The lines that differ from those on screen. The cursor rests at
+        # the start of the line below the table.
+        shown = self._shown
+        height = len(shown)
+        # Lines scrolled off the screen cannot be reached any more, nor
+        # drawn again: a table shrinking past them ends at the first line
+        # that is left
+        first = self._first
+        end = max(len(lines), first)
+
+        out = []
+        position = height
+
+        if resized:
+            # The terminal rewrapped what it shows: everything still on
+            # screen is written again
+            if position > first:
+                out.append(f'{_CSI}{position - first}A')
+            out.append(f'\r{_CSI}J')
+            shown = shown[:first]
+            height = position = first
+
+        def move(line):
+            nonlocal position
+            if line < position:
+                out.append(f'{_CSI}{position - line}A')
+            elif line > position:
+                out.append(f'{_CSI}{line - position}B')
+            position = line
+
+        for k in range(first, min(height, len(lines))):
+            if lines[k] is not shown[k] and lines[k] != shown[k]:
+                move(k)
+                out.append(f'\r{lines[k]}{_CSI}K\r')
+
+        if end < height:
+            # Erase what is left of a shorter table
+            move(end)
+            out.append(f'\r{_CSI}J')
+        else:
+            move(height)
+            for k in range(height, len(lines)):
+                out.append(f'\r{lines[k]}{_CSI}K\n')
+            position = max(len(lines), height)
+
+        move(end)
+
+        self._shown = lines + [''] * (end - len(lines))
+        self._first = max(first, end - self._console.height + 1)
+        if out:
+            file = self._console.file
+            file.write(''.join(out))
+            file.flush()
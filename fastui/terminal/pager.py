@@ -0,0 +1,538 @@
+import os
+import sys
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from rich.segment import Segment, Segments
+from rich.style import Style
+
+from .tables import SimplePlainTable, _plain_table
+
+
+# Interactive paging of a `SimplePlainTable`, for tables far too long to
+# print. Only what is in view is rendered: rows are rendered `block_size` at
+# a time, a row range of the table's layout drawn by
+# `DividableTable.dt_render_rows`, and the block after the last visible row
+# is rendered ahead while the pager waits for a key. The last
+# `cached_blocks` blocks are kept, so scrolling back and forth does not
+# render anything twice.
+#
+# Column widths are either declared or solved from the first `sample_size`
+# rows, so the first screen takes the same time for a hundred rows and for
+# a million. Rows further down are wrapped to those widths, unless a word
+# does not fit: the block is then added to the sample and the widths are
+# solved again, so a column widens for `b100000` instead of showing `b10…`.
+#
+# Keys, as in `less`:
+#
+#   j, down, enter     one line down        k, up       one line up
+#   space, f, pgdn     one screen down      b, pgup     one screen up
+#   d                  half a screen down   u           half a screen up
+#   g, home            first line           G, end      last line
+#   :N                 row N                /TEXT       next row with TEXT
+#   n                  next match           N           previous match
+#   q                  quit
+
+# Key names for the escape sequences of navigation keys
+_SEQUENCES = {
+    '\x1b[A': 'up', '\x1b[B': 'down', '\x1bOA': 'up', '\x1bOB': 'down',
+    '\x1b[5~': 'pgup', '\x1b[6~': 'pgdn',
+    '\x1b[H': 'home', '\x1b[F': 'end', '\x1bOH': 'home', '\x1bOF': 'end',
+    '\x1b[1~': 'home', '\x1b[4~': 'end', '\x1b[7~': 'home', '\x1b[8~': 'end',
+}
+
+# Second characters of the navigation keys on Windows
+_WINDOWS_KEYS = {
+    'H': 'up', 'P': 'down', 'I': 'pgup', 'Q': 'pgdn', 'G': 'home', 'O': 'end'
+}
+
+_CONTROL_KEYS = {
+    '\r': 'enter', '\n': 'enter', '\x7f': 'backspace', '\x08': 'backspace',
+    '\x1b': 'esc',
+}
+
+# (item, line), an item being a section header, a table edge or a row
+Position = Tuple[int, int]
+
+
+class KeyReader:
+    # Single key presses from the terminal, navigation keys by name
+    def __enter__(self) -> 'KeyReader':
+        if os.name == 'nt':
+            import msvcrt
+            self._msvcrt = msvcrt
+            return self
+
+        import codecs
+        import termios
+        import tty
+
+        self._fd = sys.stdin.fileno()
+        self._saved = termios.tcgetattr(self._fd)
+        self._decoder = codecs.getincrementaldecoder(sys.stdin.encoding or 'utf-8')('replace')
+        # Signals still work: ctrl-c raises `KeyboardInterrupt`
+        tty.setcbreak(self._fd)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if os.name != 'nt':
+            import termios
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+
+    def _char(self) -> str:
+        char = ''
+        while not char:
+            char = self._decoder.decode(os.read(self._fd, 1))
+        return char
+
+    def read(self) -> str:
+        if os.name == 'nt':
+            char = self._msvcrt.getwch()
+            if char in ('\x00', '\xe0'):
+                return _WINDOWS_KEYS.get(self._msvcrt.getwch(), '')
+            return _CONTROL_KEYS.get(char, char)
+
+        from select import select
+
+        char = self._char()
+        if char != '\x1b':
+            return _CONTROL_KEYS.get(char, char)
+
+        # A lone escape, or the start of a sequence
+        sequence = char
+        while select([self._fd], [], [], 0.03)[0]:
+            sequence += self._char()
+            if sequence in _SEQUENCES or sequence[-1].isalpha() or sequence[-1] == '~':
+                break
+        if sequence == '\x1b':
+            return 'esc'
+        return _SEQUENCES.get(sequence, '')
+
+
+class TablePager:
+    def __init__(
+        self,
+        table: SimplePlainTable,
+        widths: Optional[Sequence[Optional[int]]] = None,
+        sample_size: int = 256,
+        block_size: int = 64,
+        cached_blocks: int = 16
+    ):
+        assert type(table) == SimplePlainTable
+        assert widths is None or \
+            all(w is None or (type(w) == int and w > 0) for w in widths)
+        assert type(sample_size) == int and sample_size > 0
+        assert type(block_size) == int and block_size > 0
+        assert type(cached_blocks) == int and cached_blocks > 1
+
+        self._table = table
+        self._console = table._console
+        self._declared_widths = tuple(widths) if widths is not None else None
+        self._sample_size = sample_size
+        self._block_size = block_size
+        self._cached_blocks = cached_blocks
+
+        # Every section is a header, the top edge, its rows and the bottom
+        # edge. Only the first item and row of each section are kept.
+        self._item_starts = []
+        self._row_starts = []
+        items = rows = 0
+        for sec in table._sections:
+            self._item_starts.append(items)
+            self._row_starts.append(rows)
+            items += len(sec.data) + 3
+            rows += len(sec.data)
+        self.item_count = items
+        self.row_count = rows
+
+        # Blocks with words wider than the columns they were solved for
+        self._wide_rows = []
+        # Changes whenever the widths do, and lines rendered before are stale
+        self._generation = 0
+
+        self._size = None
+        self._top = (0, 0)
+        self._search = None
+        self._prompt = None
+        self._message = ''
+
+    def _render_table(self, rows):
+        return _plain_table(
+            rows,
+            self._console.width - self._table._indentation,
+            self._table._expanded_column,
+            self._table._highlight_rows
+        )
+
+    def _sample(self) -> list:
+        # The first `sample_size` rows, and the rows that widened columns
+        sample = []
+        for sec in self._table._sections:
+            sample.extend(sec.data[:self._sample_size - len(sample)])
+            if len(sample) == self._sample_size:
+                break
+        return sample + self._wide_rows
+
+    def _layout(self) -> None:
+        # Column widths for the console's current size, rendered blocks
+        # are dropped when it changes
+        con = self._console
+        if self._size == con.size:
+            return
+        self._size = con.size
+
+        sample = self._sample() if self._declared_widths is None else []
+        if len(sample) > 0:
+            self._solve(*self._render_table(sample).dt_layout(con, con.options))
+        else:
+            declared = self._declared_widths or \
+                (None,) * (self._table._expanded_column + 1)
+            self._solve(*self._render_table(
+                [('',) * len(declared)]
+            ).dt_declared_layout(con, con.options, declared))
+
+    def _solve(self, options, widths: List[int]) -> None:
+        con = self._console
+        self._options, self._widths = options, widths
+        self._generation += 1
+
+        indentation = Segment(' ' * self._table._indentation)
+        template = self._render_table([('',) * len(self._widths)])
+        self._edges = tuple(
+            [[indentation, *line] for line in Segment.split_lines(
+                template.dt_render_rows(
+                    con, self._options, self._widths, [], 0, 0,
+                    top=top, bottom=not top
+                )
+            )]
+            for top in (True, False)
+        )
+
+        self._indentation = indentation
+        self._blocks = OrderedDict()
+        self._headers = {}
+
+        # Items may have fewer lines at the new widths
+        item, line = self._top
+        self._top = min((item, min(line, len(self._lines(item)) - 1)), self._end()) \
+            if self.item_count > 0 else (0, 0)
+
+    def _widen(self, table, data) -> bool:
+        # Solves the widths again with `data` in the sample if a word of
+        # `table`, the table of `data`, does not fit its column
+        con = self._console
+        if self._declared_widths is not None:
+            return False
+
+        options = con.options.update_width(
+            con.width - self._table._indentation - table._extra_width
+        )
+        if all(
+            table._measure_column(con, options, column).minimum <= width
+            for column, width in zip(table.columns, self._widths)
+        ):
+            return False
+
+        options, widths = self._render_table(
+            self._sample() + list(data)
+        ).dt_layout(con, con.options)
+        if widths == self._widths:
+            # As wide as the console allows
+            return False
+
+        self._wide_rows.extend(data)
+        self._solve(options, widths)
+        return True
+
+    def _block(self, section: int, block: int) -> List[List[List[Segment]]]:
+        # The lines of every row in a block
+        key = (section, block)
+        lines = self._blocks.get(key)
+        if lines is not None:
+            self._blocks.move_to_end(key)
+            return lines
+
+        con = self._console
+        start = block * self._block_size
+        data = self._table._sections[section].data[start:start+self._block_size]
+
+        table = self._render_table(data)
+        self._widen(table, data)
+        cells = table.dt_rows(con)
+        lines = [
+            [[self._indentation, *line] for line in Segment.split_lines(
+                table.dt_render_rows(
+                    con, self._options, self._widths, cells, k, k + 1,
+                    offset=self._row_starts[section] + start,
+                    row_count=self.row_count,
+                    top=False,
+                    bottom=False
+                )
+            )]
+            for k in range(len(cells))
+        ]
+
+        self._blocks[key] = lines
+        if len(self._blocks) > self._cached_blocks:
+            self._blocks.popitem(last=False)
+        return lines
+
+    def _locate(self, item: int) -> Tuple[int, int]:
+        # Section, and index within the section's items
+        section = bisect_right(self._item_starts, item) - 1
+        return section, item - self._item_starts[section]
+
+    def _lines(self, item: int) -> List[List[Segment]]:
+        section, k = self._locate(item)
+        count = len(self._table._sections[section].data)
+
+        if k == 0:
+            lines = self._headers.get(section)
+            if lines is None:
+                con = self._console
+                title = self._table._sections[section].title
+                lines = self._headers[section] = con.render_lines(
+                    con.render_str(self._table._header_style(title)), pad=False
+                )
+            return lines
+        if k == 1:
+            return self._edges[0]
+        if k == count + 2:
+            return self._edges[1]
+
+        row = k - 2
+        return self._block(section, row // self._block_size)[row % self._block_size]
+
+    def _forward(self, position: Position, lines: int) -> Position:
+        item, line = position
+        while lines > 0:
+            step = min(lines, len(self._lines(item)) - 1 - line)
+            line += step
+            lines -= step
+            if lines > 0:
+                if item + 1 >= self.item_count:
+                    break
+                item, line = item + 1, 0
+                lines -= 1
+        return item, line
+
+    def _back(self, position: Position, lines: int) -> Position:
+        item, line = position
+        while lines > 0 and (item, line) > (0, 0):
+            if line == 0:
+                item -= 1
+                line = len(self._lines(item))
+            step = min(lines, line)
+            line -= step
+            lines -= step
+        return item, line
+
+    def _end(self) -> Position:
+        # The top of the last screen
+        if self.item_count == 0:
+            return (0, 0)
+        last = self.item_count - 1
+        while True:
+            # Again if a block on the way widened the columns
+            generation = self._generation
+            end = self._back((last, len(self._lines(last)) - 1), self.height - 1)
+            if generation == self._generation:
+                return end
+
+    @property
+    def height(self) -> int:
+        # Lines of the table in view, the last line is the status line
+        return max(self._console.height - 1, 1)
+
+    def scroll(self, lines: int) -> None:
+        self._layout()
+        if lines > 0:
+            self._top = min(self._forward(self._top, lines), self._end())
+        else:
+            self._top = self._back(self._top, -lines)
+
+    def home(self) -> None:
+        self._top = (0, 0)
+
+    def end(self) -> None:
+        self._layout()
+        self._top = self._end()
+
+    def _row_item(self, row: int) -> int:
+        section = bisect_right(self._row_starts, row) - 1
+        return self._item_starts[section] + 2 + row - self._row_starts[section]
+
+    def _current_row(self) -> int:
+        # The row at the top, or the first one below it
+        section, k = self._locate(self._top[0])
+        count = len(self._table._sections[section].data)
+        row = self._row_starts[section] + min(max(k - 2, 0), count)
+        return min(row, self.row_count - 1)
+
+    def jump(self, row: int) -> None:
+        # To `row`, counted from 0 over all sections
+        self._layout()
+        if self.row_count == 0:
+            return
+        row = min(max(row, 0), self.row_count - 1)
+        self._top = min((self._row_item(row), 0), self._end())
+
+    def find(self, text: str, start: int, step: int = 1) -> Optional[int]:
+        # The first row from `start` on (or back, with a negative `step`)
+        # with a cell containing `text`
+        sections = self._table._sections
+        row = start
+        while 0 <= row < self.row_count:
+            section = bisect_right(self._row_starts, row) - 1
+            data = sections[section].data
+            first = self._row_starts[section]
+            stop = first + len(data) if step > 0 else first - 1
+
+            for row in range(row, stop, step):
+                if any(isinstance(cell, str) and text in cell for cell in data[row - first]):
+                    return row
+            row = stop
+        return None
+
+    def search(self, text: str, step: int = 1) -> bool:
+        self._layout()
+        self._search = text
+        if self.row_count == 0:
+            return False
+
+        row = self.find(text, self._current_row() + step, step)
+        if row is None:
+            self._message = f'Not found: {text}'
+            return False
+        self._top = min((self._row_item(row), 0), self._end())
+        return True
+
+    def _status(self) -> List[Segment]:
+        width = self._console.width
+        if self._prompt is not None:
+            kind, text = self._prompt
+            status = kind + text
+        elif self._message:
+            status = self._message
+        else:
+            first = self._current_row() + 1 if self.row_count else 0
+            status = f'row {first} of {self.row_count}  (q to quit)'
+        return [Segment(status[:width].ljust(width), Style(reverse=True))]
+
+    def frame(self) -> List[List[Segment]]:
+        # The lines in view, then the status line
+        self._layout()
+        height = self.height
+
+        generation = None
+        while generation != self._generation:
+            # Again if a block in view widened the columns
+            generation = self._generation
+            lines = []
+            item, line = self._top
+            while len(lines) < height and item < self.item_count:
+                lines.extend(self._lines(item)[line:line + height - len(lines)])
+                item, line = item + 1, 0
+        self._last_item = item - 1
+
+        lines.append(self._status())
+        return lines
+
+    def prefetch(self) -> None:
+        # Renders the block after the last row in view
+        if getattr(self, '_last_item', -1) < 0:
+            return
+        sections = self._table._sections
+        section, k = self._locate(self._last_item)
+
+        if k < 2:
+            block = 0
+        elif k < len(sections[section].data) + 2:
+            block = (k - 2) // self._block_size + 1
+        else:
+            section, block = section + 1, 0
+
+        if section < len(sections) and \
+                block * self._block_size < len(sections[section].data):
+            self._block(section, block)
+
+    def handle(self, key: str) -> bool:
+        # Acts on a key, `False` once the pager should close
+        if self._prompt is not None:
+            self._edit_prompt(key)
+            return True
+
+        self._message = ''
+        height = self.height
+        if key == 'q':
+            return False
+        elif key in ('j', 'down', 'enter'):
+            self.scroll(1)
+        elif key in ('k', 'up'):
+            self.scroll(-1)
+        elif key in (' ', 'f', 'pgdn'):
+            self.scroll(height)
+        elif key in ('b', 'pgup'):
+            self.scroll(-height)
+        elif key == 'd':
+            self.scroll(height // 2)
+        elif key == 'u':
+            self.scroll(-(height // 2))
+        elif key in ('g', 'home'):
+            self.home()
+        elif key in ('G', 'end'):
+            self.end()
+        elif key in (':', '/'):
+            self._prompt = (key, '')
+        elif key in ('n', 'N') and self._search:
+            self.search(self._search, 1 if key == 'n' else -1)
+        return True
+
+    def _edit_prompt(self, key: str) -> None:
+        kind, text = self._prompt
+        if key == 'esc':
+            self._prompt = None
+        elif key == 'backspace':
+            self._prompt = (kind, text[:-1]) if text else None
+        elif key == 'enter':
+            self._prompt = None
+            if kind == '/' and text:
+                self.search(text)
+            elif kind == ':':
+                try:
+                    self.jump(int(text) - 1)
+                except ValueError:
+                    self._message = f'Not a row number: {text}'
+        elif len(key) == 1 and key.isprintable():
+            self._prompt = (kind, text + key)
+
+    def run(self, keys: Optional[Iterable[str]] = None) -> None:
+        # Pages until `q`, reading keys from the terminal unless given
+        con = self._console
+        new_line = Segment.line()
+
+        def draw(screen):
+            lines = self.frame()
+            screen.update(Segments(
+                [segment for k, line in enumerate(lines)
+                    for segment in (line if k == 0 else (new_line, *line))]
+            ))
+            self.prefetch()
+
+        if keys is not None:
+            with con.screen(hide_cursor=True) as screen:
+                draw(screen)
+                for key in keys:
+                    if not self.handle(key):
+                        break
+                    draw(screen)
+            return
+
+        try:
+            with KeyReader() as reader, con.screen(hide_cursor=True) as screen:
+                draw(screen)
+                while self.handle(reader.read()):
+                    draw(screen)
+        except KeyboardInterrupt:
+            pass
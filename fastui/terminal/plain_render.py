@@ -0,0 +1,226 @@
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from rich._ratio import ratio_distribute, ratio_reduce
+from rich.cells import cell_len
+from rich.table import Table
+
+from .text_layout import TextLayout, measure_layout, measure_widths, text_layouts
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from .columns import ColumnMeasure
+
+
+# Tables for consoles that are not terminals: output piped to a file or to
+# `grep`. Nothing of what rich does per segment (styles, row striping,
+# control codes) survives there, so the lines of `_plain_table`'s layout are
+# built as strings directly and written to the file's binary buffer in
+# chunks of `PLAIN_CHUNK_SIZE` characters.
+#
+# The output is the same as rich's, byte for byte. Anything this module
+# cannot reproduce exactly (markup or emoji codes in cells, styled or
+# recorded consoles, captures, ASCII-only encodings) returns `None` from
+# `plain_header`, `plain_rows` or `plain_widths`, and the caller falls back
+# to rich.
+
+PLAIN_CHUNK_SIZE = 1 << 16
+
+# Cell padding of `_plain_table`: a space on either side
+_PADDING = 2
+
+# (header, rows of `plain_rows`)
+PlainSection = Tuple[str, Sequence[Tuple[Any, ...]]]
+
+
+def writes_plainly(console: 'Console') -> bool:
+    # Whether `console` prints tables as unstyled text straight to its file
+    return not console.is_terminal and console.color_system is None and \
+        not console.record and not console.is_jupyter and \
+        not console.legacy_windows and console._buffer_index == 0 and \
+        console.encoding.startswith('utf')
+
+def _measure_column(
+    cells: Sequence[TextLayout],
+    max_width: int,
+    measure: 'ColumnMeasure' = None
+) -> Tuple[int, int]:
+    # `Table._measure_column` of a column of plain cells
+    if max_width < 1:
+        return (0, 0)
+    if measure is not None:
+        return measure_widths(*measure, _PADDING, max_width)
+
+    minimum = maximum = 0
+    for layout in cells:
+        _min, _max = measure_layout(layout, _PADDING, max_width)
+        minimum, maximum = max(minimum, _min), max(maximum, _max)
+    return (min(minimum, max_width), min(maximum, max_width))
+
+def _column_widths(
+    columns: List[Sequence[TextLayout]],
+    max_width: int,
+    measures: Sequence['ColumnMeasure']
+) -> List[int]:
+    # `Table._calculate_column_widths` for the layout of `_plain_table`:
+    # every column wraps, none has a fixed width or ratio, and the table
+    # always expands to `max_width`
+    widths = [
+        _measure_column(cells, max_width, measure)[1] or 1
+        for cells, measure in zip(columns, measures)
+    ]
+    table_width = sum(widths)
+
+    if table_width > max_width:
+        widths = Table._collapse_widths(widths, [True] * len(widths), max_width)
+        table_width = sum(widths)
+        if table_width > max_width:
+            excess_width = table_width - max_width
+            widths = ratio_reduce(excess_width, [1] * len(widths), widths, widths)
+            table_width = sum(widths)
+
+        widths = [
+            _measure_column(cells, width, measure)[1] or 0
+            for cells, width, measure in zip(columns, widths, measures)
+        ]
+
+    if table_width < max_width:
+        pad_widths = ratio_distribute(max_width - table_width, widths)
+        widths = [width + pad for width, pad in zip(widths, pad_widths)]
+
+    return widths
+
+def plain_header(console: 'Console', header: str) -> Optional[str]:
+    # The line `console.print(header)` writes, if it is a single one
+    text = console.render_str(header).plain
+    if '\n' in text or cell_len(text) > console.width:
+        return None
+    return text
+
+def plain_rows(
+    rows: Sequence[Sequence[str]],
+    measures: Optional[Sequence['ColumnMeasure']] = None
+) -> Optional[List[Tuple[Any, ...]]]:
+    # The layouts of every cell, `None` if rich has to render them. Each
+    # cell is looked up once: tables bigger than the cache would otherwise
+    # evict their own layouts between measuring and wrapping. Cells of
+    # measured columns, known to be plain, stay strings.
+    layout = text_layouts.layout
+    column_count = len(rows[0]) if len(rows) > 0 else 0
+    if measures is None:
+        measures = (None,) * column_count
+    measured = [m is not None for m in measures]
+
+    layout_rows = []
+    for row in rows:
+        if len(row) != column_count:
+            return None
+        for text in row:
+            if type(text) != str:
+                return None
+        layouts = tuple([
+            text if known else layout(text) for text, known in zip(row, measured)
+        ])
+        for cell in layouts:
+            if type(cell) != str and not cell.plain:
+                return None
+        layout_rows.append(layouts)
+    return layout_rows
+
+def plain_widths(
+    rows: Sequence[Tuple[Any, ...]],
+    width: int,
+    measures: Optional[Sequence['ColumnMeasure']] = None
+) -> Optional[List[int]]:
+    # Column widths for a table of `width` cells over `rows`, `None` if
+    # rich has to render them. Columns with a measure are not measured
+    # again.
+    if len(rows) == 0:
+        return None
+
+    # Edges and dividers of `box.SIMPLE_HEAD`
+    extra_width = len(rows[0]) + 1
+    if measures is None:
+        measures = (None,) * len(rows[0])
+    widths = _column_widths(list(zip(*rows)), width - extra_width, measures)
+
+    if any(w - _PADDING < 1 for w in widths):
+        return None
+    return widths
+
+def plain_lines(
+    sections: Sequence[PlainSection],
+    widths: List[int],
+    indentation: int,
+    measures: Optional[Sequence['ColumnMeasure']] = None
+) -> Iterator[str]:
+    # Every line of the table, newline included
+    wrap = text_layouts.wrap_layout
+    layout = text_layouts.layout
+    text_widths = [w - _PADDING for w in widths]
+    blanks = [' ' * w for w in text_widths]
+
+    # Measured columns as wide as their widest cell are only padded
+    if measures is None:
+        measures = (None,) * len(widths)
+    fits = [m is not None and m[1] <= w for m, w in zip(measures, text_widths)]
+
+    prefix = ' ' * indentation + '  '
+    edge = ' ' * (indentation + sum(widths) + len(widths) + 1) + '\n'
+
+    for header, rows in sections:
+        yield header + '\n'
+        yield edge
+
+        for row in rows:
+            cells = [
+                (cell.ljust(w),) if fit else
+                    wrap(layout(cell) if type(cell) == str else cell, w, 'ellipsis')
+                for cell, w, fit in zip(row, text_widths, fits)
+            ]
+            height = max(len(lines) for lines in cells)
+
+            if height == 1:
+                yield prefix + '   '.join([lines[0] for lines in cells]) + '  \n'
+                continue
+
+            for k in range(height):
+                yield prefix + '   '.join([
+                    lines[k] if k < len(lines) else blank
+                    for lines, blank in zip(cells, blanks)
+                ]) + '  \n'
+
+        yield edge
+
+def write_plain(
+    console: 'Console',
+    lines: Iterable[str],
+    chunk_size: int = PLAIN_CHUNK_SIZE
+) -> None:
+    file = console.file
+    buffer = getattr(file, 'buffer', None)
+    encoding = console.encoding
+
+    if buffer is not None:
+        # Whatever was written as text goes first
+        file.flush()
+        write = lambda chunk: buffer.write(chunk.encode(encoding))
+    else:
+        write = file.write
+
+    parts = []
+    size = 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            write(''.join(parts))
+            parts.clear()
+            size = 0
+
+    if parts:
+        write(''.join(parts))
+
+    if buffer is not None:
+        buffer.flush()
+    else:
+        file.flush()
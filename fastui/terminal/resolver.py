@@ -0,0 +1,140 @@
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+class ArgumentError(ValueError):
+    # Raised for command lines that do not match the parser's tree, as
+    # opposed to the `assert`s guarding the tree definition itself.
+    pass
+
+
+# Trie nodes are plain dicts mapping a character to its child node. The empty
+# string (never a character) holds the value of a name ending at the node and
+# `None` holds the value shared by every name below it, or `_AMBIGUOUS`.
+_EXACT = ''
+_UNIQUE = None
+_AMBIGUOUS = -1
+
+
+def _mark(node: dict, value: int) -> None:
+    previous = node.get(_UNIQUE, value)
+    node[_UNIQUE] = value if previous == value else _AMBIGUOUS
+
+def build_trie(names: Mapping[str, int]) -> dict:
+    root = {}
+
+    for name, value in names.items():
+        node = root
+        _mark(node, value)
+        for ch in name:
+            node = node.setdefault(ch, {})
+            _mark(node, value)
+        node[_EXACT] = value
+
+    return root
+
+def _names_below(node: dict, prefix: str) -> List[str]:
+    names = [prefix] if _EXACT in node else []
+    for ch, child in node.items():
+        if ch:
+            names.extend(_names_below(child, prefix + ch))
+    return names
+
+def trie_lookup(
+    trie: dict,
+    token: str,
+    abbreviate: bool = True
+) -> Optional[int]:
+    # The empty string would abbreviate every name at once
+    if not token:
+        return None
+
+    node = trie
+    for ch in token:
+        node = node.get(ch)
+        if node is None:
+            return None
+
+    if _EXACT in node:
+        return node[_EXACT]
+
+    if not abbreviate or _UNIQUE not in node:
+        return None
+
+    value = node[_UNIQUE]
+    if value == _AMBIGUOUS:
+        raise ArgumentError(
+            f'`{token}` is ambiguous, it could be any of ' + \
+            ', '.join(sorted(_names_below(node, token))) + '.'
+        )
+    return value
+
+
+class TokenResolver:
+    # Compiled once per `Command` from its command names and option
+    # shortcuts. Single character shortcuts are short options (`-v`), longer
+    # ones are long options (`--verbose`), see `Command.Option.shortcuts_str`.
+
+    __slots__ = ('_commands', '_long', '_short', '_arity', '_abbreviate')
+
+    def __init__(
+        self,
+        command_keys: Mapping[str, int],
+        option_shortcuts: Mapping[str, int],
+        option_arity: Sequence[int],
+        abbreviate: bool = True
+    ) -> None:
+        self._commands = build_trie(command_keys)
+        self._long = build_trie(
+            {sc: k for sc, k in option_shortcuts.items() if len(sc) > 1}
+        )
+        self._short = {sc: k for sc, k in option_shortcuts.items() if len(sc) == 1}
+        self._arity = tuple(option_arity)
+        self._abbreviate = abbreviate
+
+    def is_option(self, token: str) -> bool:
+        # `-` on its own names stdin, and `-5` is a negative number unless
+        # `5` is a registered short option.
+        if len(token) < 2 or token[0] != '-':
+            return False
+        if token[1] in '0123456789.' and token[1] not in self._short:
+            return False
+        return True
+
+    def resolve_command(self, token: str) -> Optional[int]:
+        return trie_lookup(self._commands, token, self._abbreviate)
+
+    def resolve_option(self, token: str) -> List[Tuple[int, Optional[str]]]:
+        # Returns `(option index, inline value)` pairs, more than one for
+        # bundled short options such as `-vvq`.
+        if token[1] == '-':
+            name, eq, value = token[2:].partition('=')
+            k = trie_lookup(self._long, name, self._abbreviate)
+            if k is None:
+                raise ArgumentError(f'Unknown option `--{name}`.')
+            return [(k, value if eq else None)]
+
+        resolved = []
+        i = 1
+        while i < len(token):
+            if token[i] == '=' and i > 1:
+                # `-v=3` of a flag
+                raise ArgumentError(f'`-{token[i-1]}` does not take a parameter.')
+
+            k = self._short.get(token[i])
+            if k is None:
+                raise ArgumentError(
+                    f'Unknown option `-{token[i]}`' + \
+                    (f' in `{token}`.' if len(token) > 2 else '.')
+                )
+
+            # The rest of the bundle is the value of an option that takes
+            # parameters: `-n5` or `-n=5`.
+            if self._arity[k] > 0 and i + 1 < len(token):
+                value = token[i+1:]
+                resolved.append((k, value[1:] if value[0] == '=' else value))
+                break
+
+            resolved.append((k, None))
+            i += 1
+
+        return resolved
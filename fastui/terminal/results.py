@@ -0,0 +1,50 @@
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .argument_parsing import Command
+
+
+class ParseResult:
+    # The outcome of `Command.parse_args`: which command was selected, the
+    # data of every option given (in order, and by key) and the command's
+    # interpreted parameters. Results own all their state, so one parser
+    # can produce them from any number of threads at once. They are
+    # immutable, and slotted to keep them cheap to allocate.
+
+    __slots__ = ('command', 'path', 'options', 'occurrences', 'parameters')
+
+    def __init__(
+        self,
+        command: 'Command',
+        path: Tuple[str, ...],
+        occurrences: Tuple[Tuple[str, Tuple[Any, ...]], ...],
+        parameters: Tuple[Any, ...]
+    ) -> None:
+        _set = object.__setattr__
+        _set(self, 'command', command)
+        _set(self, 'path', path)
+        _set(self, 'occurrences', occurrences)
+        # The last occurrence of an option wins
+        _set(self, 'options', MappingProxyType(dict(occurrences)))
+        _set(self, 'parameters', parameters)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'`{type(self).__name__}` objects are immutable.')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'`{type(self).__name__}` objects are immutable.')
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) != type(self):
+            return NotImplemented
+        return self.command is other.command and \
+            self.path == other.path and \
+            self.occurrences == other.occurrences and \
+            self.parameters == other.parameters
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(path={self.path!r}, ' \
+            f'options={dict(self.options)!r}, parameters={self.parameters!r})'
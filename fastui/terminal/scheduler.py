@@ -0,0 +1,153 @@
+from functools import partial
+from heapq import heapify, heappop, heappush
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .. import trace
+from .argument_parsing import is_async
+
+if TYPE_CHECKING:
+    from .argument_parsing import Command
+    from .results import ParseResult
+
+
+# Option callbacks run as a graph instead of one after another. An option
+# runs after the options it depends on (`Command.add_callback_dependencies`)
+# if they were given, and after its own earlier occurrences; everything else
+# is independent. `async def` callbacks are awaited on an event loop, where
+# independent ones overlap, and with `ArgumentParser.callback_workers` the
+# other callbacks run in a thread pool of that many threads. The command's
+# callback runs last, on the calling thread, once every option callback has
+# returned, as it always has.
+#
+# A failing callback stops the dispatch: callbacks that depend on it never
+# run, callbacks not yet started are cancelled, and its exception is raised
+# once the ones already running have returned.
+#
+# `asyncio` and `concurrent.futures` are only imported when they are used:
+# dependencies alone run the callbacks in order on the calling thread.
+
+# Occurrence indices: the order callbacks start in without concurrency, and
+# the occurrences each one waits for
+Plan = Tuple[List[int], List[List[int]]]
+
+
+def plan(command: 'Command', occurrences: Sequence[Tuple[str, Any]]) -> Plan:
+    # Each occurrence waits for all occurrences of the options its option
+    # depends on, and for the previous occurrence of its own option. The
+    # order is topological, and otherwise the order they were given in.
+    given = {}
+    for i, (key, _) in enumerate(occurrences):
+        given.setdefault(key, []).append(i)
+
+    waits = []
+    previous = {}
+    for i, (key, _) in enumerate(occurrences):
+        wait = [j for after in command.option(key)._after for j in given.get(after, ())]
+        if key in previous:
+            wait.append(previous[key])
+        previous[key] = i
+        waits.append(wait)
+
+    pending = [len(wait) for wait in waits]
+    unblocks = [[] for _ in occurrences]
+    for i, wait in enumerate(waits):
+        for j in wait:
+            unblocks[j].append(i)
+
+    ready = [i for i, count in enumerate(pending) if count == 0]
+    heapify(ready)
+    order = []
+    while ready:
+        i = heappop(ready)
+        order.append(i)
+        for j in unblocks[i]:
+            pending[j] -= 1
+            if pending[j] == 0:
+                heappush(ready, j)
+
+    # Dependencies are checked to be acyclic when they are declared
+    assert len(order) == len(occurrences)
+    return order, waits
+
+def _call(name: str, callback: Callable, args: Tuple, kwargs: dict) -> Any:
+    with trace.maybe_span(name, 'callback'):
+        return callback(*args, **kwargs)
+
+async def _await(name: str, callback: Callable, args: Tuple, kwargs: dict) -> Any:
+    with trace.maybe_span(name, 'callback'):
+        return await callback(*args, **kwargs)
+
+async def _run_option(loop, pool, key: str, callback: Callable, data: Tuple, waits: list) -> None:
+    for task in waits:
+        # Raises if the task failed, and this callback is not run
+        await task
+
+    name = f'callback {key}'
+    if is_async(callback):
+        await _await(name, callback, data, {})
+    elif pool is not None:
+        await loop.run_in_executor(pool, partial(_call, name, callback, data, {}))
+    else:
+        _call(name, callback, data, {})
+
+async def run_callbacks(
+    command: 'Command',
+    result: 'ParseResult',
+    workers: Optional[int] = None
+) -> None:
+    # The option callbacks of `result` on the running event loop, then the
+    # command's callback
+    import asyncio
+
+    occurrences = result.occurrences
+    order, waits = plan(command, occurrences)
+    loop = asyncio.get_running_loop()
+
+    pool = None
+    if workers is not None:
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fastui-callback')
+
+    # Created in topological order, so the tasks an option waits for exist
+    tasks = [None] * len(occurrences)
+    try:
+        for i in order:
+            key, data = occurrences[i]
+            tasks[i] = loop.create_task(_run_option(
+                loop, pool, key, command.option(key)._callback, data,
+                [tasks[j] for j in waits[i]]
+            ))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(task for task in tasks if task is not None),
+            return_exceptions=True)
+        raise
+    finally:
+        if pool is not None:
+            # Queued calls were cancelled with their tasks
+            pool.shutdown(wait=True)
+
+    name = f'callback {command._names[0]}'
+    if is_async(command._callback):
+        await _await(name, command._callback, result.parameters, result.options)
+    else:
+        _call(name, command._callback, result.parameters, result.options)
+
+def dispatch(command: 'Command', result: 'ParseResult', workers: Optional[int] = None) -> None:
+    # `Command.dispatch` for commands with dependencies, `async def`
+    # callbacks or callback workers
+    if workers is None and not is_async(command._callback) and not any(
+            is_async(command.option(key)._callback) for key, _ in result.occurrences):
+        occurrences = result.occurrences
+        for i in plan(command, occurrences)[0]:
+            key, data = occurrences[i]
+            _call(f'callback {key}', command.option(key)._callback, data, {})
+        _call(f'callback {command._names[0]}', command._callback,
+            result.parameters, result.options)
+        return
+
+    import asyncio
+    asyncio.run(run_callbacks(command, result, workers))
@@ -0,0 +1,188 @@
+import errno
+import gc
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import traceback
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from .client import FRAME_HEADER, STDOUT, STDERR, EXIT, default_socket_path, \
+    is_own_socket, peer_uid, recv_exact
+from .resolver import ArgumentError
+
+if TYPE_CHECKING:
+    from .argument_parsing import ArgumentParser
+
+
+# Opt-in server mode: a long-lived process hosts a fully built
+# `ArgumentParser` with `rich` already imported, and `.client` forwards
+# invocations to it over a Unix socket, so that each invocation only costs
+# the socket round trip instead of interpreter startup and imports.
+#
+# Every connection is handled in a forked child. It takes over the client's
+# argv, environment, working directory and terminal size, gets a fresh
+# `Console` writing into the socket and exits after the callbacks ran, so
+# invocations cannot leak state into each other or into the server.
+# The client's stdin is not forwarded: the child has none, so that
+# `--args-from -` fails instead of waiting on the server's own stdin.
+
+
+class _FrameWriter(io.RawIOBase):
+    def __init__(self, sock, kind: bytes) -> None:
+        self._sock = sock
+        self._kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        if data:
+            self._sock.sendall(FRAME_HEADER.pack(self._kind, len(data)) + data)
+        return len(data)
+
+
+def _text_stream(sock, kind: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(
+        io.BufferedWriter(_FrameWriter(sock, kind), buffer_size=1 << 16),
+        encoding='utf-8',
+        errors='replace',
+        line_buffering=False,
+        write_through=False
+    )
+
+
+class _InvocationHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        header = recv_exact(self.request, 4)
+        if header is None:
+            return
+        body = recv_exact(self.request, struct.unpack('>I', header)[0])
+        if body is None:
+            return
+
+        request = json.loads(body.decode('utf-8', 'surrogateescape'))
+        code = self.server.invoke(self.request, request)
+
+        self.request.sendall(FRAME_HEADER.pack(EXIT, 4) + struct.pack('>i', code))
+
+
+class ParserServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(
+        self,
+        parser: 'ArgumentParser',
+        socket_path: str
+    ) -> None:
+        self.parser = parser
+        self.socket_path = socket_path
+
+        # A socket file left behind by a crashed server is replaced, but
+        # never a server still listening, nor anything not ours
+        if os.path.lexists(socket_path):
+            if not is_own_socket(socket_path):
+                raise OSError(
+                    errno.EEXIST, 'Not a socket of this user, refusing to replace it', socket_path
+                )
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except ConnectionRefusedError:
+                os.unlink(socket_path)
+            else:
+                raise OSError(errno.EADDRINUSE, 'A server is already listening', socket_path)
+            finally:
+                probe.close()
+
+        # Only the owner may connect
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _InvocationHandler)
+        finally:
+            os.umask(umask)
+
+    def verify_request(self, request, client_address) -> bool:
+        # The socket's mode already keeps other users out
+        uid = peer_uid(request)
+        return uid is None or uid == os.getuid()
+
+    def warm_up(self) -> None:
+        # Pay for the imports once, before the first fork
+        from rich.console import Console
+        from . import tables
+        Console(file=io.StringIO()).print(tables.SimplePlainTable.__name__)
+        self.parser.resolver
+
+        # Keep the collector away from everything built so far, so that
+        # children do not copy those pages on write
+        gc.collect()
+        gc.freeze()
+
+    def invoke(self, sock, request: Dict[str, Any]) -> int:
+        # Runs in the forked child
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+
+        stdout = _text_stream(sock, STDOUT)
+        stderr = _text_stream(sock, STDERR)
+        sys.stdout, sys.stderr = stdout, stderr
+
+        # No stdin, for Python code and below it
+        sys.stdin = None
+        null = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null, 0)
+        os.close(null)
+
+        from rich.console import Console
+        self.parser.console = Console(
+            file=stdout,
+            width=request['columns'],
+            height=request['lines'],
+            force_terminal=request['isatty'],
+        )
+
+        code = 0
+        try:
+            self.parser.parse(argument_list=request['argv'])
+        except SystemExit as e:
+            code = e.code if type(e.code) == int else (0 if e.code is None else 1)
+        except ArgumentError as e:
+            print(f'{self.parser.program_name}: {e}', file=stderr)
+            code = 2
+        except Exception:
+            traceback.print_exc(file=stderr)
+            code = 1
+        finally:
+            stdout.flush()
+            stderr.flush()
+
+        return code
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def serve(
+    parser: 'ArgumentParser',
+    socket_path: Optional[str] = None
+) -> None:
+    if socket_path is None:
+        socket_path = default_socket_path(parser.program_name, create=True)
+        if socket_path is None:
+            raise OSError(errno.EPERM, 'No private directory for the socket of '
+                f'`{parser.program_name}`, set XDG_RUNTIME_DIR')
+
+    with ParserServer(parser, socket_path) as server:
+        server.warm_up()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,236 @@
+import mmap
+import os
+import sys
+from collections import deque
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Optional, Sequence
+
+from .resolver import ArgumentError
+from .tokens import POSITIONAL, TERMINATOR, classify
+
+
+# Arguments can be read from files instead of argv, which keeps huge
+# argument lists clear of ARG_MAX:
+#
+#   my-program rm @paths.txt
+#   find . -name '*.tmp' | my-program rm --args-from -
+#
+# Sources hold one argument per line and are spliced into argv where they
+# appear. They are read lazily (memory-mapped, or in chunks for pipes and
+# stdin) and may themselves reference further `@file`s.
+
+ARGS_FROM = '--args-from'
+
+STDIN = '-'
+
+MAX_SOURCE_DEPTH = 16
+
+_CHUNK_SIZE = 1 << 16
+
+
+def _iter_lines_chunked(fh: BinaryIO) -> Iterator[bytes]:
+    tail = b''
+
+    while True:
+        chunk = fh.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+
+    if tail:
+        yield tail
+
+def _iter_lines_mapped(mm: mmap.mmap) -> Iterator[bytes]:
+    pos = 0
+    size = len(mm)
+
+    while pos < size:
+        end = mm.find(b'\n', pos)
+        if end < 0:
+            end = size
+
+        yield mm[pos:end]
+        pos = end + 1
+
+def _iter_lines(path: str) -> Iterator[bytes]:
+    if path == STDIN:
+        # `None` in processes without one, such as `.server` invocations
+        if sys.stdin is None:
+            raise ArgumentError(f'Cannot read arguments from `{STDIN}`: there is no stdin.')
+        yield from _iter_lines_chunked(sys.stdin.buffer)
+        return
+
+    with open(path, 'rb') as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files cannot be mapped, neither can pipes or ttys
+            yield from _iter_lines_chunked(fh)
+            return
+
+        with mm:
+            yield from _iter_lines_mapped(mm)
+
+def read_arguments(path: str) -> Iterator[str]:
+    # Arguments are decoded like argv itself, so file names that are not
+    # valid in the file system encoding survive the round trip.
+    for line in _iter_lines(path):
+        if line[-1:] == b'\r':
+            line = line[:-1]
+        if line:
+            yield os.fsdecode(line)
+
+
+def _is_source(arg: str) -> bool:
+    return (len(arg) > 1 and arg[0] == '@') or arg.startswith(ARGS_FROM)
+
+def has_sources(args: Sequence[str], start: int = 0) -> bool:
+    # Runs on every parse, so the scan stays in C. False positives (a lone
+    # `@`, or an argument with `\n@` inside) only cost the streaming path,
+    # `expand_sources` leaves such arguments alone.
+    try:
+        end = args.index('--', start)
+    except ValueError:
+        end = len(args)
+
+    joined = '\n' + '\n'.join(islice(args, start, end))
+    return '\n@' in joined or '\n' + ARGS_FROM in joined
+
+def _expand_source(path: str, depth: int) -> Iterator[str]:
+    if depth >= MAX_SOURCE_DEPTH:
+        raise ArgumentError(f'Argument files are nested too deeply at `{path}`.')
+
+    try:
+        yield from expand_sources(read_arguments(path), depth + 1)
+    except OSError as e:
+        raise ArgumentError(
+            f'Cannot read arguments from `{path}`: {e.strerror}.'
+        ) from None
+
+def expand_sources(args: Iterable[str], depth: int = 0) -> Iterator[str]:
+    itr = iter(args)
+
+    for arg in itr:
+        # Nothing after `--` is expanded, so `-- @literal` stays possible
+        if arg == '--':
+            yield arg
+            yield from itr
+            return
+
+        if not _is_source(arg):
+            yield arg
+        elif arg[0] == '@':
+            yield from _expand_source(arg[1:], depth)
+        elif arg == ARGS_FROM:
+            path = next(itr, None)
+            if path is None:
+                raise ArgumentError(
+                    f'`{ARGS_FROM}` expects a file name, or `{STDIN}` for stdin.'
+                )
+            yield from _expand_source(path, depth)
+        elif arg[len(ARGS_FROM)] == '=':
+            yield from _expand_source(arg[len(ARGS_FROM)+1:], depth)
+        else:
+            yield arg
+
+
+class StreamingCursor:
+    # The `ArgumentCursor` interface over an argument iterator, so that a
+    # stream of arguments is classified as it is read instead of being
+    # tokenized up front. Only the arguments looked ahead at are buffered.
+
+    __slots__ = (
+        '_source', '_buffer', '_pending', '_consumed', '_position',
+        '_terminated', '_last'
+    )
+
+    def __init__(self, source: Iterable[str]) -> None:
+        self._source = iter(source)
+        self._buffer = deque()
+        self._pending = []
+        self._consumed = 0
+        self._position = 0
+        self._terminated = False
+        self._last = None
+
+    def _fill(self, n: int) -> bool:
+        buffer = self._buffer
+        while len(buffer) < n:
+            try:
+                buffer.append(next(self._source))
+            except StopIteration:
+                return False
+        return True
+
+    def _at_terminator(self, index: int) -> bool:
+        return not self._terminated and self._buffer[index] == '--'
+
+    def __iter__(self) -> 'StreamingCursor':
+        return self
+
+    def __next__(self) -> str:
+        if self._pending:
+            self._consumed += 1
+            return self._pending.pop()
+
+        # Interpreters never read past `--`, see `ArgumentCursor`
+        if not self._fill(1) or self._at_terminator(0):
+            raise StopIteration
+
+        arg = self._buffer.popleft()
+        self._position += 1
+        self._consumed += 1
+        self._last = arg
+        return arg
+
+    @property
+    def consumed(self) -> int:
+        return self._consumed
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    @property
+    def has_pending(self) -> bool:
+        return len(self._pending) > 0
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        if offset < len(self._pending):
+            return self._pending[-1 - offset]
+
+        offset -= len(self._pending)
+        if not self._fill(offset + 1):
+            return None
+        if any(self._at_terminator(i) for i in range(offset + 1)):
+            return None
+        return self._buffer[offset]
+
+    def peek_kind(self) -> Optional[int]:
+        if self._pending:
+            return POSITIONAL
+        if not self._fill(1):
+            return None
+        if self._terminated:
+            return POSITIONAL
+        return classify(self._buffer[0])
+
+    def push_back(self, value: Optional[str] = None) -> None:
+        if value is None:
+            assert self._last is not None, \
+                'Nothing to push back.'
+            self._buffer.appendleft(self._last)
+            self._last = None
+            self._position -= 1
+        else:
+            self._pending.append(value)
+        self._consumed -= 1
+
+    def skip_terminator(self) -> None:
+        assert self.peek_kind() == TERMINATOR
+        self._buffer.popleft()
+        self._position += 1
+        self._terminated = True
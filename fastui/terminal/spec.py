@@ -0,0 +1,358 @@
+import hashlib
+import json
+import marshal
+import os
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union, \
+    TYPE_CHECKING
+
+from .argument_parsing import ArgumentParser, Command, _assert_acyclic, \
+    DEFAULT_LIST_DELIMITERS, interpret_int, interpret_float, \
+    interpret_string, list_interpreter, selection_interpreter
+from .styled_output import StyledOutput
+from .._utils import assert_type, assert_iter, assert_iter_types, \
+    cache_directory, write_atomic
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+# A spec describes an `ArgumentParser` tree as plain data:
+#
+#   {
+#       'program_name': 'my-program',
+#       'version': '0.0.1',
+#       'help_text': 'This is my program.',
+#       'callback': 'main',
+#       'version_option': True,
+#       'options': [
+#           {'key': 'verbose', 'shortcuts': ['v', 'verbose'], 'callback': 'verbose'},
+#           {'key': 'log', 'shortcuts': ['log'], 'type': 'string', 'parameter': 'path'},
+#           {'key': 'index', 'shortcuts': ['index'], 'callback': 'index', 'after': ['log']},
+#       ],
+#       'commands': [
+#           {'names': ['install', 'i'], 'help_text': 'Install packages.', 'options': [...]},
+#       ],
+#   }
+#
+# Callbacks are referenced by name and resolved from the `callbacks` mapping
+# when the tree is loaded. The spec is validated and compiled once into a
+# compact marshal artifact, cached on disk under the hash of the spec.
+
+SPEC_FORMAT_VERSION = 3
+
+_MAGIC = b'FUIS'
+
+OPTION_TYPES = ('flag', 'int', 'float', 'string', 'list', 'selection')
+
+LIST_ELEMENT_PARSERS = {
+    'int': int,
+    'float': float,
+    'str': str,
+}
+
+_noop = lambda *args, **kwargs: None
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as fh:
+        raw = fh.read()
+
+    return _decode_spec(raw, path)
+
+def _decode_spec(raw: bytes, path: str) -> Dict[str, Any]:
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        return tomllib.loads(raw.decode('utf-8'))
+
+    return json.loads(raw)
+
+def spec_hash(spec: Mapping[str, Any]) -> str:
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(canonical.encode('utf-8'))
+    digest.update(b'%d' % SPEC_FORMAT_VERSION)
+    return digest.hexdigest()
+
+
+def _compile_option(entry: Mapping[str, Any]) -> Tuple:
+    key = entry.get('key')
+    kind = entry.get('type', 'flag')
+    parameter = entry.get('parameter', kind)
+    callback = entry.get('callback')
+
+    assert_type(key, str, name='option.key')
+    assert_type(entry.get('help_text'), str, name=f'{key}.help_text', optional=True)
+    assert_iter_types(entry.get('shortcuts'), str, name=f'{key}.shortcuts', min_len=1)
+    assert kind in OPTION_TYPES, \
+        f'`{key}.type` must be one of {", ".join(OPTION_TYPES)}.'
+    assert_type(parameter, str, name=f'{key}.parameter')
+    assert_type(callback, str, name=f'{key}.callback', optional=True)
+    # Keys of options whose callbacks run first, see
+    # `Command.add_callback_dependencies`
+    after = entry.get('after', ())
+    assert_iter_types(after, str, name=f'{key}.after')
+
+    extra = None
+    if kind == 'list':
+        delims = entry.get('delimiters')
+        if delims is not None:
+            assert_iter(delims, name=f'{key}.delimiters', min_len=1)
+            assert all(len(d) == 2 and all(type(c) == str for c in d) for d in delims), \
+                f'`{key}.delimiters` must be given as pairs of strings.'
+            delims = tuple(tuple(d) for d in delims)
+        element = entry.get('element', 'str')
+        assert element in LIST_ELEMENT_PARSERS, \
+            f'`{key}.element` must be one of {", ".join(LIST_ELEMENT_PARSERS)}.'
+        # A NumPy dtype name such as 'float64', see `add_list_option`
+        dtype = entry.get('dtype')
+        assert_type(dtype, str, name=f'{key}.dtype', optional=True)
+        extra = (delims, element, dtype)
+    elif kind == 'selection':
+        assert_iter_types(entry.get('choices'), str, name=f'{key}.choices', min_len=1)
+        extra = tuple(entry['choices'])
+
+    return (
+        key,
+        entry.get('help_text'),
+        tuple(entry['shortcuts']),
+        kind,
+        parameter,
+        extra,
+        callback,
+        tuple(after),
+    )
+
+def _compile_command(entry: Mapping[str, Any], names: Tuple[str, ...]) -> Tuple:
+    assert_type(entry.get('help_text'), str, name='help_text', optional=True)
+    assert_type(entry.get('usage'), str, name='usage', optional=True)
+    assert_type(entry.get('callback'), str, name='callback', optional=True)
+
+    options = tuple(_compile_option(o) for o in entry.get('options', ()))
+    keys = [o[0] for o in options]
+    assert len(keys) == len(set(keys)), \
+        f'Option keys of `{names[0]}` must be unique.'
+    for o in options:
+        for k in o[7]:
+            assert k in keys, f'`{names[0]}` has no option with the key `{k}`.'
+    _assert_acyclic({o[0]: o[7] for o in options}, names[0])
+
+    commands = []
+    for cmd in entry.get('commands', ()):
+        assert_iter_types(cmd.get('names'), str, name='command.names', min_len=1)
+        commands.append(_compile_command(cmd, tuple(cmd['names'])))
+
+    return (
+        names,
+        entry.get('help_text'),
+        entry.get('usage'),
+        entry.get('callback'),
+        options,
+        tuple(commands),
+    )
+
+def compile_spec(spec: Mapping[str, Any]) -> bytes:
+    assert_type(spec.get('program_name'), str, name='program_name')
+    assert_type(spec.get('version'), str, name='version')
+    assert_type(spec.get('std_help', True), bool, name='std_help')
+
+    version_option = spec.get('version_option', False)
+    assert_type(version_option, bool, str, name='version_option')
+
+    tree = (
+        SPEC_FORMAT_VERSION,
+        spec['program_name'],
+        spec['version'],
+        version_option,
+        spec.get('std_help', True),
+        _compile_command(spec, (spec['program_name'],)),
+    )
+
+    return _MAGIC + marshal.dumps(tree)
+
+
+def _callback(
+    callbacks: Mapping[str, Callable],
+    name: str,
+    owner: str,
+    source: str
+) -> Callable:
+    # A named callback missing from `callbacks` is a typo in the spec or in
+    # the mapping, never a callback that does nothing
+    callback = callbacks.get(name)
+    assert callback is not None, \
+        f'Callback `{name}` of {owner} in {source} is not in `callbacks`.'
+    return callback
+
+def _build_option(
+    compiled: Tuple,
+    callbacks: Mapping[str, Callable],
+    source: str
+) -> Command.Option:
+    key, help_text, shortcuts, kind, parameter, extra, callback, after = compiled
+
+    if kind == 'flag':
+        interpreters, descriptors = [], []
+    elif kind == 'int':
+        interpreters, descriptors = [interpret_int], [parameter]
+    elif kind == 'float':
+        interpreters, descriptors = [interpret_float], [parameter]
+    elif kind == 'string':
+        interpreters, descriptors = [interpret_string], [parameter]
+    elif kind == 'list':
+        delims, element, dtype = extra
+        interpreters = [list_interpreter(
+            delims if delims is not None else DEFAULT_LIST_DELIMITERS,
+            LIST_ELEMENT_PARSERS[element],
+            dtype
+        )]
+        descriptors = [parameter]
+    else:
+        interpreters, descriptors = [selection_interpreter(extra)], [parameter]
+
+    # The artifact was validated when it was compiled, so the option is
+    # assembled without running the `assert_*` checks again.
+    opt = Command.Option.__new__(Command.Option)
+    opt._setup(
+        key,
+        help_text,
+        shortcuts,
+        Command.Parameter(interpreters, descriptors),
+        _callback(callbacks, callback, f'option `{key}`', source)
+            if callback is not None else _noop
+    )
+    opt._after = after
+    opt._validated = True
+    return opt
+
+def _build_command(
+    command: Command,
+    compiled: Tuple,
+    parser: ArgumentParser,
+    callbacks: Mapping[str, Callable],
+    std_help: bool,
+    source: str
+) -> Command:
+    names, help_text, usage, callback, options, commands = compiled
+
+    Command._setup(
+        command,
+        names=names,
+        arg_parser=parser,
+        help_text=help_text,
+        usage=usage if usage is not None or command is not parser else names[0],
+        commands=[
+            _build_command(Command.__new__(Command), c, parser, callbacks, std_help, source)
+            for c in commands
+        ],
+        parameters=Command.Parameter([], []),
+        options=[_build_option(o, callbacks, source) for o in options],
+        callback=_callback(callbacks, callback, f'command `{names[0]}`', source)
+            if callback is not None else None,
+        std_help=std_help
+    )
+    # Validated when the artifact was compiled, `ArgumentParser.freeze`
+    # skips it
+    command._validated = True
+    return command
+
+def _load_tree(data: bytes) -> Tuple:
+    assert data[:len(_MAGIC)] == _MAGIC, \
+        'Not a compiled fastui spec.'
+
+    tree = marshal.loads(data[len(_MAGIC):])
+
+    assert tree[0] == SPEC_FORMAT_VERSION, \
+        f'Compiled spec has format {tree[0]}, expected {SPEC_FORMAT_VERSION}.'
+    return tree
+
+def load_compiled(
+    data: Union[bytes, Tuple],
+    callbacks: Optional[Mapping[str, Callable]] = None,
+    console: Optional['Console'] = None,
+    style: Optional[StyledOutput] = None,
+    source: Optional[str] = None,
+    parser_class: type = ArgumentParser,
+    defer_validation: bool = False,
+    callback_workers: Optional[int] = None
+) -> ArgumentParser:
+    # `data` is a compiled artifact, or the tree loaded from one. `source`
+    # names the spec in errors. The other arguments are those of
+    # `ArgumentParser`, for a parser of `parser_class`.
+    tree = _load_tree(data) if type(data) == bytes else data
+    _, program_name, version_str, version_option, std_help, root = tree
+    source = source if source is not None else f'the spec of `{program_name}`'
+
+    callbacks = callbacks if callbacks is not None else {}
+
+    assert isinstance(parser_class, type) and issubclass(parser_class, ArgumentParser), \
+        '`parser_class` must be a subclass of `ArgumentParser`.'
+
+    parser = parser_class.__new__(parser_class)
+    parser._init_state(
+        program_name, version_str, console, style, defer_validation, callback_workers
+    )
+
+    _build_command(parser, root, parser, callbacks, std_help, source)
+
+    if version_option:
+        parser.add_version_option(
+            version_option if type(version_option) == str else None
+        )
+
+    return parser
+
+
+def parser_from_spec(
+    spec: Union[str, Mapping[str, Any]],
+    callbacks: Optional[Mapping[str, Callable]] = None,
+    console: Optional['Console'] = None,
+    style: Optional[StyledOutput] = None,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True,
+    **parser_options
+) -> ArgumentParser:
+    # `parser_options` are passed on to `load_compiled`: `parser_class`,
+    # `defer_validation` and `callback_workers`
+    if type(spec) == str:
+        with open(spec, 'rb') as fh:
+            raw = fh.read()
+        # Key file specs by their raw bytes, so that a cache hit does not
+        # need to decode the spec at all.
+        key = hashlib.sha256(raw + b'%d' % SPEC_FORMAT_VERSION).hexdigest()
+        decode = lambda: _decode_spec(raw, spec)
+        source = f'`{spec}`'
+    else:
+        key = spec_hash(spec)
+        decode = lambda: spec
+        source = None
+
+    if not use_cache:
+        return load_compiled(
+            compile_spec(decode()), callbacks, console, style, source, **parser_options
+        )
+
+    path = os.path.join(
+        cache_dir if cache_dir is not None else cache_directory('specs'),
+        f'{key}.fuis'
+    )
+
+    # Only reading the artifact falls back to compiling: errors building the
+    # parser (a missing callback) are raised
+    try:
+        with open(path, 'rb') as fh:
+            tree = _load_tree(fh.read())
+    except (OSError, EOFError, ValueError, TypeError, AssertionError):
+        pass
+    else:
+        return load_compiled(tree, callbacks, console, style, source, **parser_options)
+
+    data = compile_spec(decode())
+    try:
+        write_atomic(path, data)
+    except OSError:
+        # A read-only cache location only costs us the compile step.
+        pass
+
+    return load_compiled(data, callbacks, console, style, source, **parser_options)
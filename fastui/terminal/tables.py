@@ -1,4 +1,5 @@
-from typing import Callable, TYPE_CHECKING, Iterable, List, NamedTuple, Optional, Tuple, Union
+from itertools import chain, islice
+from typing import Callable, TYPE_CHECKING, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 from rich.console import Console, ConsoleOptions
 from rich.table import Table
 from rich import box
@@ -15,35 +16,112 @@ from rich.jupyter import JupyterMixin
 from rich.measure import Measurement
 from rich.padding import Padding, PaddingDimensions
 from rich.protocol import is_renderable
-from rich.segment import Segment
+from rich.segment import Segment, Segments
 from rich.style import Style, StyleType
 from rich.styled import Styled
 from rich.text import Text, TextType
+from rich.table import Column
 
+from .. import trace
+from .columns import _is_structured, combine_measures, from_columns
+from .plain_render import plain_header, plain_lines, plain_rows, \
+    plain_widths, write_plain, writes_plainly
+from .text_layout import measure_plain_cell, measure_widths, plain_cell_text, \
+    text_layouts, wraps_plainly
+
+
+
+def _plain_table(rows, width, expanded_column, highlight_rows, measures=None):
+    # The layout shared by `SimplePlainTable` and `StreamingPlainTable`
+    temp_table = DividableTable(0,-1,show_header=False, show_footer=False)
+    temp_table.box = box.SIMPLE_HEAD
+    temp_table.dt_measures = measures
+
+    for row in rows:
+        temp_table.add_row(*row)
+
+    for col in temp_table.columns:
+        col.justify = 'left'
+
+    temp_table.width = width
+
+    assert 0 <= expanded_column < len(temp_table.columns)
+    temp_table.columns[expanded_column].expand = True
+
+    if highlight_rows:
+        temp_table.row_styles = ['none', 'dim']
+
+    return temp_table
+
+
+# Rows per task when `SimplePlainTable` renders in worker processes
+PARALLEL_CHUNK_ROWS = 256
+
+def _console_settings(console):
+    # What a worker needs to render like `console`: its theme, and the
+    # settings that change how strings become text
+    return (
+        dict(console._theme_stack._entries[-1]),
+        dict(
+            width=console.width,
+            height=console.height,
+            tab_size=console.tab_size,
+            markup=console._markup,
+            emoji=console._emoji,
+            emoji_variant=console._emoji_variant,
+            highlight=console._highlight,
+            highlighter=console.highlighter,
+            safe_box=console.safe_box,
+            legacy_windows=console.legacy_windows,
+            force_terminal=console.is_terminal,
+            no_color=console.no_color,
+        )
+    )
+
+def _render_row_range(settings, rows, table_width, expanded_column,
+        highlight_rows, options, widths, offset, row_count, top, bottom):
+    # Runs in a worker process: the lines of `rows`, a range of a table
+    # whose widths were solved by the parent
+    from io import StringIO
+    from rich.theme import Theme
+
+    styles, kwargs = settings
+    console = Console(file=StringIO(), theme=Theme(styles, inherit=False), **kwargs)
+
+    table = _plain_table(rows, table_width, expanded_column, highlight_rows)
+    cells = table.dt_rows(console)
+    return list(Segment.split_lines(table.dt_render_rows(
+        console, options, widths, cells, 0, len(cells),
+        offset=offset, row_count=row_count, top=top, bottom=bottom
+    )))
 
 
 class SimplePlainTable:
     class Section:
+        # Rows are kept as a tuple of tuples, the most compact form that
+        # still allows indexing. Validation only looks at the first row, and
+        # rendering structures are built when the section is printed.
+        #
+        # NumPy structured arrays are taken too, see `from_columns`.
+        #
+        # Rows can be changed one at a time. The first change turns the rows
+        # into a list; while a `LiveTable` shows the section, every change
+        # is also logged for it.
+        __slots__ = ('title', '_data', '_measures', '_table', '_changes')
+
         def __init__(self, title, data):
             self.title = title
-
-            assert type(data) == list and \
-                (len(data) == 0 or (type(data[0]) == list and \
-                (len(data[0]) == 0 or type(data[0][0]) == str)))
-
-            self._data = data
-            self._table = None
-
-            self._make_table()
+            self._changes = None
+            self.data = data
 
         @property
         def width(self):
-            return len(self.data[0]) \
-                if len(self.data) > 0 else 0
+            return len(self._data[0]) \
+                if len(self._data) > 0 else 0
 
         @property
         def height(self):
-            return len(self.data)
+            return len(self._data)
 
         @property
         def size(self):
@@ -53,21 +131,90 @@ class SimplePlainTable:
         def data(self):
             return self._data
 
+        @property
+        def measures(self):
+            # Widest word and widest cell of every column of a section built
+            # from columns, see `.columns`
+            return self._measures
+
         @data.setter
         def data(self, data):
+            if _is_structured(data):
+                self._data, self._measures = from_columns(data)
+                self._table = None
+                self._changed('reset', 0)
+                return
+
+            assert type(data) in (list, tuple) and \
+                (len(data) == 0 or (type(data[0]) in (list, tuple) and \
+                (len(data[0]) == 0 or type(data[0][0]) == str)))
+
+            # Rows that are tuples already are shared, not copied
+            if type(data) != tuple or (len(data) > 0 and type(data[0]) != tuple):
+                data = tuple(map(tuple, data))
+
             self._data = data
-            self._make_table()
+            self._measures = None
+            self._table = None
+            self._changed('reset', 0)
+
+        def _changed(self, change, index, row=None):
+            if self._changes is not None:
+                self._changes.append((change, index, row))
+
+        def _rows(self):
+            # The rows, as a list that can be changed
+            if type(self._data) != list:
+                self._data = list(self._data)
+            self._measures = None
+            self._table = None
+            return self._data
+
+        def _row(self, row):
+            assert type(row) in (list, tuple) and \
+                (len(row) == 0 or type(row[0]) == str) and \
+                (len(self._data) == 0 or len(row) == len(self._data[0]))
+            return tuple(row)
+
+        def append(self, row):
+            rows = self._rows()
+            row = self._row(row)
+            rows.append(row)
+            self._changed('insert', len(rows) - 1, row)
+
+        def update(self, index, row):
+            rows = self._rows()
+            index = range(len(rows))[index]
+            row = rows[index] = self._row(row)
+            self._changed('update', index, row)
+
+        def remove(self, index):
+            rows = self._rows()
+            index = range(len(rows))[index]
+            del rows[index]
+            self._changed('remove', index)
+
+        def export(self, file, format='csv', columns=None, **kwargs):
+            # The rows as CSV, TSV, JSON Lines or Markdown, see `.export`
+            from .export import export
+            export([(self.title, self._data)], file, format, columns, titles=False, **kwargs)
+
+        @classmethod
+        def from_columns(cls, title, columns, formats=None, align=None):
+            # A section of column arrays or of a structured array, formatted
+            # with printf-style `formats` and aligned per column
+            section = cls(title, ())
+            section._data, section._measures = from_columns(columns, formats, align)
+            return section
 
         @property
         def table(self):
-            return self._table
-
-        def _make_table(self):
-            del self._table
-            self._table = Table(show_header=False, show_footer=False)
+            if self._table is None:
+                self._table = Table(show_header=False, show_footer=False)
 
-            for row in self._data:
-                self._table.add_row(*row)
+                for row in self._data:
+                    self._table.add_row(*row)
+            return self._table
 
         @classmethod
         def same_width(cls, sections):
@@ -86,10 +233,12 @@ class SimplePlainTable:
         indentation: int = 4,
         header_style: Optional[Callable[[str],str]] = None,
         highlight_rows: bool = True,
+        workers: Optional[int] = None,
         console: Console = None
     ):
         assert self.Section.same_width(sections)
         assert header_style is None or callable(header_style)
+        assert workers is None or (type(workers) == int and workers > 0)
 
         if header_style is None:
             header_style = lambda txt: txt
@@ -98,66 +247,287 @@ class SimplePlainTable:
         self._indentation = indentation
         self._header_style = header_style
         self._highlight_rows = highlight_rows
+        self._workers = workers
 
         self._sections = sections
         self._console = console if console is not None else Console()
 
     def _construct_temp_table(self):
-        temp_table = DividableTable(0,-1,show_header=False, show_footer=False)
-        temp_table.box = box.SIMPLE_HEAD
+        return _plain_table(
+            (row for sec in self._sections for row in sec.data),
+            self._console.width - self._indentation,
+            self._expanded_column,
+            self._highlight_rows,
+            combine_measures(self._sections)
+        )
 
-        for sec in self._sections:
-            for row in sec.data:
-                temp_table.add_row(*row)
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> "RenderResult":
+        # All sections in one pass: column widths are solved once for all
+        # rows, and every row is rendered exactly once, with the section
+        # headers emitted between the row ranges.
+        temp_table = self._construct_temp_table()
+        table_options, widths = temp_table.dt_layout(console, options)
 
-        for col in temp_table.columns:
-            col.justify = 'left'
+        if self._workers is not None and temp_table.row_count > PARALLEL_CHUNK_ROWS:
+            yield from self._render_parallel(console, temp_table, table_options, widths)
+            return
 
-        temp_table.width = self._console.width - self._indentation
+        rows = temp_table.dt_rows(console)
 
-        assert 0 <= self._expanded_column < len(temp_table.columns)
-        temp_table.columns[self._expanded_column].expand = True
+        indentation = Segment(' ' * self._indentation)
+        new_line = Segment.line()
 
-        if self._highlight_rows:
-            temp_table.row_styles = ['none', 'dim']
+        start = 0
+        for sec in self._sections:
+            yield console.render_str(self._header_style(sec.title))
+
+            lines = Segment.split_lines(temp_table.dt_render_rows(
+                console, table_options, widths, rows, start, start+len(sec.data)
+            ))
+            for line in lines:
+                yield indentation
+                yield from line
+                yield new_line
 
-        # width = lambda c: temp_table._measure_column(self._console, c,
-        #   self._console.width).minimum
+            start += len(sec.data)
 
-        # widths = [width(c) for c in temp_table.columns]
+    def _render_parallel(self, console, temp_table, table_options, widths):
+        # Ranges of `PARALLEL_CHUNK_ROWS` rows rendered by `workers`
+        # processes once the widths are solved, and yielded in order as
+        # they come back
+        from concurrent.futures import ProcessPoolExecutor
 
-        # self._console.print(temp_table, justify='right')
+        settings = _console_settings(console)
+        table_width = self._console.width - self._indentation
 
-        return temp_table
+        indentation = Segment(' ' * self._indentation)
+        new_line = Segment.line()
+
+        with ProcessPoolExecutor(max_workers=self._workers) as pool:
+            jobs = []
+            start = 0
+            for sec in self._sections:
+                jobs.append([
+                    pool.submit(
+                        _render_row_range, settings,
+                        sec.data[k:k+PARALLEL_CHUNK_ROWS], table_width,
+                        self._expanded_column, self._highlight_rows,
+                        table_options, widths, start + k, temp_table.row_count,
+                        k == 0, k + PARALLEL_CHUNK_ROWS >= len(sec.data)
+                    )
+                    for k in range(0, len(sec.data), PARALLEL_CHUNK_ROWS)
+                ])
+                start += len(sec.data)
+
+            for sec, chunks in zip(self._sections, jobs):
+                yield console.render_str(self._header_style(sec.title))
+
+                for chunk in chunks:
+                    for line in chunk.result():
+                        yield indentation
+                        yield from line
+                        yield new_line
 
     def print(self):
-        # tables = [s.table for s in self._sections]
-        temp_table = self._construct_temp_table()
-        width = self._console.width - self._indentation
+        with trace.maybe_span('print SimplePlainTable', 'render'):
+            self._print()
 
+    def _print(self):
         con = self._console
 
-        # copts = con.options
-        # copts.
+        # Piped output skips rich altogether when it can
+        if writes_plainly(con):
+            measures = combine_measures(self._sections)
+            headers = [plain_header(con, self._header_style(sec.title)) for sec in self._sections]
+            rows = plain_rows([row for sec in self._sections for row in sec.data], measures) \
+                if None not in headers else None
+            widths = plain_widths(rows, con.width - self._indentation, measures) \
+                if rows is not None else None
+
+            if widths is not None:
+                sections = []
+                start = 0
+                for header, sec in zip(headers, self._sections):
+                    sections.append((header, rows[start:start+len(sec.data)]))
+                    start += len(sec.data)
+
+                write_plain(con, plain_lines(sections, widths, self._indentation, measures))
+                return
+
+        con.print(self)
+
+    def page(self, **kwargs):
+        # Pages through the table in a terminal, renders only what is in
+        # view, see `.pager`. Prints it when there is nobody to page for.
+        import sys
+        from .pager import TablePager
+
+        if not self._console.is_terminal or not sys.stdin.isatty():
+            self.print()
+            return
+        TablePager(self, **kwargs).run()
+
+    def export(self, file, format='csv', columns=None, titles=True, **kwargs):
+        # Every section as CSV, TSV, JSON Lines or Markdown, streamed to
+        # `file` without rendering anything, see `.export`
+        from .export import export
+        export(
+            [(sec.title, sec.data) for sec in self._sections],
+            file, format, columns, titles, **kwargs
+        )
 
-        start = 0
-        for k, sec in enumerate(self._sections):
-            con.print(self._header_style(sec.title))
 
-            temp_table.dt_select_rows(start, start+len(sec.data))
-            start += len(sec.data)
 
-            # t.box = box.SIMPLE_HEAD
-            # t.width = temp_table.width
-            # t.min_width = temp_table.min_width
-            # t.padding = temp_table.padding
-            # t.pad_edge = temp_table.pad_edge
-            # t.expand = False
-            # for i in range(len(widths)):
-            #   t.columns[i].width = widths[i]
+class StreamingPlainTable:
+    # `SimplePlainTable` for rows that arrive from an iterator, printed with
+    # memory independent of the number of rows. Column widths are either
+    # declared, or solved from the first `sample_size` rows of the first
+    # section; later rows are wrapped to fit them. Rows are then rendered
+    # and written `chunk_size` at a time.
+    class Section:
+        __slots__ = ('title', 'rows')
+
+        def __init__(self, title, rows: Iterable[Sequence[str]]):
+            self.title = title
+            self.rows = rows
+
+    def __init__(
+        self,
+        *sections: Section,
+        widths: Optional[Sequence[Optional[int]]] = None,
+        sample_size: int = 256,
+        chunk_size: int = 64,
+        expanded_column: int = 1,
+        indentation: int = 4,
+        header_style: Optional[Callable[[str],str]] = None,
+        highlight_rows: bool = True,
+        console: Console = None
+    ):
+        assert len(sections) > 0 and \
+            all(type(s) == self.Section for s in sections)
+        assert widths is None or \
+            all(w is None or (type(w) == int and w > 0) for w in widths)
+        assert type(sample_size) == int and sample_size > 0
+        assert type(chunk_size) == int and chunk_size > 0
+        assert header_style is None or callable(header_style)
+
+        if header_style is None:
+            header_style = lambda txt: txt
+
+        self._widths = tuple(widths) if widths is not None else None
+        self._sample_size = sample_size
+        self._chunk_size = chunk_size
+        self._expanded_column = expanded_column
+        self._indentation = indentation
+        self._header_style = header_style
+        self._highlight_rows = highlight_rows
+
+        self._sections = sections
+        self._console = console if console is not None else Console()
+
+    def _table(self, rows):
+        return _plain_table(
+            rows,
+            self._console.width - self._indentation,
+            self._expanded_column,
+            self._highlight_rows
+        )
+
+    def _layout(self, sample):
+        # Render options and column widths for every chunk
+        con = self._console
 
-            con.print(temp_table, justify='right')
+        if self._widths is None:
+            return self._table(sample).dt_layout(con, con.options)
 
+        return self._table([('',) * len(self._widths)]).dt_declared_layout(
+            con, con.options, self._widths
+        )
+
+    def _chunks(self, rows):
+        itr = iter(rows)
+        while True:
+            chunk = list(islice(itr, self._chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def print(self):
+        with trace.maybe_span('print StreamingPlainTable', 'render'):
+            self._print()
+
+    def _print(self):
+        con = self._console
+        indentation = Segment(' ' * self._indentation)
+        new_line = Segment.line()
+
+        # The sample is taken from the leading rows, across sections
+        sources = [iter(sec.rows) for sec in self._sections]
+        sampled = [[] for _ in self._sections]
+        if self._widths is None:
+            left = self._sample_size
+            for k, source in enumerate(sources):
+                sampled[k] = list(islice(source, left))
+                left -= len(sampled[k])
+                if left == 0:
+                    break
+
+        sample = [row for rows in sampled for row in rows]
+        if len(sample) == 0:
+            sample = [('',) * (self._expanded_column + 1)]
+        options, widths = self._layout(sample)
+        del sample
+
+        # Supplies the column settings to sections without rows
+        template = self._table([('',) * len(widths)])
+
+        index = 0
+        last_section = len(self._sections) - 1
+        for k, sec in enumerate(self._sections):
+            con.print(self._header_style(sec.title))
+
+            chunks = self._chunks(chain(sampled[k], sources[k]))
+            sampled[k] = None
+
+            # One chunk of look-ahead, to know where the section ends
+            chunk = next(chunks, [])
+            top = True
+            while True:
+                following = next(chunks, None)
+                bottom = following is None
+
+                table = self._table(chunk) if chunk else template
+                cells = table.dt_rows(con) if chunk else []
+
+                lines = Segment.split_lines(table.dt_render_rows(
+                    con, options, widths, cells, 0, len(cells),
+                    offset=index,
+                    row_count=index + len(cells) + \
+                        (0 if bottom and k == last_section else 1),
+                    top=top,
+                    bottom=bottom
+                ))
+                con.print(Segments(
+                    segment
+                    for line in lines
+                    for segment in (indentation, *line, new_line)
+                ), end='')
+
+                index += len(cells)
+                top = False
+                if bottom:
+                    break
+                chunk = following
+
+    def export(self, file, format='csv', columns=None, titles=True, **kwargs):
+        # `SimplePlainTable.export`, consuming the rows as it goes
+        from .export import export
+        export(
+            ((sec.title, sec.rows) for sec in self._sections),
+            file, format, columns, titles, **kwargs
+        )
 
 
 class DividableTable(Table):
@@ -166,28 +536,184 @@ class DividableTable(Table):
         self._dt_rows_start = start
         self._dt_rows_end = end
 
+        # Column measures known beforehand, see `.columns`
+        self.dt_measures = None
+
     def dt_select_rows(self, start: int, end: int) -> None:
         self._dt_rows_start = start
         self._dt_rows_end = end
 
-    def _render(
-        self, console: "Console", options: "ConsoleOptions", widths: List[int]
-    ) -> "RenderResult":
+    def dt_layout(
+        self, console: "Console", options: "ConsoleOptions"
+    ) -> Tuple["ConsoleOptions", List[int]]:
+        # The options and column widths `Table.__rich_console__` hands to
+        # `_render`
+        max_width = self.width if self.width is not None else options.max_width
+        extra_width = self._extra_width
 
-        if self._dt_rows_end < 0:
-            self._dt_rows_end = self.row_count
+        widths = self._calculate_column_widths(
+            console, options.update_width(max_width - extra_width)
+        )
+        render_options = options.update(
+            width=sum(widths) + extra_width, highlight=self.highlight, height=None
+        )
+        return render_options, widths
 
-        table_style = console.get_style(self.style or "")
+    def dt_declared_layout(
+        self,
+        console: "Console",
+        options: "ConsoleOptions",
+        widths: Sequence[Optional[int]]
+    ) -> Tuple["ConsoleOptions", List[int]]:
+        # `dt_layout` with declared column widths, the `None` ones sharing
+        # what is left of the table's width
+        max_width = self.width if self.width is not None else options.max_width
+        extra_width = self._extra_width
+
+        available = max_width - extra_width
+        free = [k for k, w in enumerate(widths) if w is None]
+        rest = max(available - sum(w for w in widths if w is not None), 0)
+
+        widths = list(widths)
+        for n, k in enumerate(free):
+            widths[k] = rest // len(free) + (1 if n < rest % len(free) else 0)
+
+        render_options = options.update(
+            width=sum(widths) + extra_width, highlight=self.highlight, height=None
+        )
+        return render_options, widths
 
-        border_style = table_style + console.get_style(self.border_style or "")
-        rows: List[Tuple[_Cell, ...]] = list(
+    def dt_rows(self, console: "Console") -> List[Tuple["_Cell", ...]]:
+        return list(
             zip(
                 *(
-                    self._get_cells(column_index, column)
+                    self._get_cells(console, column_index, column)
                     for column_index, column in enumerate(self.columns)
                 )
             )
         )
+
+    def _measure_column(
+        self,
+        console: "Console",
+        options: "ConsoleOptions",
+        column: Column,
+    ) -> Measurement:
+        # `Table._measure_column`, with plain cells measured through
+        # `.text_layout`
+        max_width = options.max_width
+        if max_width < 1:
+            return Measurement(0, 0)
+
+        padding_width = self._get_padding_width(column._index)
+        if column.width is not None:
+            # Fixed width column
+            return Measurement(
+                column.width + padding_width, column.width + padding_width
+            ).with_maximum(max_width)
+        if self.dt_measures is not None and self.dt_measures[column._index] is not None:
+            return Measurement(*measure_widths(
+                *self.dt_measures[column._index], padding_width, max_width
+            ))
+        # Flexible column, we need to measure contents
+        min_widths: List[int] = []
+        max_widths: List[int] = []
+        append_min = min_widths.append
+        append_max = max_widths.append
+        get_render_width = Measurement.get
+        for cell in self._get_cells(console, column._index, column):
+            text = plain_cell_text(cell.renderable)
+            if text is not None:
+                _min, _max = measure_plain_cell(
+                    text, cell.renderable.left + cell.renderable.right, max_width
+                )
+            else:
+                _min, _max = get_render_width(console, options, cell.renderable)
+            append_min(_min)
+            append_max(_max)
+
+        measurement = Measurement(
+            max(min_widths) if min_widths else 1,
+            max(max_widths) if max_widths else max_width,
+        ).with_maximum(max_width)
+        measurement = measurement.clamp(
+            None if column.min_width is None else column.min_width + padding_width,
+            None if column.max_width is None else column.max_width + padding_width,
+        )
+        return measurement
+
+    def dt_cell_lines(
+        self,
+        console: "Console",
+        renderable: "RenderableType",
+        options: "ConsoleOptions",
+        style: Style
+    ) -> List[List[Segment]]:
+        # `console.render_lines` of a cell, with plain cells wrapped through
+        # `.text_layout` into the same segments rich would produce
+        text = plain_cell_text(renderable) if wraps_plainly(options) else None
+        width = options.max_width - renderable.left - renderable.right \
+            if text is not None else 0
+        if width < 1:
+            return console.render_lines(renderable, options, style=style)
+
+        if style:
+            pad_style = text_style = style
+        else:
+            pad_style, text_style = Style(), None
+
+        left = [Segment(' ' * renderable.left, pad_style)] if renderable.left else []
+        right = [Segment(' ' * renderable.right, pad_style)] if renderable.right else []
+
+        return [
+            [*left, Segment(line, text_style), *right]
+            for line in text_layouts.wrap(text, width, options.overflow)
+        ]
+
+    def dt_row_style(self, console: "Console", index: int, offset: int = 0) -> Style:
+        # `Table.get_row_style`, alternating by the index in the whole table
+        style = Style.null()
+        if self.row_styles:
+            style += console.get_style(self.row_styles[index % len(self.row_styles)])
+        row_style = self.rows[index - offset].style
+        if row_style is not None:
+            style += console.get_style(row_style)
+        return style
+
+    def _render(
+        self, console: "Console", options: "ConsoleOptions", widths: List[int]
+    ) -> "RenderResult":
+        end = self._dt_rows_end if self._dt_rows_end >= 0 else self.row_count
+
+        yield from self.dt_render_rows(
+            console, options, widths, self.dt_rows(console),
+            self._dt_rows_start, end
+        )
+
+    def dt_render_rows(
+        self,
+        console: "Console",
+        options: "ConsoleOptions",
+        widths: List[int],
+        rows: List[Tuple["_Cell", ...]],
+        start: int,
+        end: int,
+        offset: int = 0,
+        row_count: Optional[int] = None,
+        top: bool = True,
+        bottom: bool = True
+    ) -> "RenderResult":
+        # `rows[start:end]`, framed like a table of its own. Row styles
+        # follow the index in `rows`, so alternating rows carry on across
+        # consecutive ranges. When `rows` is a window of a longer table,
+        # `offset` is the index of its first row and `row_count` the length
+        # of the table, and `top` and `bottom` select the edges to draw.
+        if row_count is None:
+            row_count = offset + len(rows)
+
+        table_style = console.get_style(self.style or "")
+
+        border_style = table_style + console.get_style(self.border_style or "")
         _box = (
             self.box.substitute(
                 options, safe=pick_bool(self.safe_box, console.safe_box)
@@ -196,7 +722,6 @@ class DividableTable(Table):
             else None
         )
 
-        # _box = self.box
         new_line = Segment.line()
 
         columns = self.columns
@@ -225,23 +750,18 @@ class DividableTable(Table):
                     _Segment(_box.mid_vertical, border_style),
                 ),
             ]
-            if show_edge:
+            if show_edge and top:
                 yield _Segment(_box.get_top(widths), border_style)
                 yield new_line
         else:
             box_segments = []
 
-        get_row_style = self.get_row_style
         get_style = console.get_style
 
-        start = self._dt_rows_start
-        end = self._dt_rows_end
-
-        for index, (first, last, row) in enumerate(loop_first_last(rows)):
-
-            # Hope this does the trick
-            if index < start or index >= end:
-                continue
+        for index in range(offset + start, offset + end):
+            row = rows[index - offset]
+            first = index == 0
+            last = index == row_count - 1
 
             header_row = first and show_header
             footer_row = last and show_footer
@@ -250,8 +770,8 @@ class DividableTable(Table):
             if header_row or footer_row:
                 row_style = Style.null()
             else:
-                row_style = get_style(
-                    get_row_style(index - 1 if show_header else index)
+                row_style = self.dt_row_style(
+                    console, index - 1 if show_header else index, offset
                 )
             for width, cell, column in zip(widths, row, columns):
                 render_options = options.update(
@@ -261,8 +781,8 @@ class DividableTable(Table):
                     overflow=column.overflow,
                 )
                 cell_style = table_style + row_style + get_style(cell.style)
-                lines = console.render_lines(
-                    cell.renderable, render_options, style=cell_style
+                lines = self.dt_cell_lines(
+                    console, cell.renderable, render_options, cell_style
                 )
                 max_height = max(max_height, len(lines))
                 cells.append(lines)
@@ -311,7 +831,7 @@ class DividableTable(Table):
             if _box and (show_lines or leading):
                 if (
                     not last
-                    and not (show_footer and index >= len(rows) - 2)
+                    and not (show_footer and index >= row_count - 2)
                     and not (show_header and header_row)
                 ):
                     if leading:
@@ -326,7 +846,7 @@ class DividableTable(Table):
                         )
                     yield new_line
 
-        if _box and show_edge:
+        if _box and show_edge and bottom:
             yield _Segment(_box.get_bottom(widths), border_style)
             yield new_line
 
@@ -0,0 +1,278 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from rich.cells import cell_len, chop_cells, set_cell_size
+
+
+# Measuring and wrapping of plain table cells, memoized per string.
+#
+# Rendering a table measures every cell to solve the column widths and then
+# wraps every cell to its column, and rich does both from scratch (markup
+# parsing, word splitting, cell widths) on every render. Help texts rarely
+# change between renders, only the terminal width does, so the work that
+# does not depend on the width is kept per string: its cell width, its
+# widest word and its break opportunities. Wrapping at a new width then
+# only walks the words. The last few wraps of every string are kept too.
+#
+# Results match rich's `Text.wrap` and `Text.__rich_measure__` exactly for
+# the strings `DividableTable` hands to this module, see `plain_cell_text`.
+# Pure ASCII strings skip rich's cell width tables altogether.
+
+TEXT_LAYOUT_MAX_STRINGS = 8192
+
+# Wraps kept per string, for terminals that are being resized
+WRAPS_PER_STRING = 4
+
+# The word pattern of `rich._wrap`: a word and the whitespace around it
+_re_word = re.compile(r'\s*\S+\s*')
+
+# Anything rich's markup or emoji replacement could change: escapes, tags
+# and `:code:`s
+_re_markup = re.compile(r'\\\[|\[[a-z#/@]|:\S*?:')
+
+
+def is_plain_text(text: str) -> bool:
+    # Whether rich prints `text` as is
+    return text.isprintable() and _re_markup.search(text) is None
+
+
+class TextLayout:
+    # What is known about one string independent of the width
+
+    __slots__ = ('text', 'ascii', 'plain', 'width', 'min_width', '_words', 'wraps')
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.ascii = text.isascii()
+        self.plain = is_plain_text(text)
+
+        _cell_len = len if self.ascii else cell_len
+        self.width = _cell_len(text)
+        self.min_width = max(map(_cell_len, text.split()), default=self.width)
+
+        self._words = None
+        self.wraps = OrderedDict()
+
+    @property
+    def words(self) -> Tuple[Tuple[int, int, int, str], ...]:
+        # Break opportunities: the start of every word, with its width with
+        # and without the whitespace to its right. Only strings that do not
+        # fit on a line need them.
+        if self._words is None:
+            _cell_len = len if self.ascii else cell_len
+            words = []
+            for match in _re_word.finditer(self.text):
+                word = match.group(0)
+                words.append((match.start(), _cell_len(word.rstrip()), _cell_len(word), word))
+            self._words = tuple(words)
+        return self._words
+
+    def cell_len(self, text: str) -> int:
+        return len(text) if self.ascii else cell_len(text)
+
+    def set_cell_size(self, text: str, width: int) -> str:
+        if self.ascii:
+            return text[:width] + ' ' * (width - len(text))
+        return set_cell_size(text, width)
+
+    def divide(self, width: int, fold: bool) -> List[int]:
+        # `rich._wrap.divide_line` over the words found before
+        offsets = []
+        offset = 0
+
+        for start, stripped_width, word_width, word in self.words:
+            if width - offset >= stripped_width:
+                offset += word_width
+            elif stripped_width > width:
+                # The word does not fit on any line
+                if fold:
+                    chopped = [word[k:k+width] for k in range(0, len(word), width)] \
+                        if self.ascii else chop_cells(word, width=width)
+                    for k, part in enumerate(chopped):
+                        if start:
+                            offsets.append(start)
+                        if k == len(chopped) - 1:
+                            offset = self.cell_len(part)
+                        else:
+                            start += len(part)
+                else:
+                    if start:
+                        offsets.append(start)
+                    offset = word_width
+            elif offset and start:
+                offsets.append(start)
+                offset = word_width
+
+        return offsets
+
+    def wrap(self, width: int, overflow: str) -> Tuple[str, ...]:
+        # Lines like `Text.wrap` with left justification: trailing space
+        # beyond `width` dropped, overflowing lines cut, every line padded
+        # to `width`
+        text = self.text
+        if self.width <= width:
+            # One line, nothing to cut
+            return (text + ' ' * (width - self.width),)
+
+        offsets = self.divide(width, overflow == 'fold')
+        bounds = zip([0] + offsets, offsets + [len(text)])
+
+        lines = []
+        for start, end in bounds:
+            line = text[start:end]
+
+            if len(line) > width:
+                trailing = len(line) - len(line.rstrip())
+                line = line[:len(line) - min(trailing, len(line) - width)]
+
+            length = self.cell_len(line)
+            if length > width:
+                if overflow == 'ellipsis':
+                    line = self.set_cell_size(line, width - 1) + '…'
+                else:
+                    line = self.set_cell_size(line, width)
+            elif length < width:
+                line += ' ' * (width - length)
+
+            lines.append(line)
+
+        return tuple(lines)
+
+
+class TextLayoutCache:
+    # Least recently used `TextLayout`s, with hit counters for both
+    # the layouts and the wraps
+
+    def __init__(self, max_strings: int = TEXT_LAYOUT_MAX_STRINGS) -> None:
+        self.max_strings = max_strings
+        self._layouts = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.wrap_hits = 0
+        self.wrap_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    def layout(self, text: str) -> TextLayout:
+        layouts = self._layouts
+        layout = layouts.get(text)
+
+        if layout is not None:
+            self.hits += 1
+            layouts.move_to_end(text)
+            return layout
+
+        self.misses += 1
+        layout = layouts[text] = TextLayout(text)
+        if len(layouts) > self.max_strings:
+            layouts.popitem(last=False)
+            self.evictions += 1
+        return layout
+
+    def measure(self, text: str) -> Tuple[int, int]:
+        # Like `Text.__rich_measure__`: widest word, whole width
+        layout = self.layout(text)
+        return (layout.min_width, layout.width)
+
+    def wrap(self, text: str, width: int, overflow: str) -> Tuple[str, ...]:
+        return self.wrap_layout(self.layout(text), width, overflow)
+
+    def wrap_layout(self, layout: TextLayout, width: int, overflow: str) -> Tuple[str, ...]:
+        key = (width, overflow)
+
+        lines = layout.wraps.get(key)
+        if lines is not None:
+            self.wrap_hits += 1
+            return lines
+
+        self.wrap_misses += 1
+        lines = layout.wraps[key] = layout.wrap(width, overflow)
+        if len(layout.wraps) > WRAPS_PER_STRING:
+            layout.wraps.popitem(last=False)
+        return lines
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    @property
+    def wrap_hit_rate(self) -> float:
+        lookups = self.wrap_hits + self.wrap_misses
+        return self.wrap_hits / lookups if lookups > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'strings': len(self._layouts),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+            'wrap_hits': self.wrap_hits,
+            'wrap_misses': self.wrap_misses,
+            'wrap_hit_rate': self.wrap_hit_rate,
+        }
+
+    def clear(self) -> None:
+        self._layouts.clear()
+        self.hits = self.misses = self.evictions = 0
+        self.wrap_hits = self.wrap_misses = 0
+
+
+# Shared by all tables
+text_layouts = TextLayoutCache()
+
+
+def plain_cell_text(renderable) -> Optional[str]:
+    # The string of a table cell (a `str` in the `Padding` that
+    # `Table._get_cells` wraps cells in) if rich would render it as is
+    inner = getattr(renderable, 'renderable', None)
+    if type(inner) != str or renderable.top or renderable.bottom or \
+            not renderable.expand or renderable.style != 'none':
+        return None
+    return inner if text_layouts.layout(inner).plain else None
+
+def wraps_plainly(options) -> bool:
+    # Whether cells rendered with `options` are wrapped like `TextLayout.wrap`
+    return not options.highlight and not options.no_wrap and \
+        options.justify == 'left' and \
+        options.overflow in ('fold', 'crop', 'ellipsis')
+
+def measure_plain_cell(text: str, extra: int, max_width: int) -> Tuple[int, int]:
+    # `Measurement.get` of a `Padding` of `extra` cells around `text`, with
+    # the clamping of both levels
+    return measure_layout(text_layouts.layout(text), extra, max_width)
+
+def measure_layout(layout: TextLayout, extra: int, max_width: int) -> Tuple[int, int]:
+    return measure_widths(layout.min_width, layout.width, extra, max_width)
+
+def measure_widths(min_width: int, width: int, extra: int, max_width: int) -> Tuple[int, int]:
+    # The same for a string whose widest word and width are known. Both
+    # results only grow with `min_width` and `width`, so a column of cells
+    # measures like its widest word and its widest cell.
+    if max_width < 1:
+        return (0, 0)
+
+    if max_width - extra < 1:
+        minimum = maximum = max_width
+    else:
+        minimum, maximum = min_width, width
+        minimum, maximum = _normalize(minimum, maximum, max_width)
+        if maximum < 1:
+            minimum = maximum = 0
+        minimum, maximum = min(minimum + extra, max_width), min(maximum + extra, max_width)
+
+    minimum, maximum = _normalize(minimum, maximum, max_width)
+    if maximum < 1:
+        return (0, 0)
+    return _normalize(minimum, maximum, max_width)
+
+def _normalize(minimum: int, maximum: int, max_width: int) -> Tuple[int, int]:
+    # `Measurement.normalize().with_maximum(max_width)`
+    minimum = min(max(0, minimum), maximum)
+    minimum, maximum = max(0, minimum), max(0, max(minimum, maximum))
+    return (min(minimum, max_width), min(maximum, max_width))
@@ -0,0 +1,133 @@
+from typing import Optional, Sequence
+
+
+# Token kinds, stored one byte per argument
+POSITIONAL = 0
+SHORT = 1        # `-v`, `-vvq`, `-n5`
+LONG = 2         # `--verbose`, `--number=5`
+TERMINATOR = 3   # `--`, everything after it is positional
+NUMBER = 4       # `-5`, `-.5`; an option only if the command registers `-5`
+
+
+def classify(arg: str) -> int:
+    if len(arg) < 2 or arg[0] != '-':
+        return POSITIONAL
+
+    second = arg[1]
+    if second == '-':
+        return TERMINATOR if len(arg) == 2 else LONG
+    if second in '0123456789.':
+        return NUMBER
+    return SHORT
+
+def tokenize(args: Sequence[str], start: int = 0) -> bytearray:
+    # Same rules as `classify`, inlined since this runs once per argument.
+    kinds = bytearray(len(args))
+
+    for i in range(start, len(args)):
+        arg = args[i]
+        if len(arg) < 2 or arg[0] != '-':
+            continue
+
+        second = arg[1]
+        if second == '-':
+            if len(arg) == 2:
+                kinds[i] = TERMINATOR
+                break
+            kinds[i] = LONG
+        elif second in '0123456789.':
+            kinds[i] = NUMBER
+        else:
+            kinds[i] = SHORT
+
+    return kinds
+
+
+class ArgumentCursor:
+    # A single position in argv shared by `Command.parse` and every
+    # parameter interpreter it calls. It is an iterator, so interpreters keep
+    # using `next(itr)`, but nothing is ever sliced or copied: interpreters
+    # advance the one cursor and `consumed` says exactly how far they got.
+    #
+    # Interpreters never see past a `--` terminator. Values that are not in
+    # argv, such as the `5` of `--number=5`, are pushed in front of the
+    # cursor with `push_back`.
+
+    __slots__ = ('_args', '_kinds', '_pos', '_end', '_pending', '_consumed')
+
+    def __init__(
+        self,
+        args: Sequence[str],
+        start: int = 0,
+        kinds: Optional[bytearray] = None
+    ) -> None:
+        self._args = args
+        self._kinds = kinds if kinds is not None else tokenize(args, start)
+        self._pos = start
+        self._pending = []
+        self._consumed = 0
+
+        end = self._kinds.find(TERMINATOR, start)
+        self._end = end if end >= 0 else len(args)
+
+    def __iter__(self) -> 'ArgumentCursor':
+        return self
+
+    def __next__(self) -> str:
+        if self._pending:
+            self._consumed += 1
+            return self._pending.pop()
+
+        pos = self._pos
+        if pos >= self._end:
+            raise StopIteration
+
+        self._pos = pos + 1
+        self._consumed += 1
+        return self._args[pos]
+
+    @property
+    def consumed(self) -> int:
+        return self._consumed
+
+    @property
+    def position(self) -> int:
+        return self._pos
+
+    @property
+    def has_pending(self) -> bool:
+        return len(self._pending) > 0
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        if offset < len(self._pending):
+            return self._pending[-1 - offset]
+
+        pos = self._pos + offset - len(self._pending)
+        return self._args[pos] if pos < self._end else None
+
+    def peek_kind(self) -> Optional[int]:
+        # Kind of the next argument, `None` at the end. Pushed back values
+        # are never options.
+        if self._pending:
+            return POSITIONAL
+        if self._pos < self._end:
+            return self._kinds[self._pos]
+        if self._pos < len(self._args):
+            return TERMINATOR
+        return None
+
+    def push_back(self, value: Optional[str] = None) -> None:
+        # Without a value, the last argument taken from argv is put back.
+        if value is None:
+            assert self._pos > 0, \
+                'Nothing to push back.'
+            self._pos -= 1
+        else:
+            self._pending.append(value)
+        self._consumed -= 1
+
+    def skip_terminator(self) -> None:
+        # Steps over `--`; the rest of argv is then readable as positionals.
+        assert self.peek_kind() == TERMINATOR
+        self._pos += 1
+        self._end = len(self._args)
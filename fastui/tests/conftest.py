@@ -0,0 +1,24 @@
+import pytest
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+@pytest.fixture
+def noop():
+    # A callback that accepts anything and does nothing
+    return _noop
+
+
+@pytest.fixture
+def make_parser():
+    # `ArgumentParser(program_name='prog', version='0.0.1', callback=noop)`,
+    # the arguments overridden or extended by keyword
+    from fastui.terminal import ArgumentParser
+
+    def make(**kwargs):
+        arguments = dict(program_name='prog', version='0.0.1', callback=_noop)
+        arguments.update(kwargs)
+        return ArgumentParser(**arguments)
+    return make
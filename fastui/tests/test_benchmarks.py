@@ -0,0 +1,290 @@
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+from .test_import_time import STARTUP_SNIPPET, _importtime
+
+# Benchmarks of the hot paths, run with `FASTUI_BENCHMARKS=1`:
+#
+#   FASTUI_BENCHMARKS=1 python -m pytest fastui/tests/test_benchmarks.py
+#
+# Each benchmark records its best wall time over a few runs and, in a run of
+# its own, its `tracemalloc` peak. All results are written as JSON to
+# `FASTUI_BENCHMARK_RESULTS` (by default `benchmarks.json` in the fastui
+# cache directory). With `FASTUI_BENCHMARK_BASELINE` pointing at an earlier
+# results file, a benchmark fails when its time or peak grows by more than
+# `FASTUI_BENCHMARK_THRESHOLD` (a fraction, 0.25 by default). Save a
+# baseline by copying a results file: baselines only mean something on the
+# machine they were recorded on.
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('FASTUI_BENCHMARKS'),
+    reason='Benchmarks run with FASTUI_BENCHMARKS=1.'
+)
+
+THRESHOLD = float(os.environ.get('FASTUI_BENCHMARK_THRESHOLD', 0.25))
+
+# Runs of a benchmark: at least `MIN_RUNS`, and more until `MIN_SECONDS`
+# have passed, up to `MAX_RUNS`
+MIN_RUNS = 3
+MAX_RUNS = 1000
+MIN_SECONDS = 0.5
+
+_results = {}
+
+
+def _results_path():
+    path = os.environ.get('FASTUI_BENCHMARK_RESULTS')
+    if path is None:
+        from fastui._cache import cache_directory
+        path = os.path.join(cache_directory(), 'benchmarks.json')
+    return path
+
+def _baseline():
+    path = os.environ.get('FASTUI_BENCHMARK_BASELINE')
+    if path is None:
+        return {}
+    with open(path) as fh:
+        return json.load(fh)['results']
+
+
+@pytest.fixture(scope='module', autouse=True)
+def _write_results():
+    yield
+
+    if len(_results) == 0:
+        return
+
+    path = _results_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as fh:
+        json.dump({
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': _results,
+        }, fh, indent=2, sort_keys=True)
+
+
+def _record(name, seconds, peak_bytes, **extra):
+    # Stores the result, and compares it with the baseline
+    _results[name] = dict(seconds=seconds, peak_bytes=peak_bytes, **extra)
+
+    base = _baseline().get(name)
+    if base is None:
+        return
+
+    assert seconds <= base['seconds'] * (1 + THRESHOLD), \
+        f'`{name}` took {seconds:.6f} s, {seconds / base["seconds"] - 1:+.0%} ' \
+        f'on the baseline of {base["seconds"]:.6f} s.'
+    assert peak_bytes <= base['peak_bytes'] * (1 + THRESHOLD), \
+        f'`{name}` peaked at {peak_bytes} bytes, ' \
+        f'{peak_bytes / base["peak_bytes"] - 1:+.0%} on the baseline of ' \
+        f'{base["peak_bytes"]} bytes.'
+
+def _benchmark(name, run, setup=lambda: None, **extra):
+    # `run(setup())` once to warm up (lazy imports, caches), then timed
+    # without tracing allocations, then once more under `tracemalloc` for
+    # its peak
+    run(setup())
+
+    times = []
+    started = time.perf_counter()
+    while len(times) < MIN_RUNS or \
+            (len(times) < MAX_RUNS and time.perf_counter() - started < MIN_SECONDS):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    state = setup()
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    _record(name, min(times), peak, **extra)
+    return min(times)
+
+
+@pytest.fixture
+def options_parser(make_parser, noop):
+    # A parser of `option_count` int options, `--option-0` on
+    def make(option_count):
+        parser = make_parser()
+        for k in range(option_count):
+            parser.add_int_option(f'option{k}', f'Option {k}.', f'option-{k}',
+                parameter_descriptor='n', callback=noop)
+        return parser
+    return make
+
+
+def test_import_time():
+    # Cumulative `-X importtime` of the parsing surface, and the peak of
+    # importing it, each in a fresh interpreter
+    totals = []
+    for _ in range(MIN_RUNS):
+        totals.append(sum(
+            cumulative for name, cumulative in _importtime(STARTUP_SNIPPET)
+            if not name.startswith(' ') and name.startswith('fastui')
+        ))
+
+    peak = int(subprocess.run(
+        [sys.executable, '-c',
+            'import tracemalloc; tracemalloc.start(); '
+            f'{STARTUP_SNIPPET}; print(tracemalloc.get_traced_memory()[1])'],
+        capture_output=True, text=True, check=True
+    ).stdout)
+
+    _record('import', min(totals) / 1e6, peak)
+
+
+@pytest.mark.parametrize('option_count', (10, 1000, 10000))
+def test_construct(options_parser, option_count):
+    _benchmark(f'construct {option_count} options', lambda _: options_parser(option_count))
+
+
+def test_parse_long_argv(options_parser):
+    parser = options_parser(100)
+    argv = ['prog']
+    for k in range(20000):
+        argv += [f'--option-{k % 100}', str(k)]
+
+    seconds = _benchmark(
+        'parse 40000 arguments',
+        lambda _: parser.parse_args(argv),
+        arguments=len(argv) - 1
+    )
+    _results['parse 40000 arguments']['arguments_per_second'] = (len(argv) - 1) / seconds
+
+
+@pytest.mark.parametrize('nested', (False, True))
+def test_parse_list(nested):
+    from fastui.terminal.argument_parsing import DEFAULT_LIST_DELIMITERS
+    from fastui.terminal.lists import parse_list_from_string
+
+    if nested:
+        string = '[' + ', '.join(f'[{k}, {k + 1}, "{k}, {k}"]' for k in range(30000)) + ']'
+        name = 'parse_list 30000 nested lists'
+    else:
+        string = '[' + ', '.join(str(k / 7) for k in range(100000)) + ']'
+        name = 'parse_list 100000 floats'
+
+    _benchmark(name, lambda _: parse_list_from_string(
+        string, DEFAULT_LIST_DELIMITERS, str if nested else float
+    ))
+
+
+def _help_rows(row_count):
+    return [
+        (f'--option-{k} <value>', f'What option {k} does, at a length that wraps at 100 columns '
+            'some of the time.' if k % 3 == 0 else f'Option {k}.')
+        for k in range(row_count)
+    ]
+
+
+@pytest.mark.parametrize('row_count', (20, 2000, 200000))
+def test_print_table(row_count):
+    from rich.console import Console
+    from fastui.terminal import SimplePlainTable
+
+    rows = _help_rows(row_count)
+
+    with open(os.devnull, 'w') as devnull:
+        def setup():
+            console = Console(file=devnull, width=100)
+            return SimplePlainTable(
+                SimplePlainTable.Section('options', rows[:row_count // 2]),
+                SimplePlainTable.Section('more options', rows[row_count // 2:]),
+                console=console
+            )
+
+        _benchmark(f'print {row_count} rows', lambda table: table.print(), setup)
+
+
+@pytest.mark.parametrize('row_count', (2000, 20000))
+def test_print_table_through_rich(row_count):
+    # The same table as `test_print_table`, printed by rich instead of
+    # `.plain_render`
+    from rich.console import Console
+    from fastui.terminal import SimplePlainTable
+
+    rows = _help_rows(row_count)
+    with open(os.devnull, 'w') as devnull:
+        def setup():
+            console = Console(file=devnull, width=100)
+            return console, SimplePlainTable(
+                SimplePlainTable.Section('options', rows[:row_count // 2]),
+                SimplePlainTable.Section('more options', rows[row_count // 2:]),
+                console=console
+            )
+
+        _benchmark(f'print {row_count} rows through rich',
+            lambda state: state[0].print(state[1]), setup)
+
+
+def test_pager_first_frame():
+    from rich.console import Console
+    from fastui.terminal import SimplePlainTable, TablePager
+
+    table = SimplePlainTable(
+        SimplePlainTable.Section('Rows', tuple(_help_rows(1000000))),
+        console=Console(file=io.StringIO(), width=100, height=50)
+    )
+    _benchmark('pager first frame of 1000000 rows', lambda _: TablePager(table).frame())
+
+
+def test_live_refresh():
+    # 100 refreshes of a 300 row table, 5 rows changed before each
+    from rich.console import Console
+    from fastui.terminal import SimplePlainTable
+    from fastui.terminal.live import LiveTable
+
+    row_count = 300
+    updates = [(k * 7919 % row_count, f'busy, {k % 100}% done') for k in range(500)]
+
+    with open(os.devnull, 'w') as devnull:
+        def setup():
+            section = SimplePlainTable.Section('Workers', [
+                (f'worker-{k}', 'idle') for k in range(row_count)
+            ])
+            console = Console(file=devnull, width=100, height=400, force_terminal=True)
+            live = LiveTable(SimplePlainTable(section, console=console))
+            live.start()
+            return section, live
+
+        def run(state):
+            section, live = state
+            for frame in range(100):
+                for k, status in updates[frame * 5:frame * 5 + 5]:
+                    section.update(k, (f'worker-{k}', status))
+                live.refresh()
+            live.stop()
+
+        _benchmark('live table 100 refreshes', run, setup)
+
+
+@pytest.mark.parametrize('format', ('csv', 'tsv', 'jsonl', 'markdown'))
+def test_export(format):
+    from fastui.terminal.export import export
+
+    sections = [
+        (f'section {s}', [
+            (f'--option-{s}-{r}', f'What option {r} of section {s} does', str(r))
+            for r in range(20000)
+        ])
+        for s in range(10)
+    ]
+
+    with open(os.devnull, 'wb') as devnull:
+        _benchmark(f'export 200000 rows as {format}', lambda _: export(
+            sections, devnull, format, columns=('option', 'help', 'index')
+        ))
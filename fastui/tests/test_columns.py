@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from rich.console import Console
+
+from fastui.terminal.columns import from_columns
+from fastui.terminal.tables import SimplePlainTable
+from fastui.terminal.text_layout import TextLayoutCache
+
+np = pytest.importorskip('numpy')
+
+
+def _measure(cells):
+    # The column measure `TextLayout` gives cell by cell
+    cache = TextLayoutCache()
+    return (
+        max((cache.measure(cell)[0] for cell in cells), default=0),
+        max((cache.measure(cell)[1] for cell in cells), default=0),
+    )
+
+
+def test_formats_and_alignment():
+    rows, measures = from_columns(
+        [np.array([1, 20, 300]), np.array([0.5, 1.25, -3.0]), np.array(['a', 'bb', 'c c'])],
+        formats=[None, '%.2f', None]
+    )
+    assert rows == (
+        ('  1', ' 0.50', 'a'),
+        (' 20', ' 1.25', 'bb'),
+        ('300', '-3.00', 'c c'),
+    )
+    assert measures == ((3, 3), (5, 5), (2, 3))
+
+    rows, _ = from_columns([np.array([1, 22]), np.array(['a', 'bbb'])],
+        align=['left', 'center'])
+    assert rows == (('1', ' a '), ('22', 'bbb'))
+
+
+def test_structured_arrays():
+    data = np.array(
+        [(b'alpha', 1.5, 7), (b'beta', -2.25, 1000)],
+        dtype=[('name', 'S8'), ('value', 'f8'), ('count', 'i4')]
+    )
+    section = SimplePlainTable.Section('Data', data)
+    assert section.data == (('alpha', '  1.5', '   7'), ('beta', '-2.25', '1000'))
+    assert section.size == (3, 2)
+    assert section.measures == ((5, 5), (5, 5), (4, 4))
+
+
+@pytest.mark.parametrize('cells', [
+    ['a', 'b c', ''],
+    ['word', '  ', 'two  spaces'],
+    ['[bold]markup[/bold]', 'x'],
+    ['tab\tbed', 'x'],
+    ['漢字', 'ascii'],
+    [],
+])
+@pytest.mark.parametrize('align', ['left', 'right', 'center'])
+def test_measures_match_cells(cells, align):
+    rows, (measure,) = from_columns([np.array(cells, dtype=str)], align=[align])
+    column = [row[0] for row in rows]
+    # Columns that cannot be measured as a whole are left to the cells
+    assert measure is None or measure == _measure(column)
+
+
+def test_same_output_as_rows():
+    values = np.arange(300) * 1.5
+    names = np.array([f'item {k}' for k in range(300)])
+    from_arrays = SimplePlainTable.Section.from_columns('Items', [names, values], formats=[None, '%.1f'])
+    as_rows = SimplePlainTable.Section('Items', from_arrays.data)
+
+    for color in (True, False):
+        outputs = []
+        for section in (from_arrays, as_rows):
+            console = Console(file=io.StringIO(), width=50, force_terminal=color,
+                color_system='truecolor' if color else None)
+            SimplePlainTable(section, console=console).print()
+            outputs.append(console.file.getvalue())
+        assert outputs[0] == outputs[1]
+
+
+def test_invalid_columns():
+    with pytest.raises(AssertionError):
+        from_columns([np.arange(2), np.arange(3)])
+    with pytest.raises(AssertionError):
+        from_columns([np.zeros((2, 2))])
+    with pytest.raises(AssertionError):
+        from_columns([np.arange(2)], formats=['%d', '%d'])
+    with pytest.raises(AssertionError):
+        from_columns([np.arange(2)], align=['middle'])
+    with pytest.raises(AssertionError):
+        from_columns([])
@@ -0,0 +1,116 @@
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from fastui.terminal.completion import complete, complete_from_index, completion_index, \
+    completion_script, load_index, run_complete
+from fastui.terminal.resolver import ArgumentError
+
+
+@pytest.fixture
+def make_tree(make_parser, noop):
+    def make(version='1.0'):
+        parser = make_parser(version=version)
+        parser.add_simple_option('verbose', 'More output.', 'v', 'verbose', callback=noop)
+        parser.add_int_option('jobs', 'Parallel jobs.', 'j', 'jobs',
+            parameter_descriptor='n', callback=noop)
+        parser.add_command(names=['install', 'i'], help_text='Install.', callback=noop)
+        parser.command('install').add_command(names=['package'], help_text='A package.',
+            callback=noop)
+        parser.command('install').add_command(names=['plugin'], help_text='A plugin.',
+            callback=noop)
+        parser.command('install').add_string_option('target', 'Target.', 'target',
+            parameter_descriptor='dir', callback=noop)
+        return parser
+    return make
+
+
+@pytest.fixture(autouse=True)
+def _cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('FASTUI_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(sys, 'argv', [__file__])
+
+
+def test_complete(make_tree):
+    index = completion_index(make_tree())
+
+    assert complete(index, ['']) == ['i', 'install']
+    assert complete(index, ['--j']) == ['--jobs']
+    assert complete(index, ['-']) == ['--help', '--jobs', '--verbose', '-h', '-j', '-v']
+    assert complete(index, ['install', '']) == ['package', 'plugin']
+    assert complete(index, ['-v', 'install', 'p']) == ['package', 'plugin']
+    assert complete(index, ['install', '--t']) == ['--target']
+    # Parameters are left to the shell
+    assert complete(index, ['--jobs', '']) == []
+    assert complete(index, ['-vj', '']) == []
+    assert complete(index, ['--jobs=3', '']) == ['i', 'install']
+    assert complete(index, ['--', '']) == []
+
+
+def test_index_follows_the_version(make_tree, noop, capsys):
+    parser = make_tree('1.0')
+    run_complete(parser, ['install', ''])
+    assert capsys.readouterr().out == 'package\nplugin\n'
+
+    assert load_index('prog', '1.0') is not None
+    assert load_index('prog', '2.0') is None
+
+    with pytest.raises(SystemExit):
+        complete_from_index('prog', ['prog', '__complete', 'install', ''], version='1.0')
+    assert capsys.readouterr().out == 'package\nplugin\n'
+
+    # Upgraded: the stored index is not used, and replaced on the next answer
+    complete_from_index('prog', ['prog', '__complete', 'install', ''], version='2.0')
+    upgraded = make_tree('2.0')
+    upgraded.command('install').add_command(names=['pack'], help_text='A pack.',
+        callback=noop)
+    run_complete(upgraded, ['install', ''])
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit):
+        complete_from_index('prog', ['prog', '__complete', 'install', ''], version='2.0')
+    assert capsys.readouterr().out == 'pack\npackage\nplugin\n'
+
+    # Nothing to check the index against
+    complete_from_index('prog', ['prog', '__complete', ''])
+
+
+def test_complete_through_a_subcommand(make_tree, capsys):
+    parser = make_tree()
+    parser.parse(argument_list=['prog', '__complete', 'install', '--'])
+    assert capsys.readouterr().out == '--help\n--target\n'
+
+    # Only the program answers completions, a command parses it as any argument
+    with pytest.raises(ArgumentError, match='Unexpected argument `__complete`'):
+        parser.command('install').parse(argument_list=['install', '__complete', ''])
+
+
+def test_changed_tree_replaces_index(make_tree, noop, capsys):
+    run_complete(make_tree(), [''])
+    parser = make_tree()
+    parser.add_command(names=['remove'], help_text='Remove.', callback=noop)
+    run_complete(parser, [''])
+
+    assert complete(load_index('prog', '1.0'), ['r']) == ['remove']
+
+
+def test_scripts():
+    for shell in ('bash', 'zsh', 'fish'):
+        assert '__complete' in completion_script('my-prog', shell)
+
+    # An empty current token is passed on: `prog install <TAB>`
+    assert '"$current"' in completion_script('my-prog', 'fish')
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason='Needs bash.')
+def test_bash_script():
+    script = completion_script('my-prog', 'bash')
+    out = subprocess.run(
+        ['bash', '-c', script + '\nmy-prog() { printf "%s|" "$@"; echo; }\n'
+            'COMP_WORDS=(my-prog install ""); COMP_CWORD=2; _fastui_complete_my_prog; '
+            'echo "${COMPREPLY[@]}"'],
+        capture_output=True, text=True
+    ).stdout
+    assert out.strip() == '__complete|install||'
@@ -0,0 +1,190 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fastui.terminal.results import ParseResult
+
+
+@pytest.fixture
+def parser(make_parser, noop):
+    parser = make_parser(std_help=False)
+    parser.add_simple_option('verbose', 'More output.', 'v', 'verbose', callback=noop)
+    parser.add_int_option('jobs', 'Parallel jobs.', 'j', 'jobs',
+        parameter_descriptor='n', callback=noop)
+    parser.add_list_option('weights', 'Weights.', 'w', 'weights',
+        list_delimiters=None, element_parser=float,
+        parameter_descriptor='list', callback=noop)
+    parser.add_command(
+        names=['install', 'i'],
+        help_text='Install packages.',
+        parameter_interpreters=[list],
+        parameter_descriptors=['packages'],
+        callback=noop
+    )
+    parser.command('install').add_string_option('target', 'Target directory.',
+        't', 'target', parameter_descriptor='dir', callback=noop)
+    return parser
+
+
+def _random_argv(rng):
+    argv = ['prog']
+
+    if rng.random() < 0.5:
+        argv += ['install'] + [f'pkg{rng.randrange(100)}' for _ in range(rng.randrange(5))]
+        if rng.random() < 0.5:
+            argv += [f'--target=/opt/{rng.randrange(10)}']
+        return argv
+
+    for _ in range(rng.randrange(6)):
+        choice = rng.randrange(3)
+        if choice == 0:
+            argv.append('-' + 'v' * rng.randint(1, 3))
+        elif choice == 1:
+            argv += ['--jobs', str(rng.randrange(64))]
+        else:
+            argv += ['-w', '[' + ', '.join(str(rng.random()) for _ in range(4)) + ']']
+    return argv
+
+
+def test_parse_result_is_immutable(parser):
+    result = parser.parse_args(['prog', '-v', '-j', '3'])
+
+    assert type(result) == ParseResult
+    assert result.options['jobs'] == (3,)
+    assert result.occurrences == (('verbose', ()), ('jobs', (3,)))
+
+    with pytest.raises(AttributeError):
+        result.parameters = ()
+    with pytest.raises(TypeError):
+        result.options['jobs'] = (4,)
+    with pytest.raises(AttributeError):
+        result.__dict__
+
+
+def test_parse_args_under_thread_pool(parser):
+    rng = random.Random(1234)
+    argvs = [_random_argv(rng) for _ in range(500)]
+
+    expected = [parser.parse_args(argv) for argv in argvs]
+
+    # Switch threads as often as possible to provoke interleaving
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            for _ in range(20):
+                results = list(pool.map(parser.parse_args, argvs))
+                assert results == expected
+    finally:
+        sys.setswitchinterval(interval)
+
+
+@pytest.fixture
+def scheduled_parser(make_parser):
+    # Callbacks that log their calls to `log`
+    def make(log, workers=None):
+        parser = make_parser(
+            callback=lambda *args, **kwargs: log.append(('prog', args, dict(kwargs))),
+            std_help=False,
+            callback_workers=workers
+        )
+
+        def record(key, delay):
+            def callback(n):
+                time.sleep(delay)
+                log.append((key, n))
+            return callback
+
+        async def fetch(n):
+            await asyncio.sleep(0.1)
+            log.append(('fetch', n))
+
+        parser.add_int_option('cache', 'Open the cache.', 'cache',
+            parameter_descriptor='n', callback=record('cache', 0.1))
+        parser.add_int_option('scan', 'Scan a directory.', 'scan',
+            parameter_descriptor='n', callback=record('scan', 0.1))
+        parser.add_int_option('index', 'Index the scan.', 'index',
+            parameter_descriptor='n', callback=record('index', 0))
+        parser.add_int_option('fetch', 'Fetch over the network.', 'fetch',
+            parameter_descriptor='n', callback=fetch)
+        parser.add_callback_dependencies('index', 'cache', 'scan')
+        return parser
+    return make
+
+
+def test_dependencies_order_callbacks(scheduled_parser):
+    log = []
+    parser = scheduled_parser(log)
+    parser.parse(argument_list=['prog', '--index', '1', '--scan', '2', '--index', '3'])
+
+    assert log == [
+        ('scan', 2), ('index', 1), ('index', 3),
+        ('prog', (), {'index': (3,), 'scan': (2,)}),
+    ]
+
+
+def test_independent_callbacks_overlap(make_parser):
+    # `cache`, `scan` and `fetch` only get past the barrier if all three run
+    # at the same time, whatever the load on the machine
+    log = []
+    barrier = threading.Barrier(3, timeout=10)
+
+    def meet(key):
+        def callback(n):
+            barrier.wait()
+            log.append((key, n))
+        return callback
+
+    async def fetch(n):
+        await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+        log.append(('fetch', n))
+
+    parser = make_parser(
+        callback=lambda *args, **kwargs: log.append(('prog', args, dict(kwargs))),
+        std_help=False,
+        callback_workers=4
+    )
+    for key, callback in (('cache', meet('cache')), ('scan', meet('scan')),
+            ('index', lambda n: log.append(('index', n))), ('fetch', fetch)):
+        parser.add_int_option(key, key.title() + '.', key,
+            parameter_descriptor='n', callback=callback)
+    parser.add_callback_dependencies('index', 'cache', 'scan')
+
+    parser.parse(argument_list=['prog', '--index', '1', '--cache', '2', '--fetch', '3', '--scan', '4'])
+
+    assert not barrier.broken
+    assert log.index(('index', 1)) > max(log.index(('cache', 2)), log.index(('scan', 4)))
+    assert log[-1][0] == 'prog' and len(log) == 5
+
+
+def test_dispatch_async(scheduled_parser):
+    log = []
+    parser = scheduled_parser(log)
+
+    async def main():
+        await parser.dispatch_async(parser.parse_args(['prog', '--fetch', '1']))
+    asyncio.run(main())
+
+    assert log == [('fetch', 1), ('prog', (), {'fetch': (1,)})]
+
+
+def test_failing_callback_stops_dependents(scheduled_parser):
+    log = []
+    parser = scheduled_parser(log, workers=2)
+
+    def fail(n):
+        raise ValueError(n)
+    parser.add_int_option('fail', 'Fail.', 'fail', parameter_descriptor='n', callback=fail)
+    parser.add_callback_dependencies('index', 'fail')
+
+    with pytest.raises(ValueError):
+        parser.parse(argument_list=['prog', '--fail', '1', '--index', '2'])
+    assert log == []
+
+    with pytest.raises(AssertionError):
+        parser.add_callback_dependencies('fail', 'index')
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+
+import pytest
+
+from fastui.terminal.export import export, export_lines
+
+
+_CELLS = ['plain', 'a,b', 'tab\there', 'say "hi"', 'two\nlines', 'bare\rreturn',
+    'crlf\r\nend', '', '100%', '']
+
+def _sections():
+    # Chunks of plain rows and of rows with every kind of cell
+    return [
+        ('first', [(f'row {r}', f'help {r}') for r in range(5)]),
+        ('with\rreturn', [(cell, cell) for cell in _CELLS]),
+        ('last', [('', 'x'), ('y', '')]),
+    ]
+
+def _expected(titles):
+    return [
+        ((title,) if titles else ()) + tuple(row)
+        for title, rows in _sections() for row in rows
+    ]
+
+
+@pytest.mark.parametrize('format,delimiter', [('csv', ','), ('tsv', '\t')])
+@pytest.mark.parametrize('titles', [True, False])
+@pytest.mark.parametrize('chunk_rows', [1, 3, 1000])
+def test_csv_round_trip(format, delimiter, titles, chunk_rows):
+    text = ''.join(export_lines(_sections(), format, columns=('name', 'help'),
+        titles=titles, chunk_rows=chunk_rows))
+
+    rows = list(csv.reader(io.StringIO(text, newline=''), delimiter=delimiter))
+    header = ['section', 'name', 'help'] if titles else ['name', 'help']
+    assert rows[0] == header
+    assert [tuple(row) for row in rows[1:]] == _expected(titles)
+
+
+def test_csv_single_column():
+    text = ''.join(export_lines([('s', [('a',), ('',), ('b\rc',)])], titles=False))
+    assert list(csv.reader(io.StringIO(text, newline=''))) == [['a'], [''], ['b\rc']]
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 1000])
+def test_jsonl_round_trip(chunk_rows):
+    text = ''.join(export_lines(_sections(), 'jsonl', columns=('name', 'help'),
+        chunk_rows=chunk_rows))
+
+    objects = [json.loads(line) for line in text.splitlines() if line]
+    assert [(o['section'], o['name'], o['help']) for o in objects] == _expected(True)
+
+
+def test_markdown():
+    text = ''.join(export_lines([('a|b', [('x|y', 'one\ntwo')])], 'markdown',
+        columns=('name', 'help')))
+    assert text == '## a\\|b\n\n| name | help |\n|---|---|\n| x\\|y | one<br>two |\n'
+
+
+def test_export_to_files(tmp_path):
+    path = tmp_path / 'out.csv'
+    with open(path, 'w', encoding='utf-8', newline='') as fh:
+        fh.write('# exported\n')
+        export(_sections(), fh, columns=('name', 'help'))
+    with open(path, 'rb') as fh:
+        binary = io.BytesIO()
+        export(_sections(), binary, columns=('name', 'help'))
+        assert fh.read() == b'# exported\n' + binary.getvalue()
@@ -0,0 +1,105 @@
+import pytest
+
+from fastui.terminal.spec import parser_from_spec
+
+
+@pytest.fixture
+def make_tree(make_parser, noop):
+    def make(defer_validation=True):
+        parser = make_parser(defer_validation=defer_validation)
+        parser.add_simple_option('verbose', 'More output.', 'v', 'verbose', callback=noop)
+        parser.add_command(names=['install'], help_text='Install.', callback=noop,
+            parameter_interpreters=[lambda itr: next(itr)], parameter_descriptors=['package'])
+        parser.command('install').add_int_option('jobs', 'Parallel jobs.', 'j', 'jobs',
+            parameter_descriptor='n', callback=noop)
+        return parser
+    return make
+
+
+@pytest.fixture
+def add_invalid_option(noop):
+    def add(command, **changes):
+        arguments = dict(key='bad', help_text='Bad.', shortcuts=['bad'],
+            parameter_interpreters=[], parameter_descriptors=[], callback=noop)
+        arguments.update(changes)
+        command.add_option(**arguments)
+    return add
+
+
+@pytest.mark.parametrize('changes', [
+    dict(key=3),
+    dict(help_text=b'bytes'),
+    dict(shortcuts=[]),
+    dict(shortcuts=['b', 4]),
+    dict(parameter_interpreters=[int], parameter_descriptors=[5]),
+    dict(callback='not callable'),
+])
+@pytest.mark.parametrize('in_command', [False, True])
+def test_invalid_options(make_tree, add_invalid_option, changes, in_command):
+    parser = make_tree()
+    command = parser.command('install') if in_command else parser
+    # Only checked when the tree is frozen
+    add_invalid_option(command, **changes)
+
+    with pytest.raises(AssertionError):
+        parser.freeze()
+
+
+def test_invalid_commands(make_tree, noop):
+    parser = make_tree()
+    parser.add_command(names=['ok', 7], callback=noop)
+    with pytest.raises(AssertionError):
+        parser.freeze()
+
+    parser = make_tree()
+    parser.add_command(names=['ok'], help_text=1.5, callback=noop)
+    with pytest.raises(AssertionError):
+        parser.parse_args(['prog', 'ok'])
+
+
+def test_checked_when_added_without_deferring(make_tree, add_invalid_option):
+    parser = make_tree(defer_validation=False)
+    with pytest.raises(AssertionError):
+        add_invalid_option(parser, key=3)
+
+
+def test_parsing_freezes(make_tree):
+    parser = make_tree()
+    result = parser.parse_args(['prog', 'install', '-j', '2', 'pkg'])
+    assert result.path == ('prog', 'install')
+    assert parser._frozen and parser.command('install')._frozen
+
+
+@pytest.mark.parametrize('defer_validation', [True, False])
+def test_frozen_trees_refuse_additions(make_tree, noop, defer_validation):
+    parser = make_tree(defer_validation)
+    parser.freeze()
+    parser.freeze()
+
+    for command in (parser, parser.command('install')):
+        with pytest.raises(AssertionError, match='is frozen'):
+            command.add_simple_option('quiet', 'Less output.', 'q', callback=noop)
+        with pytest.raises(AssertionError, match='is frozen'):
+            command.add_command(names=['more'], callback=noop)
+        with pytest.raises(AssertionError, match='is frozen'):
+            command.add_callback_dependencies('help', 'help')
+
+    # The tree still parses as before
+    assert parser.parse_args(['prog', 'install', 'pkg']).parameters == ('pkg',)
+
+
+def test_spec_trees_are_checked_already(noop):
+    parser = parser_from_spec({
+        'program_name': 'prog',
+        'version': '0.0.1',
+        'callback': 'main',
+        'options': [{'key': 'verbose', 'shortcuts': ['v'], 'callback': 'main'}],
+        'commands': [{'names': ['install'], 'options': [
+            {'key': 'jobs', 'shortcuts': ['j'], 'type': 'int'},
+        ]}],
+    }, {'main': noop}, use_cache=False)
+
+    assert parser._validated and parser.command('install')._validated
+    assert all(opt._validated for opt in parser.command('install')._option_list)
+    parser.freeze()
+    assert parser.command('install')._frozen
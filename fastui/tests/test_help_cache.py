@@ -0,0 +1,57 @@
+import io
+import os
+
+import pytest
+from rich.console import Console
+
+from fastui.terminal.help_cache import help_key, print_help
+
+
+@pytest.fixture
+def make_tree(make_parser, noop):
+    def make(console):
+        parser = make_parser(console=console, help_text='A program.')
+        parser.add_int_option('jobs', 'Parallel jobs.', 'j', 'jobs',
+            parameter_descriptor='n', callback=noop)
+        return parser
+    return make
+
+
+def _console(**kwargs):
+    return Console(file=io.StringIO(), width=80, **kwargs)
+
+
+def test_key_covers_the_console(make_tree):
+    parser = make_tree(_console())
+    content = parser._help_content()
+
+    def key(console):
+        return help_key(content, console, parser.style)
+
+    base = key(_console(color_system=None))
+    assert key(_console(color_system=None)) == base
+    assert key(_console(color_system=None, force_terminal=True)) != base
+    assert key(_console(color_system='truecolor', force_terminal=True)) != base
+    assert key(Console(file=io.StringIO(), width=81, color_system=None)) != base
+
+    console = _console(color_system=None)
+    console.file = io.TextIOWrapper(io.BytesIO(), encoding='latin-1')
+    assert key(console) != base
+
+
+def test_cached_screens(make_tree, tmp_path):
+    outputs = []
+    for console in (
+        _console(color_system='truecolor', force_terminal=True),
+        _console(color_system='truecolor', force_terminal=True),
+        _console(color_system=None),
+        _console(color_system=None),
+    ):
+        print_help(make_tree(console), cache_dir=str(tmp_path))
+        outputs.append(console.file.getvalue())
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert outputs[0] == outputs[1] and outputs[2] == outputs[3]
+    # Terminal output is never replayed into a pipe
+    assert '\x1b[' in outputs[0] and '\x1b[' not in outputs[2]
+    assert '--jobs' in outputs[2]
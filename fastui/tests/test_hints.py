@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import enum
+from decimal import Decimal
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import pytest
+
+from fastui.terminal.hints import _signatures, interpreters_for
+from fastui.terminal.resolver import ArgumentError
+
+
+class Unit(enum.Enum):
+    px = 1
+    em = 2
+
+
+def _interpret(callback, *args):
+    interpreters, _ = interpreters_for(callback)
+    itr = iter(args)
+    return [interpret(itr) for interpret in interpreters]
+
+
+def test_interpreters():
+    def resize(width: int, height: Optional[int], scale: float, unit: Unit,
+            name: str, files: list[Path], sizes: Sequence[Decimal]): ...
+
+    interpreters, descriptors = interpreters_for(resize)
+    assert descriptors == ('width', 'height', 'scale', 'unit', 'name', 'files', 'sizes')
+    assert _interpret(resize, '3', '-4', '0.5', 'em', 'x', '[a, b/c]', '[1.10]') == \
+        [3, -4, 0.5, Unit.em, 'x', [Path('a'), Path('b/c')], [Decimal('1.10')]]
+
+
+def test_methods_and_nested_lists():
+    class Tool:
+        def run(self, grid: List[List[int]], pairs: Tuple[int, ...]): ...
+
+    assert interpreters_for(Tool().run)[1] == ('grid', 'pairs')
+    assert _interpret(Tool().run, '[[1, 2], [3]]', '[4, 5]') == [[[1, 2], [3]], [4, 5]]
+
+
+@pytest.mark.parametrize('hint,value,message', [
+    (int, 'x', '`x` is not a valid int.'),
+    (float, '1.2.3', '`1.2.3` is not a valid float.'),
+    (Decimal, 'ten', '`ten` is not a valid Decimal.'),
+    (Unit, 'pt', '`pt` must be one of px, em.'),
+    (List[int], '[1, y]', '`y` is not a valid int.'),
+])
+def test_rejected_arguments(hint, value, message):
+    def callback(value): ...
+    callback.__annotations__ = {'value': hint}
+
+    with pytest.raises(ArgumentError) as info:
+        _interpret(callback, value)
+    assert str(info.value) == message
+
+
+@pytest.mark.parametrize('hint', [
+    Tuple[int, str], Optional[Tuple[int, float]], List[Tuple[str, int]],
+    bool, Optional[bool], 'int | str', Optional[int | str],
+])
+def test_rejected_hints(hint):
+    def callback(value): ...
+    callback.__annotations__ = {'value': hint}
+
+    with pytest.raises(AssertionError):
+        interpreters_for(callback)
+
+
+def test_missing_hint():
+    def callback(a: int, b): ...
+    with pytest.raises(AssertionError, match='Parameter `b`'):
+        interpreters_for(callback)
+
+
+def test_cache():
+    # Same parameters and annotations, the same interpreters
+    def first(count: int, names: list[str]): ...
+    def second(count: int, names: list[str]): ...
+    def other(count: float, names: list[str]): ...
+    def renamed(total: int, names: list[str]): ...
+
+    result = interpreters_for(first)
+    assert interpreters_for(second) is result
+    assert interpreters_for(first) is result
+    assert interpreters_for(other)[0] is not result[0]
+    assert interpreters_for(renamed)[1] == ('total', 'names')
+
+    # Postponed annotations are cached by their strings
+    assert first.__annotations__ == {'count': 'int', 'names': 'list[str]'}
+    assert (__name__, (('count', 'int'), ('names', 'list[str]')), None) in _signatures
+
+    # Different defaults, different interpreters
+    def defaulted(count: int, names: list[str] = None): ...
+    assert interpreters_for(defaulted)[0] is not result[0]
+
+
+def test_unhashable_annotations():
+    def callback(value): ...
+    callback.__annotations__ = {'value': int, 'return': []}
+    assert interpreters_for(callback)[1] == ('value',)
+
+    callback.__annotations__ = {'value': [int]}
+    with pytest.raises((AssertionError, TypeError)):
+        interpreters_for(callback)
+
+
+def test_typed_command(make_parser):
+    def install(packages: list[str], jobs: Optional[int]): ...
+
+    parser = make_parser(std_help=False)
+    parser.add_typed_command(['install'], install, help_text='Install.')
+
+    result = parser.parse_args(['prog', 'install', '[a, b]', '4'])
+    assert list(result.parameters) == [['a', 'b'], 4]
+
+    with pytest.raises(ArgumentError, match='`four` is not a valid int.'):
+        parser.parse_args(['prog', 'install', '[a]', 'four'])
+
+    # `Optional` parameters can be left out
+    assert list(parser.parse_args(['prog', 'install', '[a]']).parameters) == [['a'], None]
+
+
+def test_defaults(make_parser):
+    def resize(width: int, height: Optional[int] = 10, unit: Unit = Unit.px,
+            tags: list[str] = ()): ...
+
+    parser = make_parser(std_help=False)
+    parser.add_typed_command(['resize'], resize)
+
+    def parameters(*args):
+        return list(parser.parse_args(['prog', 'resize', *args]).parameters)
+
+    assert parameters('3') == [3, 10, Unit.px, ()]
+    assert parameters('3', '4', 'em') == [3, 4, Unit.em, ()]
+    assert parameters('3', '4', 'em', '[a]') == [3, 4, Unit.em, ['a']]
+    with pytest.raises(ArgumentError, match='expects 4 parameter'):
+        parameters()
+
+    class Tool:
+        def run(self, jobs: int = 1): ...
+    assert _interpret(Tool().run) == [1]
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+# Import-time budget for the argument parsing surface, in microseconds of
+# cumulative `python -X importtime` time (see README, "Import time").
+IMPORT_BUDGET_US = int(os.environ.get('FASTUI_IMPORT_BUDGET_US', 50_000))
+
+# Modules that must only be imported once something is rendered.
+DEFERRED_MODULES = ('rich', 'numpy', 'tabulate')
+
+STARTUP_SNIPPET = 'import fastui.terminal; fastui.terminal.ArgumentParser'
+
+
+def _importtime(snippet):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', snippet],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented below the module that imported them.
+        entries.append((name[1:].rstrip(), int(cumulative)))
+    return entries
+
+
+def test_startup_does_not_import_rendering_dependencies():
+    names = [name.strip() for name, _ in _importtime(STARTUP_SNIPPET)]
+
+    for name in names:
+        assert name.split('.')[0] not in DEFERRED_MODULES, \
+            f'`{name}` was imported while only parsing arguments.'
+
+
+def test_startup_import_time_budget():
+    # Top-level entries carry the cumulative time of everything they pulled in.
+    total = sum(
+        cumulative for name, cumulative in _importtime(STARTUP_SNIPPET)
+        if not name.startswith(' ') and name.startswith('fastui')
+    )
+
+    assert total <= IMPORT_BUDGET_US, \
+        f'Importing fastui.terminal took {total} us, ' \
+        f'the budget is {IMPORT_BUDGET_US} us.'
@@ -0,0 +1,130 @@
+import pytest
+
+from fastui.terminal import ArgumentParser
+from fastui.terminal.argument_parsing import DEFAULT_LIST_DELIMITERS
+from fastui.terminal.lists import ListGrammar, list_grammar, parse_list, \
+    parse_list_from_string
+from fastui.terminal.resolver import ArgumentError
+
+
+def _parse(string, typ=str, dtype=None):
+    return parse_list_from_string(string, DEFAULT_LIST_DELIMITERS, typ, dtype)
+
+
+@pytest.mark.parametrize('string,expected', [
+    ('[]', []),
+    ('[ ]', []),
+    ('[a]', ['a']),
+    ('[a, b ,c,]', ['a', 'b', 'c']),
+    ('( a b , c )', ['a b', 'c']),
+    ('[[a], (b, c), {}]', [['a'], ['b', 'c'], []]),
+    ('[[[[a]]]]', [[[['a']]]]),
+    ('["a, b", "[c]", d]', ['a, b', '[c]', 'd']),
+    ('["say \\"hi\\""]', ['say "hi"']),
+    ('["  padded  "]', ['  padded  ']),
+    ('[a"b"c]', ['abc']),
+    ('plain', 'plain'),
+])
+def test_grammar(string, expected):
+    assert _parse(string) == expected
+
+
+def test_elements():
+    assert _parse('[1, 2, -3]', int) == [1, 2, -3]
+    assert _parse('[1.5, (2)]', float) == [1.5, [2.0]]
+    assert _parse('[ 1 ,2 ]', int) == [1, 2]
+
+
+@pytest.mark.parametrize('string,message', [
+    ('[a, b', 'Unterminated list'),
+    ('[a, (b]', 'does not close'),
+    ('[a] b', 'around list'),
+    ('[a] [b]', 'after list'),
+    ('[a [b]]', 'Unexpected `\\[` in list'),
+    ('[a, "b]', 'Unterminated quote'),
+])
+def test_malformed(string, message):
+    with pytest.raises(ArgumentError, match=message):
+        _parse(string)
+
+
+@pytest.mark.parametrize('string', ['[a,,b]', '[,]', '[ , ]', '[a,,]', '[a,,[b]]', '[[a],,[b]]', '[(a),(,)]'])
+def test_empty_elements(string):
+    # Flat and nested lists follow the same rule
+    with pytest.raises(ArgumentError, match='Empty element'):
+        _parse(string)
+    with pytest.raises(ArgumentError, match='Empty element'):
+        _parse(string.replace('a', '1').replace('b', '2'), int)
+
+
+def test_invalid_elements():
+    with pytest.raises(ArgumentError, match='`x` is not a valid element'):
+        _parse('[1, x, 3]', int)
+    with pytest.raises(ArgumentError, match='`x` is not a valid element'):
+        _parse('[1, (2, x)]', int)
+    assert _parse('[a, "", b]') == ['a', '', 'b']
+
+
+def test_deep_nesting():
+    # Parsed with a stack, not recursion
+    depth = 10000
+    result = _parse('[' * depth + 'x' + ']' * depth)
+    for _ in range(depth - 1):
+        result = result[0]
+    assert result == ['x']
+
+
+def test_gather():
+    itr = iter(['[a,', '(b', 'c),', '"d', ']"]', 'next'])
+    assert parse_list(itr, DEFAULT_LIST_DELIMITERS, str) == ['a', ['b c'], 'd ]']
+    assert next(itr) == 'next'
+
+    with pytest.raises(ArgumentError, match='Unterminated list `\\[a b`'):
+        parse_list(iter(['[a', 'b']), DEFAULT_LIST_DELIMITERS, str)
+    with pytest.raises(ArgumentError, match='is not a list'):
+        parse_list(iter(['a']), DEFAULT_LIST_DELIMITERS, str)
+    with pytest.raises(StopIteration):
+        parse_list(iter([]), DEFAULT_LIST_DELIMITERS, str)
+
+
+def test_delimiters():
+    assert list_grammar(('<', '>')) is list_grammar((('<', '>'),))
+    assert parse_list_from_string('<a, <b>>', ('<', '>'), str) == ['a', ['b']]
+
+    with pytest.raises(AssertionError):
+        ListGrammar((('[', ','),))
+    with pytest.raises(AssertionError):
+        ListGrammar((('[[', ']]'),))
+    with pytest.raises(AssertionError):
+        ListGrammar(())
+
+
+def test_dtype():
+    np = pytest.importorskip('numpy')
+
+    flat = _parse('[1, 2.5, -3]', float, 'float32')
+    assert isinstance(flat, np.ndarray)
+    assert flat.dtype == np.float32 and flat.tolist() == [1.0, 2.5, -3.0]
+
+    nested = _parse('[[1, 2], [3, 4]]', int, 'int64')
+    assert nested.dtype == np.int64 and nested.shape == (2, 2)
+
+    empty = _parse('[]', float, 'float64')
+    assert empty.shape == (0,)
+
+    with pytest.raises(ArgumentError, match='`x` is not a valid element'):
+        _parse('[1, x]', float, 'float32')
+    with pytest.raises(ArgumentError, match='cannot be converted'):
+        _parse('[[1, 2], [3]]', int, 'int64')
+
+
+def test_list_option():
+    seen = []
+    parser = ArgumentParser(program_name='prog', version='0.0.1',
+        callback=lambda **kwargs: None, std_help=False)
+    parser.add_list_option('weights', 'Weights.', 'w', 'weights',
+        list_delimiters=None, element_parser=float,
+        parameter_descriptor='list', callback=seen.append)
+
+    parser.dispatch(parser.parse_args(['prog', '-w', '[1,', '2]', '--weights=[3]']))
+    assert seen == [[1.0, 2.0], [3.0]]
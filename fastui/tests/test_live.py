@@ -0,0 +1,147 @@
+import io
+import re
+
+import pytest
+from rich.console import Console
+
+from fastui.terminal.live import LiveTable
+from fastui.terminal.tables import SimplePlainTable
+
+
+_re_control = re.compile(r'(\x1b\[[0-9?]*[A-Za-z]|\r|\n)')
+
+
+class Terminal:
+    # What a terminal shows after the output of a `LiveTable`, with the
+    # cursor movements and erasures it uses
+    def __init__(self, console):
+        self.console = console
+        self.lines = []
+        self.row = 0
+        self.read = 0
+        self.written = ''
+
+    def update(self):
+        output = self.console.file.getvalue()
+        self.written = output[self.read:]
+        self.read = len(output)
+
+        for token in _re_control.split(self.written):
+            if token in ('', '\r'):
+                continue
+            if token == '\n':
+                self.row += 1
+            elif token.startswith('\x1b['):
+                count = int(token[2:-1] or 1) if token[-1] in 'AB' else 0
+                if token[-1] == 'A':
+                    self.row -= count
+                elif token[-1] == 'B':
+                    self.row += count
+                elif token[-1] == 'J':
+                    del self.lines[self.row:]
+            else:
+                self.lines.extend([''] * (self.row + 1 - len(self.lines)))
+                self.lines[self.row] = token
+        return self
+
+
+def _console(width=50):
+    return Console(file=io.StringIO(), width=width, height=200,
+        force_terminal=True, color_system=None)
+
+def _printed(table, width=50):
+    console = _console(width)
+    SimplePlainTable(*table._sections, console=console).print()
+    return console.file.getvalue().splitlines()
+
+def _table(console, count=10):
+    section = SimplePlainTable.Section('Workers', [
+        (f'worker-{k}', 'idle') for k in range(count)
+    ])
+    return section, SimplePlainTable(section, console=console)
+
+def _rewritten(terminal):
+    # Lines written, as opposed to moved over
+    return terminal.written.count('\x1b[K')
+
+
+def test_start_shows_the_table():
+    console = _console()
+    section, table = _table(console)
+    with LiveTable(table) as live:
+        terminal = Terminal(console).update()
+        assert terminal.lines == _printed(table)
+        assert terminal.row == len(terminal.lines)
+        assert live.frame() == terminal.lines
+
+
+def test_only_changed_lines_are_written():
+    console = _console()
+    section, table = _table(console)
+    with LiveTable(table) as live:
+        terminal = Terminal(console).update()
+
+        section.update(3, ('worker-3', 'busy'))
+        live.refresh()
+        terminal.update()
+        assert _rewritten(terminal) == 1
+        assert terminal.lines == _printed(table)
+        assert terminal.row == len(terminal.lines)
+
+        # Nothing changed, nothing written
+        live.refresh()
+        assert terminal.update().written == ''
+
+        section.update(3, ('worker-3', 'busy'))
+        live.refresh()
+        assert _rewritten(terminal.update()) == 0
+
+
+def test_inserts_and_removals():
+    console = _console()
+    section, table = _table(console)
+    with LiveTable(table) as live:
+        terminal = Terminal(console).update()
+
+        section.append(('worker-10', 'new'))
+        live.refresh()
+        assert terminal.update().lines == _printed(table)
+
+        section.remove(0)
+        section.remove(0)
+        live.refresh()
+        assert terminal.update().lines == _printed(table)
+        assert terminal.row == len(terminal.lines)
+
+        section.data = [('only', 'row')]
+        live.refresh()
+        assert terminal.update().lines == _printed(table)
+
+
+def test_wider_cells_change_the_widths():
+    console = _console()
+    section, table = _table(console)
+    with LiveTable(table) as live:
+        terminal = Terminal(console).update()
+
+        section.update(0, ('a-much-longer-worker-name', 'idle'))
+        live.refresh()
+        terminal.update()
+        assert _rewritten(terminal) == 10
+        assert terminal.lines == _printed(table)
+
+
+def test_not_a_terminal():
+    # Printed once, when the live table stops
+    console = Console(file=io.StringIO(), width=50, color_system=None)
+    section, table = _table(console)
+    with LiveTable(table) as live:
+        section.update(0, ('worker-0', 'busy'))
+        live.refresh()
+        assert console.file.getvalue() == ''
+    assert 'busy' in console.file.getvalue()
+
+    live.start()
+    with pytest.raises(AssertionError):
+        live.start()
+    live.stop()
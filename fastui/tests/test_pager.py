@@ -0,0 +1,135 @@
+import io
+
+from rich.console import Console
+
+from fastui.terminal.pager import TablePager
+from fastui.terminal.tables import SimplePlainTable
+
+
+def _pager(row_count, width=40, height=8, **kwargs):
+    console = Console(file=io.StringIO(), width=width, height=height)
+    table = SimplePlainTable(
+        SimplePlainTable.Section('Rows', tuple(
+            (f'b{r}', f'help of row {r}') for r in range(row_count)
+        )),
+        console=console
+    )
+    return TablePager(table, **kwargs)
+
+
+def _text(pager):
+    return [''.join(segment.text for segment in line) for line in pager.frame()]
+
+
+def _labels(lines):
+    return [line.split()[0] for line in lines[:-1] if line.strip().startswith('b')]
+
+
+def test_frame():
+    pager = _pager(100)
+    lines = _text(pager)
+
+    assert len(lines) == 8
+    assert lines[0].startswith('Rows')
+    assert _labels(lines) == ['b0', 'b1', 'b2', 'b3', 'b4']
+    assert lines[-1].startswith('row 1 of 100')
+    assert all(len(line) == 40 for line in lines[1:])
+
+
+def test_scroll():
+    pager = _pager(100)
+    pager.handle('j')
+    pager.handle('j')
+    assert _labels(_text(pager))[0] == 'b0'
+    pager.handle('j')
+    assert _labels(_text(pager))[0] == 'b1'
+
+    pager.handle(' ')
+    assert _labels(_text(pager))[0] == 'b8'
+    pager.handle('b')
+    assert _labels(_text(pager))[0] == 'b1'
+    pager.handle('g')
+    assert _text(pager)[0].startswith('Rows')
+
+
+def test_end():
+    pager = _pager(1000)
+    assert pager.handle('G')
+    lines = _text(pager)
+
+    assert _labels(lines)[-1] == 'b999'
+    assert lines[-1].startswith('row 995 of 1000')
+
+    # Already at the end
+    pager.handle('j')
+    assert _text(pager) == lines
+
+
+def test_jump():
+    pager = _pager(1000)
+    for key in (':', '5', '0', '0'):
+        pager.handle(key)
+    assert _text(pager)[-1].startswith(':500')
+
+    pager.handle('enter')
+    lines = _text(pager)
+    assert _labels(lines)[0] == 'b499'
+    assert lines[-1].startswith('row 500 of 1000')
+
+    for key in (':', 'x', 'enter'):
+        pager.handle(key)
+    assert _text(pager)[-1].startswith('Not a row number: x')
+    assert _labels(_text(pager))[0] == 'b499'
+
+    for key in (':', '1', 'backspace', 'esc'):
+        pager.handle(key)
+    assert _labels(_text(pager))[0] == 'b499'
+
+
+def test_search():
+    pager = _pager(1000)
+    for key in ('/', 'r', 'o', 'w', ' ', '7', '7', 'enter'):
+        pager.handle(key)
+    assert _labels(_text(pager))[0] == 'b77'
+
+    pager.handle('n')
+    assert _labels(_text(pager))[0] == 'b770'
+    pager.handle('n')
+    assert _labels(_text(pager))[0] == 'b771'
+    pager.handle('N')
+    assert _labels(_text(pager))[0] == 'b770'
+
+    for key in ('/', 'n', 'o', 'p', 'e', 'enter'):
+        pager.handle(key)
+    lines = _text(pager)
+    assert lines[-1].startswith('Not found: nope')
+    assert _labels(lines)[0] == 'b770'
+
+
+def test_rows_beyond_the_sample():
+    # Labels get longer than every label of the sample
+    pager = _pager(200000, sample_size=16, block_size=8)
+
+    for row in (0, 99999, 150000, 199990):
+        pager.jump(row)
+        lines = _text(pager)
+        assert not any('…' in line for line in lines)
+        assert _labels(lines)[0] == f'b{row}'
+
+    pager.handle('G')
+    lines = _text(pager)
+    assert not any('…' in line for line in lines)
+    assert _labels(lines)[-1] == 'b199999'
+
+
+def test_declared_widths():
+    pager = _pager(100, widths=(6, None))
+    lines = _text(pager)
+    assert _labels(lines) == ['b0', 'b1', 'b2', 'b3', 'b4']
+    assert all(len(line) == 40 for line in lines[1:])
+
+
+def test_run():
+    pager = _pager(1000)
+    pager.run(keys=['G', 'q', 'g'])
+    assert _labels(_text(pager))[-1] == 'b999'
@@ -0,0 +1,117 @@
+import pytest
+
+from fastui.terminal.resolver import ArgumentError, TokenResolver, build_trie, trie_lookup
+
+
+@pytest.fixture
+def parse(make_parser, noop):
+    parser = make_parser(std_help=False)
+    parser.add_simple_option('verbose', 'More output.', 'v', 'verbose', callback=noop)
+    parser.add_simple_option('quiet', 'Less output.', 'q', 'quiet', callback=noop)
+    parser.add_int_option('number', 'A number.', 'n', 'number',
+        parameter_descriptor='n', callback=noop)
+    parser.add_simple_option('version-check', 'Check.', 'version-check', callback=noop)
+    parser.add_command(
+        names=['install', 'i'],
+        help_text='Install packages.',
+        parameter_interpreters=[list],
+        parameter_descriptors=['packages'],
+        callback=noop
+    )
+    parser.add_command(names=['inspect'], help_text='Inspect.', callback=noop)
+    parser.add_command(
+        names=['remove'],
+        help_text='Remove one package.',
+        parameter_interpreters=[lambda itr: next(itr)],
+        parameter_descriptors=['package'],
+        callback=noop
+    )
+
+    def parse(argv):
+        result = parser.parse_args(argv)
+        return result.path, result.occurrences, result.parameters
+    return parse
+
+
+def test_trie_lookup():
+    trie = build_trie({'install': 0, 'inspect': 1, 'in': 2})
+
+    assert trie_lookup(trie, 'in') == 2
+    assert trie_lookup(trie, 'insta') == 0
+    assert trie_lookup(trie, 'insp') == 1
+    assert trie_lookup(trie, 'insta', abbreviate=False) is None
+    assert trie_lookup(trie, 'out') is None
+    assert trie_lookup(build_trie({'install': 0}), '') is None
+    with pytest.raises(ArgumentError, match='inspect, install'):
+        trie_lookup(trie, 'ins')
+
+
+def test_resolve_option():
+    resolver = TokenResolver({}, {'v': 0, 'n': 1, 'verbose': 0, 'number': 1}, [0, 1])
+
+    assert resolver.resolve_option('-vvn5') == [(0, None), (0, None), (1, '5')]
+    assert resolver.resolve_option('-n=5') == [(1, '5')]
+    assert resolver.resolve_option('--num=5') == [(1, '5')]
+    assert resolver.resolve_option('--verbose') == [(0, None)]
+    assert not resolver.is_option('-5') and not resolver.is_option('-')
+
+
+def test_abbreviations(parse):
+    assert parse(['prog', '--verb', '--num', '3']) == \
+        (('prog',), (('verbose', ()), ('number', (3,))), ())
+    assert parse(['prog', 'rem', 'x'])[0] == ('prog', 'remove')
+    # An exact name wins over longer names it is a prefix of
+    assert parse(['prog', 'i', 'a'])[0] == ('prog', 'install')
+
+    with pytest.raises(ArgumentError, match='ambiguous'):
+        parse(['prog', '--ver'])
+    with pytest.raises(ArgumentError, match='ambiguous'):
+        parse(['prog', 'ins'])
+
+
+def test_empty_names(make_parser, noop):
+    # Not abbreviations of the only command or long option
+    parser = make_parser(std_help=False)
+    parser.add_simple_option('verbose', 'More output.', 'verbose', callback=noop)
+    parser.add_command(names=['run'], help_text='Run.', callback=noop)
+
+    with pytest.raises(ArgumentError, match='Unexpected argument ``'):
+        parser.parse_args(['prog', ''])
+    with pytest.raises(ArgumentError, match='Unknown option `--`'):
+        parser.parse_args(['prog', '--=foo'])
+    assert parser.parse_args(['prog', 'r']).path == ('prog', 'run')
+
+
+def test_bundling_and_inline_values(parse):
+    assert parse(['prog', '-vqn5'])[1] == (('verbose', ()), ('quiet', ()), ('number', (5,)))
+    assert parse(['prog', '-n=5'])[1] == (('number', (5,)),)
+    assert parse(['prog', '--number=-5'])[1] == (('number', (-5,)),)
+    assert parse(['prog', '-n', '-5'])[1] == (('number', (-5,)),)
+
+    with pytest.raises(ArgumentError, match='`-v` does not take a parameter'):
+        parse(['prog', '-v=3'])
+    with pytest.raises(ArgumentError, match='`-q` does not take a parameter'):
+        parse(['prog', '-vq=3'])
+    with pytest.raises(ArgumentError, match='does not take a parameter'):
+        parse(['prog', '--verbose=3'])
+    with pytest.raises(ArgumentError, match='Unknown option `-x` in `-vx`'):
+        parse(['prog', '-vx'])
+    with pytest.raises(ArgumentError, match='Unknown option `--nope`'):
+        parse(['prog', '--nope'])
+
+
+def test_terminator(parse):
+    assert parse(['prog', 'install', 'a', '--', '-q', '--', 'b'])[2] == \
+        (['a', '-q', '--', 'b'],)
+    assert parse(['prog', 'remove', '--', '--verbose'])[2] == ('--verbose',)
+
+
+def test_extra_arguments(parse):
+    with pytest.raises(ArgumentError, match='Unexpected argument `typo`'):
+        parse(['prog', 'typo', 'extra'])
+    with pytest.raises(ArgumentError, match='Unexpected argument `b`'):
+        parse(['prog', 'remove', 'a', 'b'])
+    with pytest.raises(ArgumentError, match='Unexpected argument `b`'):
+        parse(['prog', 'remove', '--', 'a', 'b'])
+    with pytest.raises(ArgumentError, match='expects 1 parameter'):
+        parse(['prog', 'remove'])
@@ -0,0 +1,137 @@
+import io
+import os
+import signal
+import socket
+import sys
+import time
+
+import pytest
+
+from fastui.terminal.client import default_socket_path, run
+from fastui.terminal.server import ParserServer
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'),
+    reason='The server forks and listens on a Unix socket.'
+)
+
+
+@pytest.fixture
+def parser(make_parser):
+    def main(name=None, **options):
+        print(f'hello {name[0] if name else "world"} from {os.getcwd()}')
+        print(os.environ.get('FASTUI_TEST_SECRET'), file=sys.stderr)
+        if 'fail' in options:
+            sys.exit(3)
+
+    parser = make_parser(callback=main, std_help=False)
+    parser.add_command(
+        names=['greet'],
+        help_text='Greet someone.',
+        parameter_interpreters=[lambda itr: [next(itr)]],
+        parameter_descriptors=['name'],
+        callback=lambda name, **options: print(f'hello {name[0]}')
+    )
+    parser.add_simple_option('fail', 'Exit with 3.', 'fail', callback=lambda: None)
+    return parser
+
+
+@pytest.fixture
+def server(parser, tmp_path):
+    path = str(tmp_path / 'prog.sock')
+    pid = os.fork()
+    if pid == 0:
+        try:
+            with ParserServer(parser, path) as srv:
+                srv.serve_forever()
+        finally:
+            os._exit(0)
+
+    for _ in range(500):
+        if os.path.exists(path):
+            break
+        time.sleep(0.01)
+    yield path
+
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+def _run(path, argv, monkeypatch):
+    out, err = io.BytesIO(), io.BytesIO()
+    monkeypatch.setattr(sys, 'stdout', io.TextIOWrapper(out))
+    monkeypatch.setattr(sys, 'stderr', io.TextIOWrapper(err))
+    code = run(argv=argv, socket_path=path)
+    return code, out.getvalue().decode(), err.getvalue().decode()
+
+
+def test_round_trip(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('FASTUI_TEST_SECRET', 'swordfish')
+
+    assert _run(server, ['prog'], monkeypatch) == \
+        (0, f'hello world from {tmp_path}\n', 'swordfish\n')
+    assert _run(server, ['prog', 'greet', 'you'], monkeypatch)[:2] == (0, 'hello you\n')
+    assert _run(server, ['prog', '--fail'], monkeypatch)[0] == 3
+
+    code, _, err = _run(server, ['prog', '--nope'], monkeypatch)
+    assert code == 2 and 'Unknown option `--nope`' in err
+
+
+def test_stdin_is_not_forwarded(server, tmp_path, monkeypatch):
+    # Never the server's own stdin
+    (tmp_path / 'args.txt').write_text('greet\nfile\n')
+    monkeypatch.chdir(tmp_path)
+    assert _run(server, ['prog', '@args.txt'], monkeypatch)[:2] == (0, 'hello file\n')
+
+    code, _, err = _run(server, ['prog', '--args-from', '-'], monkeypatch)
+    assert code == 2 and 'Cannot read arguments from `-`: there is no stdin.' in err
+
+
+def test_live_socket_is_not_replaced(parser, server):
+    with pytest.raises(OSError, match='already listening'):
+        ParserServer(parser, server)
+    assert os.path.exists(server)
+
+
+def test_stale_socket_is_replaced(parser, tmp_path):
+    path = str(tmp_path / 'prog.sock')
+    umask = os.umask(0o177)
+    try:
+        socket.socket(socket.AF_UNIX, socket.SOCK_STREAM).bind(path)
+    finally:
+        os.umask(umask)
+
+    with ParserServer(parser, path):
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+
+
+def test_foreign_sockets_are_refused(parser, tmp_path, monkeypatch):
+    # Listening, but readable by everyone
+    path = str(tmp_path / 'open.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with listener:
+        listener.bind(path)
+        os.chmod(path, 0o666)
+        listener.listen()
+
+        assert run(argv=['prog'], socket_path=path) is None
+        with pytest.raises(OSError, match='refusing'):
+            ParserServer(parser, path)
+
+        # Owned by another user
+        os.chmod(path, 0o600)
+        uid = os.getuid()
+        monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+        assert run(argv=['prog'], socket_path=path) is None
+
+    # A directory of another user, or open to everyone, is not used
+    monkeypatch.undo()
+    shared = tmp_path / 'shared'
+    shared.mkdir(mode=0o755)
+    os.chmod(shared, 0o755)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(shared))
+    assert default_socket_path('prog', create=True) is None
+    os.chmod(shared, 0o700)
+    assert default_socket_path('prog') == str(shared / 'fastui-prog.sock')
@@ -0,0 +1,82 @@
+import io
+import sys
+import tracemalloc
+
+import pytest
+
+from fastui.terminal.resolver import ArgumentError
+
+
+@pytest.fixture
+def parser(make_parser, noop):
+    parser = make_parser(std_help=False)
+    parser.add_simple_option('verbose', 'More output.', 'v', 'verbose', callback=noop)
+    parser.add_command(
+        names=['rm'],
+        help_text='Remove files.',
+        parameter_interpreters=[list],
+        parameter_descriptors=['paths'],
+        callback=noop
+    )
+    parser.command('rm').add_simple_option('force', 'Force.', 'f', 'force', callback=noop)
+    # Reads its paths one at a time, as a batch job would
+    parser.add_command(
+        names=['count'],
+        help_text='Count files.',
+        parameter_interpreters=[lambda itr: sum(1 for _ in itr)],
+        parameter_descriptors=['paths'],
+        callback=noop
+    )
+    return parser
+
+
+def test_response_files(parser, tmp_path):
+    nested = tmp_path / 'nested.txt'
+    nested.write_bytes(b'c\r\n\n-f\n')
+    paths = tmp_path / 'paths.txt'
+    paths.write_text(f'a\nb\n@{nested}\n')
+
+    result = parser.parse_args(['prog', 'rm', f'@{paths}', 'd'])
+    assert result.path == ('prog', 'rm')
+    assert result.parameters == (['a', 'b', 'c', 'd'],)
+    assert result.occurrences == (('force', ()),)
+
+    result = parser.parse_args(['prog', 'rm', f'--args-from={paths}', '--', f'@{paths}'])
+    assert result.parameters == (['a', 'b', 'c', f'@{paths}'],)
+
+    with pytest.raises(ArgumentError, match='Cannot read arguments'):
+        parser.parse_args(['prog', 'rm', f'@{tmp_path / "missing"}'])
+
+
+def test_stdin(parser, monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(b'rm\nx\n-f\ny')))
+
+    result = parser.parse_args(['prog', '--args-from', '-'])
+    assert result.path == ('prog', 'rm')
+    assert result.parameters == (['x', 'y'],)
+    assert result.occurrences == (('force', ()),)
+
+    monkeypatch.setattr(sys, 'stdin', None)
+    with pytest.raises(ArgumentError, match='there is no stdin'):
+        parser.parse_args(['prog', '--args-from', '-'])
+
+
+def test_streamed_arguments_are_not_collected(parser, tmp_path):
+    count = 200000
+    paths = tmp_path / 'paths.txt'
+    with open(paths, 'w') as fh:
+        for k in range(count):
+            fh.write(f'/var/tmp/some/directory/file-{k:08d}.dat\n')
+
+    parser.parse_args(['prog', 'count', '@/dev/null'])
+
+    tracemalloc.start()
+    try:
+        result = parser.parse_args(['prog', 'count', f'@{paths}'])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert result.parameters == (count,)
+    # Collecting the paths would take well over 10 MB
+    assert peak < 1 << 20
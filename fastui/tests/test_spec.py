@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+
+from fastui.terminal import ArgumentParser
+from fastui.terminal.spec import compile_spec, load_compiled, parser_from_spec
+
+
+SPEC = {
+    'program_name': 'prog',
+    'version': '0.0.1',
+    'callback': 'main',
+    'std_help': False,
+    'options': [
+        {'key': 'verbose', 'shortcuts': ['v', 'verbose'], 'callback': 'verbose'},
+        {'key': 'jobs', 'shortcuts': ['j', 'jobs'], 'type': 'int', 'parameter': 'n',
+            'callback': 'jobs', 'after': ['verbose']},
+        {'key': 'weights', 'shortcuts': ['w'], 'type': 'list', 'element': 'float'},
+    ],
+    'commands': [
+        {'names': ['install', 'i'], 'callback': 'install', 'options': [
+            {'key': 'target', 'shortcuts': ['target'], 'type': 'string',
+                'parameter': 'dir', 'callback': 'target'},
+        ]},
+    ],
+}
+
+
+def _callbacks(log):
+    def record(name):
+        return lambda *args, **kwargs: log.append((name, args))
+    return {name: record(name) for name in ('main', 'verbose', 'jobs', 'install', 'target')}
+
+
+def test_cache_round_trip(tmp_path):
+    log = []
+    parser = parser_from_spec(SPEC, _callbacks(log), cache_dir=str(tmp_path))
+    artifacts = os.listdir(tmp_path)
+    assert len(artifacts) == 1 and artifacts[0].endswith('.fuis')
+
+    # The second load reads the artifact
+    cached = parser_from_spec(SPEC, _callbacks(log), cache_dir=str(tmp_path))
+    for p in (parser, cached):
+        p.parse(argument_list=['prog', '-j', '3', '-v', '-w', '[1, 2.5]'])
+    assert log[:3] == log[3:] == [('verbose', ()), ('jobs', (3,)), ('main', ())]
+    assert cached.parse_args(['prog', '-w', '[1, 2.5]']).options['weights'] == ([1.0, 2.5],)
+
+    log.clear()
+    cached.parse(argument_list=['prog', 'i', '--target', '/opt'])
+    assert log == [('target', ('/opt',)), ('install', ())]
+
+
+def test_corrupt_cache_is_recompiled(tmp_path):
+    parser_from_spec(SPEC, _callbacks([]), cache_dir=str(tmp_path))
+    path = tmp_path / os.listdir(tmp_path)[0]
+    path.write_bytes(b'FUIS garbage')
+
+    parser = parser_from_spec(SPEC, _callbacks([]), cache_dir=str(tmp_path))
+    assert parser.parse_args(['prog', '-j', '1']).options['jobs'] == (1,)
+    assert load_compiled(path.read_bytes(), _callbacks([])).program_name == 'prog'
+
+
+@pytest.mark.parametrize('missing, owner', [
+    ('verbose', 'option `verbose`'),
+    ('target', 'option `target`'),
+    ('install', 'command `install`'),
+])
+def test_missing_callback(tmp_path, missing, owner):
+    callbacks = _callbacks([])
+    del callbacks[missing]
+
+    path = tmp_path / 'prog.json'
+    path.write_text(json.dumps(SPEC))
+
+    # Raised from the cache as well as when compiling
+    for _ in range(2):
+        with pytest.raises(AssertionError) as info:
+            parser_from_spec(str(path), callbacks, cache_dir=str(tmp_path / 'cache'))
+        assert f'`{missing}` of {owner}' in str(info.value)
+        assert str(path) in str(info.value)
+
+
+def test_dependency_checks():
+    spec = dict(SPEC, options=[{'key': 'a', 'shortcuts': ['a'], 'after': ['b']}])
+    with pytest.raises(AssertionError):
+        compile_spec(spec)
+
+
+def test_parser_options(tmp_path):
+    class Program(ArgumentParser):
+        pass
+
+    log = []
+    parser = Program.from_spec(SPEC, _callbacks(log), cache_dir=str(tmp_path),
+        callback_workers=2, defer_validation=True)
+    assert type(parser) == Program
+    assert parser.callback_workers == 2 and parser._defer_validation
+
+    # The same parser state as one built by `__init__`
+    built = ArgumentParser(program_name='prog', version='0.0.1', callback=lambda: None)
+    assert set(vars(parser)) == set(vars(built))
+
+    parser.dispatch(parser.parse_args(['prog', '-v', '-j', '3']))
+    assert sorted(name for name, _ in log) == ['jobs', 'main', 'verbose']
+
+    with pytest.raises(AssertionError, match='callback_workers'):
+        parser_from_spec(SPEC, _callbacks([]), cache_dir=str(tmp_path), callback_workers=0)
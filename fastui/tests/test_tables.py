@@ -0,0 +1,240 @@
+import io
+import os
+import tracemalloc
+
+import pytest
+from rich import box
+from rich.console import Console
+from rich.table import Column, Table
+from rich.theme import Theme
+
+from fastui.terminal.tables import PARALLEL_CHUNK_ROWS, SimplePlainTable, \
+    StreamingPlainTable
+
+
+_WORDS = 'the quick brown fox jumps over a lazy dog'.split()
+
+def _rows(section, count):
+    return tuple(
+        (f'--option-{section}-{r} <value>',
+            ' '.join(_WORDS[(r + k) % len(_WORDS)] for k in range(r % 17)))
+        for r in range(count)
+    )
+
+def _sections(counts=(3, 1, 7, 2)):
+    return [SimplePlainTable.Section(f'Section {s}', _rows(s, count))
+        for s, count in enumerate(counts)]
+
+def _console(width=60, color=True, **kwargs):
+    return Console(file=io.StringIO(), width=width,
+        color_system='truecolor' if color else None, force_terminal=color, **kwargs)
+
+def _header(title):
+    return f'[bold]{title}[/bold]:'
+
+
+def _rich_table(rows, width, widths=None):
+    # The table of `_plain_table`, built with rich alone
+    table = Table(
+        *(Column(justify='left', width=w - 2 if widths is not None else None)
+            for w in (widths or [None] * len(rows[0]))),
+        show_header=False, show_footer=False, box=box.SIMPLE_HEAD, width=width
+    )
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+def _reference(sections, console, indentation=4, highlight_rows=True):
+    # What printing every section with rich gives, the widths solved over
+    # all rows and the row stripes carrying on across sections
+    width = console.width - indentation
+    rows = [row for sec in sections for row in sec.data]
+    whole = _rich_table(rows, width)
+    widths = whole._calculate_column_widths(
+        console, console.options.update_width(width - whole._extra_width)
+    )
+
+    start = 0
+    for sec in sections:
+        console.print(_header(sec.title))
+        table = _rich_table(sec.data, width, widths)
+        if highlight_rows:
+            table.row_styles = ['none', 'dim'] if start % 2 == 0 else ['dim', 'none']
+        console.print(table, justify='right')
+        start += len(sec.data)
+    return console.file.getvalue()
+
+def _printed(sections, console, **kwargs):
+    SimplePlainTable(*sections, header_style=_header, console=console, **kwargs).print()
+    return console.file.getvalue()
+
+
+def _per_section(sections, console, **kwargs):
+    # How sections were printed before the single pass: the whole table
+    # printed by rich once per section, limited to the section's rows
+    table = SimplePlainTable(*sections, header_style=_header, console=console, **kwargs)
+    temp_table = table._construct_temp_table()
+
+    start = 0
+    for sec in sections:
+        console.print(_header(sec.title))
+        temp_table.dt_select_rows(start, start + len(sec.data))
+        console.print(temp_table, justify='right')
+        start += len(sec.data)
+    return console.file.getvalue()
+
+
+@pytest.mark.parametrize('width', [40, 60, 120])
+@pytest.mark.parametrize('highlight_rows', [True, False])
+def test_matches_rich(width, highlight_rows):
+    assert _printed(_sections(), _console(width, False), highlight_rows=highlight_rows) == \
+        _reference(_sections(), _console(width, False), highlight_rows=highlight_rows)
+
+
+@pytest.mark.parametrize('width', [40, 60, 120])
+@pytest.mark.parametrize('highlight_rows', [True, False])
+def test_matches_per_section_printing(width, highlight_rows):
+    # Styles included. Continuation lines of striped rows are padded with
+    # the table's style, unlike the `Table` of recent rich versions, which is
+    # why styled output is compared with `DividableTable` itself.
+    assert _printed(_sections(), _console(width), highlight_rows=highlight_rows) == \
+        _per_section(_sections(), _console(width), highlight_rows=highlight_rows)
+
+
+def test_single_section():
+    sections = [SimplePlainTable.Section('Only', _rows(0, 30))]
+    assert _printed(sections, _console(color=False)) == \
+        _reference(sections, _console(color=False))
+    assert _printed(sections, _console()) == _per_section(sections, _console())
+
+
+@pytest.mark.parametrize('width', [30, 60, 120])
+def test_plain_output(width):
+    # Written without rich when the console is not a terminal
+    console = _console(width, color=False)
+    table = SimplePlainTable(*_sections(), header_style=_header, console=console)
+    console.print(table)
+    through_rich = console.file.getvalue()
+
+    assert _printed(_sections(), _console(width, color=False)) == through_rich
+    assert through_rich == _reference(_sections(), _console(width, color=False))
+
+
+def test_plain_output_falls_back_to_rich():
+    # Markup and emoji codes in cells are left to rich
+    sections = [SimplePlainTable.Section('Markup', (('[bold]a[/bold]', ':thumbs_up: b'),))]
+    assert _printed(sections, _console(color=False)) == \
+        _reference(sections, _console(color=False))
+
+
+def test_section_rows():
+    rows = _rows(0, 5)
+    section = SimplePlainTable.Section('Rows', rows)
+    # Tuples of tuples are shared, not copied
+    assert section.data is rows
+    assert section.size == (2, 5)
+    assert not hasattr(section, '__dict__')
+
+    section.data = [['a', 'b'], ['c', 'd']]
+    assert section.data == (('a', 'b'), ('c', 'd'))
+    section.data = ()
+    assert section.size == (0, 0)
+
+    with pytest.raises(AssertionError):
+        SimplePlainTable.Section('Rows', [[1, 2]])
+    with pytest.raises(AssertionError):
+        SimplePlainTable.Section('Rows', 'ab')
+
+
+def test_section_table_is_lazy():
+    section = SimplePlainTable.Section('Rows', _rows(0, 5))
+    assert section._table is None
+
+    # Printing does not build it
+    _printed([section], _console(color=False))
+    assert section._table is None
+
+    table = section.table
+    assert table.row_count == 5 and section.table is table
+
+    section.data = _rows(0, 3)
+    assert section._table is None
+    assert section.table.row_count == 3
+
+
+def _streamed(sections, console, **kwargs):
+    StreamingPlainTable(
+        *(StreamingPlainTable.Section(sec.title, iter(sec.data)) for sec in sections),
+        header_style=_header, console=console, **kwargs
+    ).print()
+    return console.file.getvalue()
+
+
+@pytest.mark.parametrize('color', [True, False])
+@pytest.mark.parametrize('chunk_size', [1, 3, 64])
+def test_streaming_matches_simple(color, chunk_size):
+    # Solved from a sample of every row, the widths are the same
+    assert _streamed(_sections(), _console(color=color), chunk_size=chunk_size) == \
+        _printed(_sections(), _console(color=color))
+
+
+def test_streaming_widths():
+    sections = [SimplePlainTable.Section('Wide', _rows(0, 40))]
+
+    # Rows after the sample are wrapped to the sample's widths
+    lines = _streamed(sections, _console(color=False), sample_size=2).splitlines()
+    assert max(len(line) for line in lines) == 60
+    assert any('--option-0-39' in line for line in lines)
+
+    def help_column(widths):
+        row = SimplePlainTable.Section('Row', (('--option <value>', 'the lazy dog'),))
+        lines = _streamed([row], _console(color=False), widths=widths).splitlines()
+        return lines[2].index('the lazy dog')
+
+    assert help_column((30, None)) - help_column((24, None)) == 6
+
+
+def test_streaming_empty_sections():
+    sections = [SimplePlainTable.Section('Empty', ()), SimplePlainTable.Section('Rows', _rows(0, 2))]
+    lines = _streamed(sections, _console(color=False)).splitlines()
+    assert lines[0] == 'Empty:' and 'Rows:' in lines
+
+
+def test_streaming_memory():
+    # The rows are never all in memory. Cells repeat, so that the caches of
+    # measured and wrapped strings (here and in rich) stay small.
+    def peak(count):
+        console = Console(file=open(os.devnull, 'w'), width=80, color_system=None)
+        rows = ((f'--option-{r % 50}', f'help text of option {r % 50}, long enough to wrap')
+            for r in range(count))
+        table = StreamingPlainTable(StreamingPlainTable.Section('Rows', rows),
+            sample_size=16, chunk_size=16, console=console)
+
+        tracemalloc.start()
+        try:
+            table.print()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            console.file.close()
+
+    # Keeping the rows would take over 10 times the memory; the margin is
+    # for allocations of other threads while tracing
+    peak(100)
+    assert peak(3000) < 2 * peak(300)
+
+
+@pytest.mark.parametrize('counts', [(PARALLEL_CHUNK_ROWS + 1,), (300, 1, 2 * PARALLEL_CHUNK_ROWS, 5)])
+def test_parallel_matches_serial(counts):
+    # Rendered in worker processes, chunks that end inside and at the end
+    # of sections
+    def printed(workers):
+        console = _console(80, theme=Theme({'dim': 'italic red'}))
+        SimplePlainTable(*_sections(counts), header_style=_header, workers=workers,
+            console=console).print()
+        return console.file.getvalue()
+
+    output = printed(2)
+    # The console's theme reaches the workers
+    assert '\x1b[3;31m' in output
+    assert output == printed(None)
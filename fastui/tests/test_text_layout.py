@@ -0,0 +1,100 @@
+import io
+
+import pytest
+from rich.console import Console
+from rich.measure import Measurement
+
+from fastui.terminal.text_layout import TextLayoutCache, WRAPS_PER_STRING, \
+    is_plain_text
+
+
+_TEXTS = [
+    '',
+    'word',
+    'two words',
+    'a line long enough to be wrapped at every width below',
+    'spaces   between    words   and trailing   ',
+    '   leading spaces',
+    'averyveryverylongwordthatdoesnotfitanywhere and then more',
+    'short averyveryverylongwordthatdoesnotfitanywhere',
+    '--option-with-dashes=value, comma separated, (parenthesised)',
+    '漢字と かな の混じった 文章 です',
+    'emoji 🙂 in 🙂🙂 text',
+    'mixed 漢字漢字漢字漢字漢字 and ascii',
+]
+
+_console = Console(file=io.StringIO(), width=120, color_system=None)
+
+
+def _rich_lines(text, width, overflow):
+    options = _console.options.update(
+        width=width, justify='left', no_wrap=False, overflow=overflow, highlight=False
+    )
+    return tuple(
+        ''.join(segment.text for segment in line)
+        for line in _console.render_lines(text, options, pad=True)
+    )
+
+
+@pytest.mark.parametrize('overflow', ['fold', 'crop', 'ellipsis'])
+@pytest.mark.parametrize('text', _TEXTS)
+def test_wrap_matches_rich(text, overflow):
+    cache = TextLayoutCache()
+    for width in range(1, 60):
+        assert cache.wrap(text, width, overflow) == _rich_lines(text, width, overflow), \
+            f'width {width}'
+
+
+@pytest.mark.parametrize('text', _TEXTS)
+def test_measure_matches_rich(text):
+    options = _console.options.update(highlight=False)
+    assert TextLayoutCache().measure(text) == \
+        tuple(Measurement.get(_console, options, _console.render_str(text)))
+
+
+def test_plain_text():
+    assert is_plain_text('plain text, (with) punctuation: and colons')
+    assert not is_plain_text('[bold]markup[/bold]')
+    assert not is_plain_text('an :emoji: code')
+    assert not is_plain_text('an \\[escape')
+    assert not is_plain_text('tab\there')
+
+
+def test_cache():
+    cache = TextLayoutCache(max_strings=2)
+
+    first = cache.layout('a')
+    assert cache.layout('a') is first
+    cache.layout('b')
+    cache.layout('a')
+    # `b` is the least recently used
+    cache.layout('c')
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.layout('a') is first
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    cache.layout('b')
+    cache.layout('c')
+    assert cache.layout('a') is not first
+    assert cache.evictions == 4
+
+
+def test_wraps_per_string():
+    cache = TextLayoutCache()
+    text = _TEXTS[3]
+
+    lines = cache.wrap(text, 10, 'fold')
+    assert cache.wrap(text, 10, 'fold') is lines
+    assert (cache.wrap_hits, cache.wrap_misses) == (1, 1)
+
+    for width in range(11, 11 + WRAPS_PER_STRING):
+        cache.wrap(text, width, 'fold')
+    assert len(cache.layout(text).wraps) == WRAPS_PER_STRING
+    assert cache.wrap(text, 10, 'fold') == lines
+    assert cache.wrap_misses == 2 + WRAPS_PER_STRING
+
+    stats = cache.stats()
+    assert stats['strings'] == 1 and 0 < stats['wrap_hit_rate'] < 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()['hits'] == 0
@@ -0,0 +1,112 @@
+import pytest
+
+from fastui.terminal.resolver import ArgumentError
+from fastui.terminal.tokens import ArgumentCursor, LONG, NUMBER, POSITIONAL, \
+    SHORT, TERMINATOR, classify, tokenize
+
+
+def test_classify():
+    assert classify('file') == POSITIONAL
+    assert classify('-') == POSITIONAL
+    assert classify('') == POSITIONAL
+    assert classify('-v') == SHORT
+    assert classify('-vn5') == SHORT
+    assert classify('--verbose') == LONG
+    assert classify('--number=5') == LONG
+    assert classify('--') == TERMINATOR
+    assert classify('-5') == NUMBER
+    assert classify('-.5') == NUMBER
+
+
+def test_tokenize():
+    args = ['prog', '-v', '--all', 'x', '-5', '--', '-q', '--']
+    assert list(tokenize(args, 1)) == \
+        [POSITIONAL, SHORT, LONG, POSITIONAL, NUMBER, TERMINATOR, POSITIONAL, POSITIONAL]
+    assert list(tokenize(args)) == [classify(arg) for arg in args[:6]] + [0, 0]
+
+
+def test_cursor():
+    cursor = ArgumentCursor(['prog', 'a', '-v', 'b'], 1)
+
+    assert cursor.peek() == 'a' and cursor.peek(2) == 'b' and cursor.peek(3) is None
+    assert cursor.peek_kind() == POSITIONAL
+    assert next(cursor) == 'a'
+    assert cursor.peek_kind() == SHORT
+    assert next(cursor) == '-v'
+    assert (cursor.position, cursor.consumed) == (3, 2)
+
+    cursor.push_back()
+    assert cursor.peek() == '-v'
+    cursor.push_back('5')
+    cursor.push_back('4')
+    assert cursor.has_pending
+    # Pushed back values come first, and are never options
+    assert cursor.peek_kind() == POSITIONAL
+    assert [cursor.peek(k) for k in range(4)] == ['4', '5', '-v', 'b']
+    assert list(cursor) == ['4', '5', '-v', 'b']
+    # Every value pushed back is taken again
+    assert cursor.consumed == 3
+    assert cursor.peek_kind() is None
+
+    with pytest.raises(AssertionError):
+        ArgumentCursor(['a']).push_back()
+
+
+def test_cursor_stops_at_the_terminator():
+    cursor = ArgumentCursor(['a', '--', '-v', '--'])
+    assert list(cursor) == ['a']
+    assert cursor.peek() is None
+    assert cursor.peek_kind() == TERMINATOR
+
+    cursor.skip_terminator()
+    assert cursor.peek_kind() == POSITIONAL
+    assert list(cursor) == ['-v', '--']
+    assert cursor.peek_kind() is None
+
+
+@pytest.fixture
+def parser(make_parser, noop):
+    def pairs(itr):
+        # Takes arguments up to the next option
+        values = [next(itr)]
+        while True:
+            value = next(itr, None)
+            if value is None:
+                break
+            if value.startswith('-'):
+                itr.push_back()
+                break
+            values.append(value)
+        return values
+
+    parser = make_parser(std_help=False)
+    parser.add_option(
+        key='take',
+        help_text='Values up to the next option.',
+        shortcuts=['t', 'take'],
+        parameter_interpreters=[pairs],
+        parameter_descriptors=['values'],
+        callback=noop
+    )
+    parser.add_int_option('number', 'A number.', 'n', 'number',
+        parameter_descriptor='n', callback=noop)
+    return parser
+
+
+def test_interpreters_share_the_cursor(parser):
+    result = parser.parse_args(['prog', '-t', 'a', 'b', '-n', '3', '--take=c', 'd'])
+    assert result.occurrences == (
+        ('take', (['a', 'b'],)), ('number', (3,)), ('take', (['c', 'd'],))
+    )
+
+    with pytest.raises(ArgumentError, match='`-n` expects 1 parameter'):
+        parser.parse_args(['prog', '-n'])
+    with pytest.raises(ArgumentError, match='expects 1 parameter'):
+        parser.parse_args(['prog', '-n', '--', '3'])
+
+
+def test_many_options(parser):
+    # Linear in the number of arguments
+    args = ['prog'] + ['-n', '1'] * 50000
+    result = parser.parse_args(args)
+    assert len(result.occurrences) == 50000
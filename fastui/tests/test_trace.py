@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from rich.console import Console
+
+from fastui import trace
+from fastui.terminal.tables import SimplePlainTable
+
+
+@pytest.fixture
+def recorder():
+    previous = trace.disable()
+    try:
+        yield trace.enable()
+    finally:
+        trace.disable()
+        trace.recorder = previous
+
+
+@pytest.fixture
+def run_program(make_parser, noop):
+    # Every traced phase but loading a spec and freezing on its own
+    def run():
+        parser = make_parser()
+        parser.add_command(names=['install'], callback=noop,
+            parameter_interpreters=[lambda itr: next(itr)], parameter_descriptors=['package'])
+        parser.command('install').add_int_option('jobs', 'Parallel jobs.', 'j', 'jobs',
+            parameter_descriptor='n', callback=noop)
+
+        for argv in (['prog', 'install', '-j', '2', '--jobs', '3', 'pkg'], ['prog', 'install', 'x']):
+            parser.dispatch(parser.parse_args(argv))
+
+        SimplePlainTable(SimplePlainTable.Section('Rows', (('a', 'b'),)),
+            console=Console(file=io.StringIO(), width=40)).print()
+    return run
+
+
+def test_summary(recorder, run_program):
+    run_program()
+    summary = {name: (count, wall, cpu) for name, count, wall, cpu, _ in recorder.summary()}
+
+    assert summary['construct'][0] == 1
+    assert summary['parse'][0] == 2
+    assert summary['interpret jobs'][0] == 2
+    assert summary['interpret install'][0] == 2
+    assert summary['callback jobs'][0] == 2
+    assert summary['callback install'][0] == 2
+    assert summary['print SimplePlainTable'][0] == 1
+    assert all(wall >= 0 and cpu >= 0 for _, wall, cpu in summary.values())
+
+    # In the order spans ended
+    names = [name for name, *_ in recorder.summary()]
+    assert names.index('construct') < names.index('parse')
+
+    console = Console(file=io.StringIO(), width=100, color_system=None)
+    recorder.print_summary(console)
+    output = console.file.getvalue()
+    assert 'fastui trace' in output and 'interpret jobs' in output
+
+
+def test_chrome_trace(recorder, run_program, tmp_path):
+    run_program()
+    path = tmp_path / 'trace.json'
+    recorder.write_chrome_trace(str(path))
+
+    with open(path) as fh:
+        data = json.load(fh)
+    events = data['traceEvents']
+    assert len(events) == len(recorder.events)
+    assert {event['name'] for event in events} >= {'parse', 'callback install'}
+    for event in events:
+        assert event['ph'] == 'X' and event['pid'] == os.getpid()
+        assert event['ts'] >= 0 and event['dur'] >= 0
+        assert set(event['args']) == {'cpu_us', 'net_allocated_blocks'}
+
+
+def test_spans_nest(recorder):
+    with recorder.span('outer'):
+        with recorder.span('inner', 'test'):
+            pass
+    inner, outer = recorder.events
+    assert (inner[0], inner[1], outer[0], outer[1]) == ('inner', 'test', 'outer', 'fastui')
+    assert outer[2] <= inner[2] and inner[2] + inner[3] <= outer[2] + outer[3]
+
+
+def test_maybe_span(recorder):
+    with trace.maybe_span('callback', 'callback', 'jobs'):
+        pass
+    assert [event[:2] for event in recorder.events] == [('callback jobs', 'callback')]
+
+    # Off, a shared span that records nothing
+    trace.disable()
+    with trace.maybe_span('callback', 'callback', 'jobs') as span:
+        span.end()
+    assert span is trace.maybe_span('parse') and len(recorder.events) == 1
+
+
+def test_off_by_default(run_program):
+    if 'FASTUI_TRACE' in os.environ:
+        pytest.skip('Tracing is on for this run')
+    assert trace.recorder is None
+    run_program()
+    assert trace.recorder is None
+
+
+def _traced(value, tmp_path):
+    return subprocess.run(
+        [sys.executable, '-c',
+            'from fastui.terminal import ArgumentParser\n'
+            'parser = ArgumentParser(program_name="prog", version="0.0.1", callback=print)\n'
+            'parser.dispatch(parser.parse_args(["prog"]))\n'],
+        env={**os.environ, 'FASTUI_TRACE': value,
+            'PYTHONPATH': os.path.dirname(os.path.dirname(trace.__file__))},
+        cwd=tmp_path, capture_output=True, text=True, check=True
+    )
+
+
+def test_environment(tmp_path):
+    result = _traced('1', tmp_path)
+    assert 'fastui trace' in result.stderr and 'parse' in result.stderr
+
+    _traced('trace.json', tmp_path)
+    with open(tmp_path / 'trace.json') as fh:
+        names = {event['name'] for event in json.load(fh)['traceEvents']}
+    assert {'construct', 'parse', 'callback prog'} <= names
+    assert any(name.startswith('import fastui.terminal') for name in names)
@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+from _thread import get_ident
+
+# `typing.TYPE_CHECKING`: every instrumented module imports this one,
+# completion included, so annotations are strings here (see `.terminal.completion`)
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any, List, Optional, Tuple
+
+    # (name, category, start ns, wall ns, CPU ns, net blocks, thread)
+    Event = Tuple[str, str, int, int, int, int, int]
+
+
+# Phase timing for the whole path of a command line program: lazy imports,
+# building the parser, loading a spec, parsing, option interpreters,
+# callbacks and rendering tables and help.
+#
+# Instrumented code wraps each phase in `maybe_span`, a span of `recorder`
+# (`None` unless tracing is on) or, when it is off, a shared span that does
+# nothing. Every span records wall time, the CPU time of its thread and its
+# net blocks: `sys.getallocatedblocks()` at the end minus at the start, the
+# memory blocks the phase left allocated (in any thread). Blocks allocated
+# and freed again within the phase do not count, so this is not a count of
+# allocations; use `tracemalloc` for those.
+#
+# `FASTUI_TRACE=1` prints a summary table to stderr when the program exits,
+# `FASTUI_TRACE=trace.json` writes a Chrome trace there instead (open it in
+# `chrome://tracing` or Perfetto). `enable` and `disable` do the same from
+# code.
+
+recorder: 'Optional[Recorder]' = None
+
+
+class Span:
+    __slots__ = ('name', 'category', 'start', 'cpu', 'blocks', '_recorder')
+
+    def __init__(self, recorder: 'Recorder', name: str, category: str):
+        self._recorder = recorder
+        self.name = name
+        self.category = category
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = time.thread_time_ns()
+        self.start = time.perf_counter_ns()
+
+    def end(self) -> None:
+        wall = time.perf_counter_ns() - self.start
+        cpu = time.thread_time_ns() - self.cpu
+        blocks = sys.getallocatedblocks() - self.blocks
+        self._recorder.events.append((
+            self.name, self.category, self.start, wall, cpu, blocks, get_ident()
+        ))
+
+    def __enter__(self) -> 'Span':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.end()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    def __init__(self):
+        # Appending is atomic, spans may end in any thread
+        self.events: 'List[Event]' = []
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name: str, category: str = 'fastui') -> Span:
+        # Started now, recorded by `Span.end` or at the end of a `with`
+        return Span(self, name, category)
+
+    def summary(self) -> 'List[Tuple[str, int, float, float, int]]':
+        # (name, count, wall ms, CPU ms, net blocks) per span name,
+        # in the order they first ended
+        totals = {}
+        for name, _, _, wall, cpu, blocks, _ in self.events:
+            total = totals.get(name)
+            if total is None:
+                total = totals[name] = [0, 0, 0, 0]
+            total[0] += 1
+            total[1] += wall
+            total[2] += cpu
+            total[3] += blocks
+
+        return [
+            (name, count, wall / 1e6, cpu / 1e6, blocks)
+            for name, (count, wall, cpu, blocks) in totals.items()
+        ]
+
+    def print_summary(self, console: 'Optional[Any]' = None) -> None:
+        from rich.console import Console
+        from .terminal.tables import SimplePlainTable
+
+        if console is None:
+            console = Console(stderr=True)
+
+        rows = [
+            (name, f'{count}', f'{wall:.3f}', f'{cpu:.3f}', f'{blocks:+d}')
+            for name, count, wall, cpu, blocks in self.summary()
+        ]
+        if len(rows) == 0:
+            return
+        SimplePlainTable(
+            SimplePlainTable.Section(
+                'fastui trace: phase, count, wall ms, CPU ms, net allocated blocks', rows
+            ),
+            expanded_column=0,
+            highlight_rows=False,
+            console=console
+        ).print()
+
+    def chrome_trace(self) -> dict:
+        # Complete events of the Trace Event Format, times in microseconds
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': name,
+                    'cat': category,
+                    'ph': 'X',
+                    'ts': (start - self.origin) / 1e3,
+                    'dur': wall / 1e3,
+                    'pid': pid,
+                    'tid': thread,
+                    'args': {'cpu_us': cpu / 1e3, 'net_allocated_blocks': blocks},
+                }
+                for name, category, start, wall, cpu, blocks, thread in self.events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        import json
+
+        with open(path, 'w') as fh:
+            json.dump(self.chrome_trace(), fh)
+
+
+def maybe_span(
+    name: str,
+    category: str = 'fastui',
+    subject: 'Optional[str]' = None
+) -> 'Any':
+    # A span of `recorder` named `name`, or `'{name} {subject}'`, when
+    # tracing is on. `subject` is only formatted then.
+    if recorder is None:
+        return _NULL_SPAN
+    return recorder.span(name if subject is None else f'{name} {subject}', category)
+
+
+def enable(output: 'Optional[str]' = None) -> Recorder:
+    # Starts recording. With `output`, reports when the program exits: `'1'`
+    # or `'summary'` prints the summary to stderr, anything else is the
+    # path of a Chrome trace.
+    global recorder
+    if recorder is None:
+        recorder = Recorder()
+
+    if output is not None:
+        import atexit
+
+        if output in ('1', 'summary'):
+            atexit.register(recorder.print_summary)
+        else:
+            atexit.register(recorder.write_chrome_trace, output)
+    return recorder
+
+def disable() -> 'Optional[Recorder]':
+    # Stops recording, and returns what was recorded
+    global recorder
+    stopped, recorder = recorder, None
+    return stopped
+
+
+if os.environ.get('FASTUI_TRACE'):
+    enable(os.environ['FASTUI_TRACE'])
@@ -69,7 +69,7 @@ def get_help_text(lst):
 	return lst[1]
 
 def get_opt_keys(lst):
-	return list(map(lambda txt: txt.split(' ')[0].replace('-', ''), get_cmd_keys(lst)))
+	return list(map(lambda txt: txt.split(' ')[0].lstrip('-'), get_cmd_keys(lst)))
 
 def get_opt_parameters(lst):
 	_opt = get_cmd_keys(lst)[0]